@@ -0,0 +1,283 @@
+#!/usr/bin/env python3
+"""
+Jeepy AI - Transcripción por lotes
+Transcribe un corpus de WAVs (por defecto captured_commands/) con un pool de
+workers dimensionado según el motor: procesos para motores locales (CPU) e
+hilos para APIs (I/O). Escribe un único JSONL con tiempos por archivo y puede
+reanudarse tras una interrupción.
+"""
+
+import argparse
+import json
+import multiprocessing
+import os
+import sys
+import time
+import wave
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor, as_completed
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, List, Optional
+
+import numpy as np
+
+from command_pipeline import LOCAL_STT_ENGINES
+from config import Config
+
+DEFAULT_OUTPUT = "transcriptions/batch_results.jsonl"
+# Hilos por defecto para motores en la nube (limitados por red, no por CPU)
+API_WORKERS = 8
+
+# STTManager del worker (uno por proceso o compartido entre hilos)
+_manager = None
+
+
+def _init_worker(use_cache: bool):
+    global _manager
+    from stt_engine import STTManager
+
+    _manager = STTManager(use_cache=use_cache)
+
+
+def _transcribe_file(path: str) -> Dict:
+    """Transcribe un archivo en el worker y retorna su registro"""
+    record = {"file": path, "pid": os.getpid()}
+    try:
+        with wave.open(path, "rb") as wf:
+            record["duration_s"] = wf.getnframes() / wf.getframerate()
+
+        start = time.perf_counter()
+        text, cached = _manager.transcribe_with_source(path)
+        elapsed = time.perf_counter() - start
+
+        record.update(
+            {
+                "text": text,
+                "ok": bool(text),
+                "transcribe_time_s": elapsed,
+                "rtf": elapsed / record["duration_s"] if record["duration_s"] else None,
+                "cached": cached,
+                "model_id": _manager.model_id,
+            }
+        )
+    except Exception as e:
+        record.update({"text": None, "ok": False, "error": str(e)})
+    return record
+
+
+def default_workers(use_processes: bool) -> int:
+    """Procesos: cada motor local ya usa varios núcleos, así que pocos workers"""
+    if use_processes:
+        return max(1, (os.cpu_count() or 2) // 4)
+    return API_WORKERS
+
+
+def load_records(output: Path) -> Dict[str, Dict]:
+    """
+    Último registro de cada archivo (ignora una última línea truncada por la
+    interrupción); un reintento sustituye al fallo anterior
+    """
+    records = {}
+    if not output.exists():
+        return records
+    with open(output, encoding="utf-8") as f:
+        for line in f:
+            try:
+                record = json.loads(line)
+            except json.JSONDecodeError:
+                continue
+            records[record["file"]] = record
+    return records
+
+
+def load_completed(output: Path, retry_failed: bool) -> Dict[str, Dict]:
+    """Registros ya escritos que no hay que repetir"""
+    return {
+        path: record
+        for path, record in load_records(output).items()
+        if record.get("ok") or not retry_failed
+    }
+
+
+def rewrite_records(output: Path, records: List[Dict]):
+    """Reescribe el JSONL (vía archivo temporal) con un registro por archivo"""
+    tmp = output.with_suffix(output.suffix + ".tmp")
+    with open(tmp, "w", encoding="utf-8") as f:
+        for record in records:
+            f.write(json.dumps(record, ensure_ascii=False) + "\n")
+    os.replace(tmp, output)
+
+
+def write_parquet(records: List[Dict], path: Path):
+    """Exporta los registros a Parquet (requiere pandas + pyarrow)"""
+    try:
+        import pandas as pd
+    except ImportError:
+        print("⚠️  pandas no instalado; se omite Parquet (uv add pandas pyarrow)")
+        return
+    pd.DataFrame(records).to_parquet(path, index=False)
+    print(f"💾 Parquet: {path}")
+
+
+def print_summary(records: List[Dict], wall_time: float):
+    ok = [r for r in records if r.get("ok")]
+    times = [r["transcribe_time_s"] for r in records if "transcribe_time_s" in r]
+    audio = sum(r.get("duration_s", 0) for r in records)
+
+    print("\n" + "=" * 70)
+    print("📊 Resumen del lote:")
+    print(f"   ✅ Exitosas: {len(ok)}   ❌ Fallidas: {len(records) - len(ok)}")
+    print(f"   ⏱️  Tiempo total: {wall_time:.1f}s para {audio:.1f}s de audio")
+    if wall_time > 0:
+        print(f"   🚀 Rendimiento: {audio / wall_time:.2f}x tiempo real")
+    if times:
+        print(
+            f"   📈 Por archivo: p50 {np.percentile(times, 50):.2f}s | "
+            f"p95 {np.percentile(times, 95):.2f}s"
+        )
+    cached = sum(1 for r in records if r.get("cached"))
+    if cached:
+        print(f"   ⚡ Desde caché: {cached}")
+    print("=" * 70 + "\n")
+
+
+def run_batch(
+    files: List[Path],
+    output: Path,
+    workers: Optional[int] = None,
+    use_processes: Optional[bool] = None,
+    resume: bool = True,
+    retry_failed: bool = False,
+    use_cache: bool = True,
+) -> List[Dict]:
+    """
+    Transcribe files en paralelo y agrega cada resultado al JSONL al terminar
+
+    Args:
+        files: WAVs a transcribir
+        output: Archivo JSONL de resultados (uno por línea)
+        workers: Tamaño del pool (None = según tipo de motor)
+        use_processes: Procesos o hilos (None = procesos para motores locales)
+        resume: Saltar archivos ya presentes en output
+        retry_failed: Al reanudar, reintentar los que fallaron
+        use_cache: Usar la caché de transcripciones
+
+    Returns:
+        Registros de esta ejecución
+    """
+    if use_processes is None:
+        use_processes = Config.STT_ENGINE in LOCAL_STT_ENGINES
+    workers = workers or default_workers(use_processes)
+
+    completed = load_completed(output, retry_failed) if resume else {}
+    if resume and output.exists():
+        # Sin los fallos a reintentar ni duplicados: cada archivo, una línea
+        rewrite_records(output, list(completed.values()))
+    pending = [str(f) for f in files if str(f) not in completed]
+    print(
+        f"📁 {len(files)} archivos | {len(completed)} ya procesados | "
+        f"{len(pending)} pendientes"
+    )
+    print(
+        f"🔧 Motor: {Config.STT_ENGINE} | {workers} "
+        f"{'procesos' if use_processes else 'hilos'}"
+    )
+    if not pending:
+        return []
+
+    if use_processes:
+        executor = ProcessPoolExecutor(
+            max_workers=workers,
+            mp_context=multiprocessing.get_context("spawn"),
+            initializer=_init_worker,
+            initargs=(use_cache,),
+        )
+    else:
+        _init_worker(use_cache)
+        executor = ThreadPoolExecutor(max_workers=workers)
+
+    output.parent.mkdir(parents=True, exist_ok=True)
+    records = []
+    start = time.perf_counter()
+    interrupted = False
+    try:
+        with open(output, "a" if resume else "w", encoding="utf-8") as out:
+            futures = [executor.submit(_transcribe_file, path) for path in pending]
+            for i, future in enumerate(as_completed(futures), 1):
+                record = future.result()
+                record["engine"] = Config.STT_ENGINE
+                record["timestamp"] = datetime.now().isoformat()
+                # Una línea completa por resultado: lo escrito sobrevive a Ctrl+C
+                out.write(json.dumps(record, ensure_ascii=False) + "\n")
+                out.flush()
+                records.append(record)
+
+                status = "✅" if record["ok"] else "❌"
+                text = (record.get("text") or record.get("error") or "")[:50]
+                print(
+                    f"[{i}/{len(pending)}] {Path(record['file']).name} {status} {text}"
+                )
+    except KeyboardInterrupt:
+        interrupted = True
+        print("\n⏸️  Interrumpido: ejecuta de nuevo para reanudar")
+    finally:
+        executor.shutdown(wait=not interrupted, cancel_futures=interrupted)
+
+    print_summary(records, time.perf_counter() - start)
+    return records
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Transcripción por lotes de Jeepy AI")
+    parser.add_argument(
+        "inputs", nargs="*", help="WAVs o directorios (por defecto captured_commands/)"
+    )
+    parser.add_argument("--output", default=DEFAULT_OUTPUT, help="Archivo JSONL")
+    parser.add_argument("--workers", type=int, help="Tamaño del pool")
+    parser.add_argument(
+        "--pool",
+        choices=["auto", "process", "thread"],
+        default="auto",
+        help="auto: procesos para motores locales, hilos para APIs",
+    )
+    parser.add_argument(
+        "--restart", action="store_true", help="Ignorar resultados previos"
+    )
+    parser.add_argument(
+        "--retry-failed", action="store_true", help="Reintentar archivos fallidos"
+    )
+    parser.add_argument("--no-cache", action="store_true", help="No usar la caché STT")
+    parser.add_argument("--parquet", help="Exportar también los resultados a Parquet")
+    args = parser.parse_args()
+
+    inputs = [Path(p) for p in args.inputs] or [Config.CAPTURED_COMMANDS_DIR]
+    files = []
+    for path in inputs:
+        files += sorted(path.glob("*.wav")) if path.is_dir() else [path]
+    if not files:
+        print("❌ No hay archivos WAV para transcribir")
+        return 1
+
+    print("\n" + "=" * 70)
+    print("🎤 TRANSCRIPCIÓN POR LOTES")
+    print("=" * 70)
+
+    output = Path(args.output)
+    run_batch(
+        files,
+        output,
+        workers=args.workers,
+        use_processes={"auto": None, "process": True, "thread": False}[args.pool],
+        resume=not args.restart,
+        retry_failed=args.retry_failed,
+        use_cache=not args.no_cache,
+    )
+    print(f"💾 Resultados en: {output}")
+
+    if args.parquet:
+        write_parquet(list(load_completed(output, False).values()), Path(args.parquet))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
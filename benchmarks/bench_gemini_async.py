@@ -0,0 +1,134 @@
+#!/usr/bin/env python3
+"""
+Benchmark del motor Gemini asíncrono (gemini_async.py)
+Contra el mock local con costo de conexión (--connect-latency-ms) mide:
+- Latencia de un comando tras una pausa mayor que el keep-alive, en frío y
+  con pre-calentamiento lanzado --stt-ms antes (lo que tarda el STT)
+- Ráfaga concurrente con aprocess_many: tiempo total, fuera de plazo y
+  conexiones abiertas por el mock
+"""
+
+import argparse
+import contextlib
+import io
+import json
+import sys
+import time
+from pathlib import Path
+
+import numpy as np
+
+ROOT_DIR = Path(__file__).parent.parent
+sys.path.insert(0, str(ROOT_DIR))
+sys.path.insert(0, str(Path(__file__).parent))
+
+from config import Config
+from mock_gemini import MockGeminiServer
+
+DEFAULT_CORPUS = Path(__file__).parent / "intent_corpus.jsonl"
+
+
+def run_idle_commands(engine, commands, idle_s, stt_ms, prewarm):
+    """Un comando por activación, con la conexión expirada entre ellos"""
+    times = []
+    for text in commands:
+        time.sleep(idle_s)
+        if prewarm:
+            engine.prewarm()
+        time.sleep(stt_ms / 1000)
+        start = time.perf_counter()
+        with contextlib.redirect_stdout(io.StringIO()):
+            result = engine.process_command(text)
+        if result:
+            times.append((time.perf_counter() - start) * 1000)
+    return times
+
+
+def run_burst(engine, commands, deadline_s):
+    start = time.perf_counter()
+    with contextlib.redirect_stdout(io.StringIO()):
+        results = engine.submit(
+            engine.aprocess_many(commands, deadline_s=deadline_s)
+        ).result()
+    return (time.perf_counter() - start) * 1000, sum(r is not None for r in results)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Gemini asíncrono con keep-alive")
+    parser.add_argument("--corpus", default=str(DEFAULT_CORPUS))
+    parser.add_argument("--limit", type=int, default=10, help="Comandos del corpus")
+    parser.add_argument("--latency-ms", type=float, default=300.0)
+    parser.add_argument("--connect-latency-ms", type=float, default=150.0)
+    parser.add_argument("--stt-ms", type=float, default=400.0)
+    parser.add_argument("--keepalive-s", type=float, default=1.0)
+    parser.add_argument("--pool-size", type=int, default=4)
+    parser.add_argument("--deadline-s", type=float, default=2.0)
+    args = parser.parse_args()
+
+    with open(args.corpus, encoding="utf-8") as f:
+        commands = [json.loads(line)["text"] for line in f if line.strip()]
+    commands = commands[: args.limit]
+
+    server = MockGeminiServer(
+        latency_ms=args.latency_ms, connect_latency_ms=args.connect_latency_ms
+    ).start()
+    Config.GEMINI_BASE_URL = server.url
+    Config.GEMINI_API_KEY = Config.GEMINI_API_KEY or "mock"
+    idle_s = args.keepalive_s * 1.5
+    try:
+        from gemini_async import AsyncGeminiEngine
+
+        with contextlib.redirect_stdout(io.StringIO()):
+            engine = AsyncGeminiEngine(
+                args.pool_size, args.keepalive_s, args.deadline_s
+            )
+        engine.local_parser = None
+        engine.cache = None
+
+        results = {}
+        for name, prewarm in (("frío", False), ("pre-calentado", True)):
+            opened = server.connections_opened
+            times = run_idle_commands(engine, commands, idle_s, args.stt_ms, prewarm)
+            results[name] = (times, server.connections_opened - opened)
+
+        opened = server.connections_opened
+        burst_ms, burst_ok = run_burst(engine, commands, args.deadline_s)
+        burst_connections = server.connections_opened - opened
+        stats = engine.connection_stats()
+        engine.close()
+    except (ImportError, ValueError) as e:
+        print(f"❌ {e}")
+        return 1
+    finally:
+        server.stop()
+
+    print("\n" + "=" * 70)
+    print(
+        f"🔁 GEMINI ASÍNCRONO ({len(commands)} comandos, mock {args.latency_ms:.0f} ms "
+        f"+ {args.connect_latency_ms:.0f} ms por conexión)"
+    )
+    print("=" * 70)
+    print(f"Pausa entre comandos {idle_s:.1f}s > keep-alive {args.keepalive_s:.1f}s")
+    print(f"{'Modo':14} {'p50 ms':>8} {'p95 ms':>8} {'conexiones':>11}")
+    for name, (times, connections) in results.items():
+        if not times:
+            print(f"{name:14} sin resultados")
+            continue
+        print(
+            f"{name:14} {np.percentile(times, 50):8.0f} "
+            f"{np.percentile(times, 95):8.0f} {connections:11d}"
+        )
+    print(
+        f"\nRáfaga de {len(commands)} (pool {args.pool_size}): {burst_ms:.0f} ms, "
+        f"{burst_ok} dentro de plazo, {burst_connections} conexiones nuevas"
+    )
+    print(
+        f"Fuera de plazo: {stats['deadline_misses']} | "
+        f"pre-calentamientos: {stats['prewarms']}"
+    )
+    print("=" * 70 + "\n")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,125 @@
+#!/usr/bin/env python3
+"""
+Benchmark de Gemini en streaming: tiempo hasta la acción vs. respuesta completa
+Compara process_command (la acción se ejecuta tras el JSON completo) con
+process_command_stream (se despacha en cuanto llegan action y parameters)
+contra el mock local, con el parser local y la caché desactivados.
+"""
+
+import argparse
+import contextlib
+import io
+import json
+import sys
+import time
+from pathlib import Path
+
+import numpy as np
+
+ROOT_DIR = Path(__file__).parent.parent
+sys.path.insert(0, str(ROOT_DIR))
+sys.path.insert(0, str(Path(__file__).parent))
+
+from config import Config
+from mock_gemini import MockGeminiServer
+
+DEFAULT_CORPUS = Path(__file__).parent / "intent_corpus.jsonl"
+
+
+def percentiles(values):
+    return {
+        "p50_ms": float(np.percentile(values, 50)),
+        "p95_ms": float(np.percentile(values, 95)),
+    }
+
+
+def run_blocking(engine, commands):
+    """Acción y respuesta llegan juntas: ambas al terminar process_command"""
+    action_ms, response_ms = [], []
+    for text in commands:
+        start = time.perf_counter()
+        with contextlib.redirect_stdout(io.StringIO()):
+            result = engine.process_command(text)
+        elapsed = (time.perf_counter() - start) * 1000
+        if result:
+            action_ms.append(elapsed)
+            response_ms.append(elapsed)
+    return action_ms, response_ms
+
+
+def run_streaming(engine, commands):
+    action_ms, response_ms = [], []
+    for text in commands:
+        with contextlib.redirect_stdout(io.StringIO()):
+            result = engine.process_command_stream(
+                text, on_action=lambda action, parameters: {"success": True}
+            )
+        if result and "action_ms" in result["timing"]:
+            action_ms.append(result["timing"]["action_ms"])
+            response_ms.append(result["timing"]["response_ms"])
+    return action_ms, response_ms
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Gemini en streaming vs. bloqueante")
+    parser.add_argument("--corpus", default=str(DEFAULT_CORPUS))
+    parser.add_argument("--limit", type=int, default=20, help="Comandos del corpus")
+    parser.add_argument("--latency-ms", type=float, default=300.0)
+    parser.add_argument("--chunk-chars", type=int, default=16)
+    parser.add_argument("--chunk-ms", type=float, default=20.0)
+    args = parser.parse_args()
+
+    with open(args.corpus, encoding="utf-8") as f:
+        commands = [json.loads(line)["text"] for line in f if line.strip()]
+    commands = commands[: args.limit]
+
+    server = MockGeminiServer(
+        latency_ms=args.latency_ms,
+        stream_chunk_chars=args.chunk_chars,
+        stream_chunk_ms=args.chunk_ms,
+    ).start()
+    Config.GEMINI_BASE_URL = server.url
+    Config.GEMINI_API_KEY = Config.GEMINI_API_KEY or "mock"
+    try:
+        from gemini_engine import GeminiEngine
+
+        with contextlib.redirect_stdout(io.StringIO()):
+            engine = GeminiEngine()
+        engine.local_parser = None
+        engine.cache = None
+
+        results = {
+            "bloqueante": run_blocking(engine, commands),
+            "streaming": run_streaming(engine, commands),
+        }
+    except (ImportError, ValueError) as e:
+        print(f"❌ {e}")
+        return 1
+    finally:
+        server.stop()
+
+    print("\n" + "=" * 70)
+    print(
+        f"📶 GEMINI STREAMING ({len(commands)} comandos, mock {args.latency_ms:.0f} ms "
+        f"+ {args.chunk_ms:.0f} ms/{args.chunk_chars} caracteres)"
+    )
+    print("=" * 70)
+    print(
+        f"{'Modo':12} {'acción p50':>11} {'acción p95':>11} {'resp. p50':>10} {'resp. p95':>10}"
+    )
+    for name, (action_ms, response_ms) in results.items():
+        if not action_ms:
+            print(f"{name:12} sin resultados")
+            continue
+        a, r = percentiles(action_ms), percentiles(response_ms)
+        print(
+            f"{name:12} {a['p50_ms']:11.0f} {a['p95_ms']:11.0f} "
+            f"{r['p50_ms']:10.0f} {r['p95_ms']:10.0f}"
+        )
+    print("\nTiempos en ms desde la llamada a GeminiEngine.")
+    print("=" * 70 + "\n")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,113 @@
+#!/usr/bin/env python3
+"""
+Benchmark de asignaciones por inferencia: set_tensor/get_tensor vs InferenceSession
+Compara el camino anterior (np.pad + np.newaxis + astype + set_tensor +
+get_tensor) con InferenceSession, que escribe en el buffer del tensor de
+entrada y lee la salida en su sitio. Mide memoria asignada (tracemalloc) y
+latencia en estado estacionario.
+"""
+
+import argparse
+import sys
+import time
+import tracemalloc
+from pathlib import Path
+
+import numpy as np
+
+sys.path.insert(0, str(Path(__file__).parent.parent / "r-pi"))
+
+from tflite_backend import InferenceSession, create_interpreter
+
+MFCC_COUNT = 40
+MAX_PADDING_LENGTH = 40
+N_FRAMES = 32  # Frames MFCC de 1s a 16 kHz con hop 512
+ITERATIONS = 500
+
+
+def legacy_inference(interpreter, input_details, output_details, mfccs):
+    """Camino anterior de InferenceThread (copias y arrays nuevos por inferencia)"""
+    padded = np.pad(mfccs, pad_width=((0, 0), (0, MAX_PADDING_LENGTH - mfccs.shape[1])))
+    features = padded[np.newaxis, ..., np.newaxis].astype(np.float32)
+    if input_details[0]["dtype"] == np.int8:
+        scale, zero_point = input_details[0]["quantization"]
+        features = np.clip(np.round(features / scale + zero_point), -128, 127)
+        features = features.astype(np.int8)
+    interpreter.set_tensor(input_details[0]["index"], features)
+    interpreter.invoke()
+    return interpreter.get_tensor(output_details[0]["index"])[0][0]
+
+
+def measure(step):
+    """Retorna (us por inferencia, pico de bytes asignados, bytes retenidos)"""
+    for _ in range(20):
+        step()
+
+    start = time.perf_counter()
+    for _ in range(ITERATIONS):
+        step()
+    elapsed = (time.perf_counter() - start) / ITERATIONS
+
+    tracemalloc.start()
+    baseline, _ = tracemalloc.get_traced_memory()
+    tracemalloc.reset_peak()
+    for _ in range(ITERATIONS):
+        step()
+    current, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    return elapsed * 1e6, peak - baseline, current - baseline
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark de InferenceSession")
+    parser.add_argument(
+        "--model",
+        default="jeepy_kws_model_quantized.tflite",
+        help="Modelo TFLite KWS a evaluar",
+    )
+    parser.add_argument("--threads", type=int, default=None)
+    args = parser.parse_args()
+
+    if not Path(args.model).exists():
+        print(f"❌ Modelo no encontrado: {args.model}")
+        return 1
+
+    interpreter, info = create_interpreter(args.model, num_threads=args.threads)
+    print(f"✅ Intérprete: {info}")
+
+    input_details = interpreter.get_input_details()
+    output_details = interpreter.get_output_details()
+    session = InferenceSession(interpreter)
+
+    rng = np.random.default_rng(0)
+    mfccs = rng.standard_normal((MFCC_COUNT, N_FRAMES)).astype(np.float32)
+    features = np.zeros((1, MFCC_COUNT, MAX_PADDING_LENGTH, 1), dtype=np.float32)
+    features[0, :, :N_FRAMES, 0] = mfccs
+
+    variants = {
+        "set_tensor": lambda: legacy_inference(
+            interpreter, input_details, output_details, mfccs
+        ),
+        "InferenceSession": lambda: session.run(features),
+    }
+
+    print("\n" + "=" * 70)
+    print(f"⏱️  BENCHMARK INFERENCIA ({ITERATIONS} inferencias, {args.model})")
+    print("=" * 70)
+    print(f"{'Variante':18} {'us/inf':>10} {'pico asignado':>15} {'retenido':>10}")
+    for name, step in variants.items():
+        us, peak, retained = measure(step)
+        print(f"{name:18} {us:10.1f} {peak:12d} B {retained:8d} B")
+
+    print(
+        f"\nTensor de entrada: {features.nbytes} B por copia; "
+        "un pico por debajo de ese tamaño indica que no hay arrays de datos "
+        "nuevos por inferencia (sólo cabeceras de vistas)."
+    )
+    print("=" * 70 + "\n")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
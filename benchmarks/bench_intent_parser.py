@@ -0,0 +1,128 @@
+#!/usr/bin/env python3
+"""
+Benchmark del parser de intención local (intent_parser.py)
+Evalúa un corpus etiquetado de comandos en español: tasa de aciertos locales
+(comandos que no irían a Gemini), precisión de esos aciertos (acción y
+parámetros exactos), latencia del parser y latencia de Gemini ahorrada.
+
+Formato del corpus (JSONL):
+    {"text": "Bloquea todas las puertas", "action": "control_cerraduras",
+     "parameters": {"accion": "bloquear", "puertas": "todas"}}
+"""
+
+import argparse
+import json
+import sys
+import time
+from pathlib import Path
+
+import numpy as np
+
+ROOT_DIR = Path(__file__).parent.parent
+sys.path.insert(0, str(ROOT_DIR))
+
+from intent_parser import LocalIntentParser
+
+DEFAULT_CORPUS = Path(__file__).parent / "intent_corpus.jsonl"
+
+
+def load_corpus(path):
+    with open(path, encoding="utf-8") as f:
+        return [json.loads(line) for line in f if line.strip()]
+
+
+def evaluate(parser, corpus, runs=200):
+    """
+    Returns:
+        (reporte, lista de (ejemplo, resultado local o None))
+    """
+    outcomes = [(item, parser.interpret(item["text"])) for item in corpus]
+
+    times = []
+    for _ in range(runs):
+        for item in corpus:
+            start = time.perf_counter()
+            parser.parse(item["text"])
+            times.append(time.perf_counter() - start)
+
+    hits = [(item, result) for item, result in outcomes if result]
+    correct = sum(
+        result["action"] == item["action"]
+        and result["parameters"] == item["parameters"]
+        for item, result in hits
+    )
+    times_us = np.array(times) * 1e6
+    return {
+        "commands": len(corpus),
+        "local_hits": len(hits),
+        "hit_rate": len(hits) / len(corpus),
+        "precision": correct / len(hits) if hits else None,
+        "parse_p50_us": float(np.percentile(times_us, 50)),
+        "parse_p99_us": float(np.percentile(times_us, 99)),
+    }, outcomes
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark del parser de intención")
+    parser.add_argument("--corpus", default=str(DEFAULT_CORPUS))
+    parser.add_argument("--min-confidence", type=float, default=0.85)
+    parser.add_argument(
+        "--gemini-latency-ms",
+        type=float,
+        default=800.0,
+        help="Latencia de Gemini supuesta para estimar el ahorro",
+    )
+    parser.add_argument("--runs", type=int, default=200)
+    parser.add_argument(
+        "--verbose", action="store_true", help="Mostrar cada comando y su resultado"
+    )
+    args = parser.parse_args()
+
+    corpus = load_corpus(args.corpus)
+    report, outcomes = evaluate(
+        LocalIntentParser(args.min_confidence), corpus, args.runs
+    )
+
+    print("\n" + "=" * 70)
+    print(f"⚡ PARSER DE INTENCIÓN LOCAL ({report['commands']} comandos)")
+    print("=" * 70)
+    if args.verbose:
+        for item, result in outcomes:
+            if result is None:
+                print(f"   ↗️  Gemini   {item['text']}")
+                continue
+            ok = (
+                result["action"] == item["action"]
+                and result["parameters"] == item["parameters"]
+            )
+            print(f"   {'✅' if ok else '❌'} local    {item['text']}")
+            if not ok:
+                print(f"      esperado: {item['action']} {item['parameters']}")
+                print(f"      obtenido: {result['action']} {result['parameters']}")
+        print()
+
+    precision = report["precision"]
+    saved_s = report["local_hits"] * args.gemini_latency_ms / 1000
+    print(
+        f"Aciertos locales: {report['local_hits']}/{report['commands']} "
+        f"({report['hit_rate'] * 100:.1f}%)"
+    )
+    print(
+        f"Precisión local:  {precision * 100:.1f}%"
+        if precision is not None
+        else "Precisión local:  n/a"
+    )
+    print(
+        f"Latencia parser:  p50 {report['parse_p50_us']:.1f} us | "
+        f"p99 {report['parse_p99_us']:.1f} us"
+    )
+    print(
+        f"Ahorro estimado:  {saved_s:.1f}s de Gemini en el corpus "
+        f"({args.gemini_latency_ms:.0f} ms por petición)"
+    )
+    print("=" * 70 + "\n")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
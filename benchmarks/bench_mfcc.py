@@ -0,0 +1,109 @@
+#!/usr/bin/env python3
+"""
+Benchmark del frontend MFCC
+Mide tiempo de arranque (import + primera ventana) y latencia por ventana de
+librosa, el MFCC NumPy por ventana completa y el extractor incremental.
+"""
+
+import subprocess
+import sys
+import time
+from pathlib import Path
+
+import numpy as np
+
+R_PI_DIR = Path(__file__).parent.parent / "r-pi"
+sys.path.insert(0, str(R_PI_DIR))
+
+import mfcc_frontend
+from mfcc_frontend import StreamingMFCC
+from ring_buffer import RingBuffer
+
+SAMPLE_RATE = 16000
+MFCC_COUNT = 40
+WINDOW_SIZE = 16000
+STRIDE_SIZE = 4096
+ITERATIONS = 200
+
+STARTUP_SNIPPETS = {
+    "librosa": (
+        "import numpy as np, librosa;"
+        "librosa.feature.mfcc(y=np.zeros(16000, np.float32), sr=16000, n_mfcc=40)"
+    ),
+    "mfcc_frontend": (
+        f"import sys; sys.path.insert(0, {str(R_PI_DIR)!r});"
+        "import numpy as np, mfcc_frontend;"
+        "mfcc_frontend.mfcc(np.zeros(16000, np.float32), 16000, n_mfcc=40)"
+    ),
+}
+
+
+def measure_startup(snippet):
+    """Tiempo de un proceso nuevo que importa y calcula una ventana"""
+    start = time.perf_counter()
+    result = subprocess.run([sys.executable, "-c", snippet], capture_output=True)
+    elapsed = time.perf_counter() - start
+    return elapsed if result.returncode == 0 else None
+
+
+def percentile_ms(samples, q):
+    return float(np.percentile(samples, q)) * 1000
+
+
+def measure_windows(compute, audio):
+    """Reproduce el audio por strides y mide cada llamada a compute()"""
+    ring = RingBuffer(WINDOW_SIZE, SAMPLE_RATE)
+    times = []
+    for i in range(ITERATIONS):
+        ring.write(audio[i * STRIDE_SIZE : (i + 1) * STRIDE_SIZE])
+        start = time.perf_counter()
+        compute(ring.get_window(), ring.total_written)
+        times.append(time.perf_counter() - start)
+    return times
+
+
+def main():
+    print("\n" + "=" * 70)
+    print("⏱️  BENCHMARK FRONTEND MFCC")
+    print("=" * 70)
+
+    print("\n🚀 Arranque (proceso nuevo: import + primera ventana)")
+    for name, snippet in STARTUP_SNIPPETS.items():
+        elapsed = measure_startup(snippet)
+        if elapsed is None:
+            print(f"   {name:16} no disponible")
+        else:
+            print(f"   {name:16} {elapsed * 1000:8.1f} ms")
+
+    rng = np.random.default_rng(0)
+    audio = (0.05 * rng.standard_normal(ITERATIONS * STRIDE_SIZE)).astype(np.float32)
+
+    variants = {}
+    try:
+        import librosa
+
+        variants["librosa"] = lambda w, _: librosa.feature.mfcc(
+            y=w, sr=SAMPLE_RATE, n_mfcc=MFCC_COUNT
+        )
+    except ImportError:
+        pass
+
+    variants["numpy (ventana)"] = lambda w, _: mfcc_frontend.mfcc(
+        w, SAMPLE_RATE, n_mfcc=MFCC_COUNT
+    )
+    streaming = StreamingMFCC(SAMPLE_RATE, WINDOW_SIZE, n_mfcc=MFCC_COUNT)
+    variants["numpy (streaming)"] = streaming.compute
+
+    print(f"\n📈 Latencia por ventana ({ITERATIONS} strides de {STRIDE_SIZE})")
+    print(f"   {'Variante':20} {'p50 ms':>8} {'p95 ms':>8} {'media ms':>9}")
+    for name, compute in variants.items():
+        times = measure_windows(compute, audio)
+        print(
+            f"   {name:20} {percentile_ms(times, 50):8.3f} {percentile_ms(times, 95):8.3f} {np.mean(times) * 1000:9.3f}"
+        )
+
+    print("=" * 70 + "\n")
+
+
+if __name__ == "__main__":
+    main()
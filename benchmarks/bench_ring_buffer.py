@@ -0,0 +1,91 @@
+#!/usr/bin/env python3
+"""
+Micro-benchmark: np.roll vs RingBuffer espejado
+Mide tiempo y memoria asignada por stride para los buffers del monitor KWS
+(ventana deslizante de 1s y buffer pre-activación de 2.5s).
+"""
+
+import sys
+import time
+import tracemalloc
+from pathlib import Path
+
+import numpy as np
+
+sys.path.insert(0, str(Path(__file__).parent.parent / "r-pi"))
+
+from ring_buffer import RingBuffer
+
+SAMPLE_RATE = 16000
+STRIDE_SIZE = 4096
+BUFFER_SIZES = {
+    "ventana 1.0s": 16000,
+    "pre-activación 2.5s": 40000,
+}
+ITERATIONS = 2000
+
+
+class RollBuffer:
+    """Implementación anterior basada en np.roll (referencia)"""
+
+    def __init__(self, size):
+        self.buffer = np.zeros(size, dtype=np.float32)
+
+    def write(self, samples):
+        self.buffer = np.roll(self.buffer, -len(samples))
+        self.buffer[-len(samples) :] = samples
+
+    def get_window(self):
+        return self.buffer
+
+
+def measure(buffer, strides):
+    """Retorna (us por stride, bytes asignados por stride)"""
+    # Calentamiento
+    for chunk in strides[:10]:
+        buffer.write(chunk)
+        buffer.get_window()
+
+    start = time.perf_counter()
+    for chunk in strides:
+        buffer.write(chunk)
+        buffer.get_window()
+    elapsed = time.perf_counter() - start
+
+    tracemalloc.start()
+    tracemalloc.reset_peak()
+    for chunk in strides[:100]:
+        buffer.write(chunk)
+        buffer.get_window()
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    return elapsed / len(strides) * 1e6, peak
+
+
+def main():
+    rng = np.random.default_rng(0)
+    strides = [
+        rng.standard_normal(STRIDE_SIZE).astype(np.float32) for _ in range(ITERATIONS)
+    ]
+
+    print("\n" + "=" * 70)
+    print(f"⏱️  BENCHMARK BUFFER CIRCULAR (stride={STRIDE_SIZE}, n={ITERATIONS})")
+    print("=" * 70)
+    print(
+        f"{'Buffer':22} {'Implementación':14} {'us/stride':>10} {'pico asignado':>15}"
+    )
+
+    for name, size in BUFFER_SIZES.items():
+        for label, buffer in (
+            ("np.roll", RollBuffer(size)),
+            ("RingBuffer", RingBuffer(size, SAMPLE_RATE)),
+        ):
+            us, peak = measure(buffer, strides)
+            print(f"{name:22} {label:14} {us:10.2f} {peak / 1024:12.1f} KB")
+
+    print("=" * 70 + "\n")
+
+
+if __name__ == "__main__":
+    main()
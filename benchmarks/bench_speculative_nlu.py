@@ -0,0 +1,134 @@
+#!/usr/bin/env python3
+"""
+Benchmark de NLU especulativa (speculative_nlu.py)
+Reproduce cada comando del corpus como parciales de STT palabra a palabra
+(--word-ms) seguidos del silencio hasta el cierre de la transcripción
+(--endpoint-ms, sondeando cada --poll-ms) y mide el tiempo desde el texto
+final hasta la interpretación, con y sin especulación, contra el mock local
+con el parser local y la caché desactivados.
+
+--revision-rate simula transcripciones finales que corrigen la última
+palabra (la especulación debe descartarse).
+"""
+
+import argparse
+import contextlib
+import io
+import json
+import random
+import sys
+import time
+from pathlib import Path
+
+import numpy as np
+
+ROOT_DIR = Path(__file__).parent.parent
+sys.path.insert(0, str(ROOT_DIR))
+sys.path.insert(0, str(Path(__file__).parent))
+
+from config import Config
+from mock_gemini import MockGeminiServer
+
+DEFAULT_CORPUS = Path(__file__).parent / "intent_corpus.jsonl"
+
+
+def replay(speculator, engine, text, final_text, args):
+    """Parciales -> texto final; retorna ms desde el final hasta la interpretación"""
+    words = text.split()
+    if speculator:
+        speculator.reset()
+    for i in range(1, len(words) + 1):
+        if speculator:
+            speculator.observe(" ".join(words[:i]))
+        time.sleep(args.word_ms / 1000)
+    for _ in range(int(args.endpoint_ms / args.poll_ms)):
+        if speculator:
+            speculator.observe(text)
+        time.sleep(args.poll_ms / 1000)
+
+    start = time.perf_counter()
+    with contextlib.redirect_stdout(io.StringIO()):
+        result = speculator.resolve(final_text) if speculator else None
+        if result is None:
+            result = engine.process_command(final_text)
+    return (time.perf_counter() - start) * 1000 if result else None
+
+
+def main():
+    parser = argparse.ArgumentParser(description="NLU especulativa sobre parciales")
+    parser.add_argument("--corpus", default=str(DEFAULT_CORPUS))
+    parser.add_argument("--limit", type=int, default=20, help="Comandos del corpus")
+    parser.add_argument("--latency-ms", type=float, default=600.0)
+    parser.add_argument("--word-ms", type=float, default=250.0)
+    parser.add_argument("--endpoint-ms", type=float, default=800.0)
+    parser.add_argument("--poll-ms", type=float, default=50.0)
+    parser.add_argument("--revision-rate", type=float, default=0.1)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    with open(args.corpus, encoding="utf-8") as f:
+        commands = [json.loads(line)["text"] for line in f if line.strip()]
+    commands = commands[: args.limit]
+    rng = random.Random(args.seed)
+    finals = [
+        f"{text} también" if rng.random() < args.revision_rate else text
+        for text in commands
+    ]
+
+    server = MockGeminiServer(latency_ms=args.latency_ms).start()
+    Config.GEMINI_BASE_URL = server.url
+    Config.GEMINI_API_KEY = Config.GEMINI_API_KEY or "mock"
+    try:
+        from gemini_engine import GeminiEngine
+        from speculative_nlu import SpeculativeNLU
+
+        with contextlib.redirect_stdout(io.StringIO()):
+            engine = GeminiEngine()
+        engine.local_parser = None
+        engine.cache = None
+        speculator = SpeculativeNLU(engine)
+
+        results = {}
+        for name, spec in (("secuencial", None), ("especulativa", speculator)):
+            times = [
+                replay(spec, engine, text, final, args)
+                for text, final in zip(commands, finals)
+            ]
+            results[name] = [t for t in times if t is not None]
+        stats = speculator.stats()
+        speculator.shutdown()
+    except (ImportError, ValueError) as e:
+        print(f"❌ {e}")
+        return 1
+    finally:
+        server.stop()
+
+    print("\n" + "=" * 70)
+    print(
+        f"🔮 NLU ESPECULATIVA ({len(commands)} comandos, mock {args.latency_ms:.0f} ms, "
+        f"cierre STT {args.endpoint_ms:.0f} ms)"
+    )
+    print("=" * 70)
+    print(f"{'Modo':14} {'p50 ms':>8} {'p95 ms':>8}")
+    for name, times in results.items():
+        if not times:
+            print(f"{name:14} sin resultados")
+            continue
+        print(
+            f"{name:14} {np.percentile(times, 50):8.0f} {np.percentile(times, 95):8.0f}"
+        )
+    print(
+        f"\nEspeculaciones: {stats['speculations']} | aciertos {stats['hits']} | "
+        f"descartadas {stats['misses']} ({stats['hit_rate'] * 100:.0f}% acierto)"
+    )
+    print(
+        f"Latencia ahorrada: {stats['saved_mean_ms']:.0f} ms por acierto "
+        f"({stats['saved_ms'] / 1000:.1f}s en total)"
+    )
+    print("\nTiempos en ms desde la transcripción final hasta la interpretación.")
+    print("=" * 70 + "\n")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
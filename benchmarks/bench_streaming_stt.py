@@ -0,0 +1,124 @@
+#!/usr/bin/env python3
+"""
+Benchmark de latencia STT: lote vs streaming
+Reproduce comandos grabados en tiempo real (chunks de 256 ms, como el
+micrófono) y mide la latencia desde el fin de habla hasta el texto final en
+ambos modos del CommandPipeline con el motor STT configurado.
+"""
+
+import argparse
+import sys
+import time
+import wave
+from pathlib import Path
+
+import numpy as np
+
+ROOT_DIR = Path(__file__).parent.parent
+sys.path.insert(0, str(ROOT_DIR))
+
+from command_pipeline import CommandPipeline
+from config import Config
+
+SAMPLE_RATE = 16000
+STRIDE_SIZE = 4096  # Igual que STRIDE_SIZE del monitor KWS (256 ms)
+
+
+def load_wav(path):
+    """Lee un WAV mono 16-bit 16 kHz como float32"""
+    with wave.open(str(path), "rb") as wf:
+        pcm = np.frombuffer(wf.readframes(wf.getnframes()), dtype=np.int16)
+    return pcm.astype(np.float32) / 32768.0
+
+
+def replay(audio, on_chunk, realtime=True):
+    """Entrega el audio por chunks al ritmo del micrófono"""
+    chunk_duration = STRIDE_SIZE / SAMPLE_RATE
+    start = time.perf_counter()
+    for i, offset in enumerate(range(0, len(audio), STRIDE_SIZE)):
+        on_chunk(audio[offset : offset + STRIDE_SIZE])
+        if realtime:
+            delay = start + (i + 1) * chunk_duration - time.perf_counter()
+            if delay > 0:
+                time.sleep(delay)
+
+
+def run_batch(pipeline, audio, realtime):
+    replay(audio, lambda chunk: None, realtime)
+    pipeline.submit(audio, len(audio) / SAMPLE_RATE, sample_rate=SAMPLE_RATE)
+    return pipeline.results.get()
+
+
+def run_streaming(pipeline, audio, realtime):
+    job = pipeline.start_stream(SAMPLE_RATE)
+    replay(audio, lambda chunk: pipeline.feed(job, chunk), realtime)
+    pipeline.finish_stream(job, len(audio) / SAMPLE_RATE)
+    return pipeline.results.get()
+
+
+def summarize(latencies):
+    return (
+        float(np.percentile(latencies, 50)) * 1000,
+        float(np.percentile(latencies, 95)) * 1000,
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Latencia STT lote vs streaming")
+    parser.add_argument(
+        "files", nargs="*", help="WAVs a reproducir (por defecto captured_commands/)"
+    )
+    parser.add_argument("--limit", type=int, default=10)
+    parser.add_argument(
+        "--no-realtime",
+        action="store_true",
+        help="Entregar el audio sin esperar (mide sólo cómputo)",
+    )
+    args = parser.parse_args()
+
+    files = [Path(f) for f in args.files] or sorted(
+        (ROOT_DIR / "captured_commands").glob("*.wav")
+    )
+    files = files[: args.limit]
+    if not files:
+        print("❌ No hay archivos WAV para reproducir")
+        return 1
+
+    realtime = not args.no_realtime
+    pipeline = CommandPipeline(use_processes=False, streaming=True)
+    if not pipeline.streaming:
+        print("❌ El pipeline no pudo habilitar streaming")
+        return 1
+
+    print("\n" + "=" * 70)
+    print(f"⏱️  LATENCIA STT: LOTE vs STREAMING ({Config.STT_ENGINE})")
+    print("=" * 70)
+
+    latencies = {"batch": [], "streaming": []}
+    for path in files:
+        audio = load_wav(path)
+        batch = run_batch(pipeline, audio, realtime)
+        stream = run_streaming(pipeline, audio, realtime)
+        latencies["batch"].append(batch.stt_latency)
+        latencies["streaming"].append(stream.stt_latency)
+        print(
+            f"{path.name:32} {len(audio) / SAMPLE_RATE:5.2f}s | "
+            f"lote {batch.stt_latency * 1000:7.0f} ms | "
+            f"streaming {stream.stt_latency * 1000:7.0f} ms"
+        )
+        if batch.transcription != stream.transcription:
+            print(f"   lote:      {batch.transcription!r}")
+            print(f"   streaming: {stream.transcription!r}")
+
+    print("\nFin de habla -> texto final:")
+    for mode, values in latencies.items():
+        p50, p95 = summarize(values)
+        print(f"  {mode:10} p50 {p50:8.1f} ms | p95 {p95:8.1f} ms")
+    print("=" * 70 + "\n")
+
+    pipeline.shutdown(wait=True)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
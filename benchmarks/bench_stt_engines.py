@@ -0,0 +1,187 @@
+#!/usr/bin/env python3
+"""
+Benchmark de motores STT locales: openai-whisper vs faster-whisper int8
+Transcribe el corpus de captured_commands con cada motor en un subproceso
+aislado y reporta tiempo de carga, factor de tiempo real (RTF), RSS pico y
+WER. La referencia de cmd_X.wav es cmd_X.txt en el mismo directorio (texto
+plano); los archivos sin referencia no cuentan para el WER.
+"""
+
+import argparse
+import json
+import os
+import re
+import resource
+import subprocess
+import sys
+import time
+import wave
+from pathlib import Path
+
+import numpy as np
+
+ROOT_DIR = Path(__file__).parent.parent
+sys.path.insert(0, str(ROOT_DIR))
+
+DEFAULT_ENGINES = ["whisper_local", "faster_whisper"]
+
+
+def normalize_text(text):
+    """Minúsculas y sin puntuación (conserva acentos y ñ)"""
+    return re.sub(r"[^\w\s]", " ", text.lower()).split()
+
+
+def word_errors(reference, hypothesis):
+    """Distancia de Levenshtein por palabras: retorna (errores, palabras ref)"""
+    ref = normalize_text(reference)
+    hyp = normalize_text(hypothesis or "")
+    row = list(range(len(hyp) + 1))
+    for i, ref_word in enumerate(ref, 1):
+        prev, row[0] = row[0], i
+        for j, hyp_word in enumerate(hyp, 1):
+            prev, row[j] = row[j], min(
+                row[j] + 1, row[j - 1] + 1, prev + (ref_word != hyp_word)
+            )
+    return row[-1], len(ref)
+
+
+def audio_duration(path):
+    with wave.open(str(path), "rb") as wf:
+        return wf.getnframes() / wf.getframerate()
+
+
+def run_worker(engine, files):
+    """Subproceso: carga el motor, transcribe y emite un JSON por stdout"""
+    os.environ["STT_ENGINE"] = engine
+    from stt_engine import STTManager
+
+    start = time.perf_counter()
+    # Motor propio del subproceso: sin servidor STT ni caché de transcripciones
+    manager = STTManager(use_server=False, use_cache=False)
+    load_time = time.perf_counter() - start
+
+    results = []
+    for path in files:
+        start = time.perf_counter()
+        text = manager.engine.transcribe(str(path))
+        elapsed = time.perf_counter() - start
+        results.append({"file": str(path), "text": text, "time": elapsed})
+
+    # ru_maxrss está en KB en Linux
+    peak_rss_mb = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+    print(
+        "RESULT "
+        + json.dumps(
+            {
+                "engine": type(manager.engine).__name__,
+                "load_time": load_time,
+                "peak_rss_mb": peak_rss_mb,
+                "results": results,
+            }
+        )
+    )
+
+
+def benchmark_engine(engine, files, references=None):
+    """
+    Lanza el subproceso del motor y agrega RTF y WER
+
+    Args:
+        engine: Nombre del motor (STT_ENGINE)
+        files: WAVs a transcribir
+        references: Texto de referencia por ruta (None = cmd_X.txt junto al WAV)
+    """
+    process = subprocess.run(
+        [sys.executable, __file__, "--worker", engine, *map(str, files)],
+        capture_output=True,
+        text=True,
+    )
+    lines = [l for l in process.stdout.splitlines() if l.startswith("RESULT ")]
+    if not lines:
+        print(f"❌ {engine} falló:\n{process.stderr.strip()[-500:]}")
+        return None
+
+    data = json.loads(lines[-1][len("RESULT ") :])
+    total_audio = total_time = 0.0
+    errors = ref_words = 0
+    for r in data["results"]:
+        path = Path(r["file"])
+        total_audio += audio_duration(path)
+        total_time += r["time"]
+        if references is not None:
+            reference = references.get(str(path))
+        elif path.with_suffix(".txt").exists():
+            reference = path.with_suffix(".txt").read_text(encoding="utf-8")
+        else:
+            reference = None
+        if reference:
+            e, n = word_errors(reference, r["text"])
+            errors += e
+            ref_words += n
+
+    times = [r["time"] for r in data["results"]]
+    return {
+        "engine": engine,
+        "class": data["engine"],
+        "load_time_s": data["load_time"],
+        "peak_rss_mb": data["peak_rss_mb"],
+        "rtf": total_time / total_audio if total_audio else None,
+        "latency_p50_ms": float(np.percentile(times, 50)) * 1000,
+        "latency_p95_ms": float(np.percentile(times, 95)) * 1000,
+        "latency_p99_ms": float(np.percentile(times, 99)) * 1000,
+        "wer": errors / ref_words if ref_words else None,
+        "files": len(data["results"]),
+        "transcriptions": {Path(r["file"]).name: r["text"] for r in data["results"]},
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark de motores STT locales")
+    parser.add_argument(
+        "files", nargs="*", help="WAVs (por defecto captured_commands/)"
+    )
+    parser.add_argument("--engines", nargs="+", default=DEFAULT_ENGINES)
+    parser.add_argument("--output", help="Guardar resultados en JSON")
+    parser.add_argument("--worker", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    files = [Path(f) for f in args.files] or sorted(
+        (ROOT_DIR / "captured_commands").glob("*.wav")
+    )
+    if args.worker:
+        run_worker(args.worker, files)
+        return 0
+
+    if not files:
+        print("❌ No hay archivos WAV en captured_commands/")
+        return 1
+
+    print("\n" + "=" * 70)
+    print(f"🎤 BENCHMARK STT LOCAL ({len(files)} archivos)")
+    print("=" * 70)
+
+    report = [r for r in (benchmark_engine(e, files) for e in args.engines) if r]
+
+    print(
+        f"\n{'Motor':16} {'Carga s':>8} {'RSS pico MB':>12} {'RTF':>6} {'p50 ms':>8} {'p95 ms':>8} {'WER':>7}"
+    )
+    for r in report:
+        wer = f"{r['wer'] * 100:6.1f}%" if r["wer"] is not None else "    n/a"
+        print(
+            f"{r['engine']:16} {r['load_time_s']:8.2f} {r['peak_rss_mb']:12.1f} "
+            f"{r['rtf']:6.2f} {r['latency_p50_ms']:8.0f} {r['latency_p95_ms']:8.0f} {wer}"
+        )
+    print(
+        "\nRTF < 1 = más rápido que tiempo real. WER requiere cmd_X.txt de referencia."
+    )
+    print("=" * 70 + "\n")
+
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2, ensure_ascii=False)
+        print(f"💾 Resultados guardados en: {args.output}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
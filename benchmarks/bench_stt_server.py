@@ -0,0 +1,150 @@
+#!/usr/bin/env python3
+"""
+Benchmark del servidor STT persistente: arranque en frío vs petición caliente
+Frío: un proceso nuevo carga el motor (STTManager sin servidor) y transcribe
+una vez, como hacían test_stt.py o kws_monitor.py. Caliente: el mismo audio
+se envía al servidor por el socket Unix; se separa el tiempo de cómputo del
+servidor del overhead del protocolo.
+"""
+
+import argparse
+import os
+import subprocess
+import sys
+import time
+import wave
+from pathlib import Path
+
+import numpy as np
+
+ROOT_DIR = Path(__file__).parent.parent
+sys.path.insert(0, str(ROOT_DIR))
+
+from config import Config
+from stt_engine import STTServerClient, stt_server_available
+
+COLD_SNIPPET = (
+    "import sys, time; start = time.perf_counter();"
+    f"sys.path.insert(0, {str(ROOT_DIR)!r});"
+    "from stt_engine import STTManager;"
+    "m = STTManager(use_server=False); loaded = time.perf_counter();"
+    "m.engine.transcribe(sys.argv[1]); done = time.perf_counter();"
+    "print(f'COLD {loaded - start} {done - start}')"
+)
+
+
+def load_pcm(path):
+    with wave.open(str(path), "rb") as wf:
+        return np.frombuffer(wf.readframes(wf.getnframes()), dtype=np.int16)
+
+
+def measure_cold(path, runs):
+    """Retorna listas (carga del motor, carga + primera transcripción)"""
+    loads, totals = [], []
+    for _ in range(runs):
+        process = subprocess.run(
+            [sys.executable, "-c", COLD_SNIPPET, str(path)],
+            capture_output=True,
+            text=True,
+            env={**os.environ, "STT_USE_SERVER": "false"},
+        )
+        line = [l for l in process.stdout.splitlines() if l.startswith("COLD ")]
+        if not line:
+            print(f"❌ Arranque en frío falló:\n{process.stderr.strip()[-500:]}")
+            return None, None
+        load, total = map(float, line[-1].split()[1:])
+        loads.append(load)
+        totals.append(total)
+    return loads, totals
+
+
+def start_server(timeout=300):
+    """Lanza stt_server.py y espera a que el socket acepte conexiones"""
+    process = subprocess.Popen(
+        [sys.executable, str(ROOT_DIR / "stt_server.py")],
+        stdout=subprocess.DEVNULL,
+        stderr=subprocess.DEVNULL,
+    )
+    deadline = time.time() + timeout
+    while time.time() < deadline:
+        if stt_server_available():
+            return process
+        if process.poll() is not None:
+            break
+        time.sleep(0.2)
+    process.terminate()
+    return None
+
+
+def fmt(values):
+    return (
+        f"p50 {np.percentile(values, 50) * 1000:9.1f} ms | "
+        f"p95 {np.percentile(values, 95) * 1000:9.1f} ms"
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Servidor STT: frío vs caliente")
+    parser.add_argument("file", nargs="?", help="WAV de prueba")
+    parser.add_argument("--cold-runs", type=int, default=3)
+    parser.add_argument("--warm-runs", type=int, default=20)
+    args = parser.parse_args()
+
+    path = Path(args.file) if args.file else None
+    if path is None:
+        candidates = sorted((ROOT_DIR / "captured_commands").glob("*.wav"))
+        path = candidates[-1] if candidates else None
+    if path is None or not path.exists():
+        print("❌ Indica un WAV de prueba (o graba comandos en captured_commands/)")
+        return 1
+
+    print("\n" + "=" * 70)
+    print(f"🔌 BENCHMARK SERVIDOR STT ({Config.STT_ENGINE}, {path.name})")
+    print("=" * 70)
+
+    loads, totals = measure_cold(path, args.cold_runs)
+    if loads is None:
+        return 1
+
+    server = None
+    if not stt_server_available():
+        print("🚀 Iniciando stt_server.py...")
+        server = start_server()
+        if server is None:
+            print("❌ No se pudo iniciar el servidor STT")
+            return 1
+
+    try:
+        client = STTServerClient()
+        pcm = load_pcm(path)
+        client.transcribe(pcm)  # Primera petición (conexión ya abierta)
+
+        round_trips, service = [], []
+        for _ in range(args.warm_runs):
+            start = time.perf_counter()
+            client.transcribe(pcm)
+            round_trips.append(time.perf_counter() - start)
+            service.append(client.last_service_time)
+        overhead = np.array(round_trips) - np.array(service)
+    finally:
+        if server:
+            server.terminate()
+            server.wait()
+
+    print(f"\nFrío ({args.cold_runs} procesos nuevos):")
+    print(f"  Carga del motor:           {fmt(loads)}")
+    print(f"  Carga + transcripción:     {fmt(totals)}")
+    print(f"\nCaliente ({args.warm_runs} peticiones al servidor):")
+    print(f"  Ida y vuelta:              {fmt(round_trips)}")
+    print(f"  Cómputo en servidor:       {fmt(service)}")
+    print(f"  Overhead socket/protocolo: {fmt(overhead)}")
+    print(
+        f"\nAhorro por proceso cliente: "
+        f"{(np.median(totals) - np.median(round_trips)) * 1000:.0f} ms"
+    )
+    print("=" * 70 + "\n")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
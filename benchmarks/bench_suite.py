@@ -0,0 +1,437 @@
+#!/usr/bin/env python3
+"""
+Suite de benchmarks de extremo a extremo: MFCC -> KWS -> STT -> Gemini
+Reproduce un corpus de WAVs etiquetado por cada etapa y reporta throughput,
+latencia p50/p95/p99, factor de tiempo real (RTF), RSS pico y WER/precisión.
+Gemini se mide contra el mock local (mock_gemini.py). Los resultados se
+guardan en JSON para comparar entre commits (--output / --compare).
+
+Etiquetas del corpus (opcionales), en labels.jsonl dentro del directorio:
+    {"file": "cmd_1.wav", "text": "baja la ventana", "wake_word": true, "action": "control_ventana"}
+Sin labels.jsonl, el texto de referencia se toma de cmd_X.txt (como
+bench_stt_engines.py) y la precisión KWS/Gemini se omite.
+"""
+
+import argparse
+import contextlib
+import io
+import json
+import os
+import platform
+import resource
+import subprocess
+import sys
+import time
+import wave
+from datetime import datetime
+from pathlib import Path
+
+import numpy as np
+
+ROOT_DIR = Path(__file__).parent.parent
+sys.path.insert(0, str(ROOT_DIR))
+sys.path.insert(0, str(ROOT_DIR / "r-pi"))
+sys.path.insert(0, str(Path(__file__).parent))
+
+from config import Config
+from mfcc_frontend import StreamingMFCC
+from ring_buffer import RingBuffer
+
+# Deben coincidir con kws_monitor.py
+SAMPLE_RATE = 16000
+MFCC_COUNT = 40
+MAX_PADDING_LENGTH = 40
+WINDOW_SIZE = 16000
+STRIDE_SIZE = 4096
+ACTIVATION_THRESHOLD = 0.95
+DEFAULT_MODEL = ROOT_DIR / "r-pi" / "jeepy_kws_model_quantized.tflite"
+
+STAGES = ["mfcc", "kws", "stt", "gemini"]
+
+# Comandos de respaldo para Gemini si el corpus no tiene texto de referencia
+FALLBACK_COMMANDS = [
+    "Baja la ventana del piloto un 50%",
+    "Enciende el aire acondicionado a 20 grados",
+    "Bloquea todas las puertas",
+    "Reproduce música desde bluetooth",
+]
+
+
+def latency_stats(times):
+    """Percentiles en ms de una lista de tiempos en segundos"""
+    return {
+        "count": len(times),
+        "p50_ms": float(np.percentile(times, 50)) * 1000,
+        "p95_ms": float(np.percentile(times, 95)) * 1000,
+        "p99_ms": float(np.percentile(times, 99)) * 1000,
+        "mean_ms": float(np.mean(times)) * 1000,
+    }
+
+
+def peak_rss_mb():
+    """RSS pico del proceso (ru_maxrss está en KB en Linux)"""
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+def git_revision():
+    try:
+        commit = subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"],
+            cwd=ROOT_DIR,
+            capture_output=True,
+            text=True,
+        ).stdout.strip()
+        dirty = subprocess.run(
+            ["git", "status", "--porcelain", "--untracked-files=no"],
+            cwd=ROOT_DIR,
+            capture_output=True,
+            text=True,
+        ).stdout.strip()
+    except OSError:
+        return None
+    return f"{commit}{'-dirty' if dirty else ''}" if commit else None
+
+
+def load_corpus(files):
+    """
+    Carga los WAVs y sus etiquetas
+
+    Returns:
+        Lista de dicts: path, audio (float32), duration, text, wake_word, action
+    """
+    labels = {}
+    for directory in {f.parent for f in files}:
+        manifest = directory / "labels.jsonl"
+        if manifest.exists():
+            for line in manifest.read_text(encoding="utf-8").splitlines():
+                if line.strip():
+                    entry = json.loads(line)
+                    labels[str(directory / entry["file"])] = entry
+
+    corpus = []
+    for path in files:
+        with wave.open(str(path), "rb") as wf:
+            if wf.getframerate() != SAMPLE_RATE or wf.getnchannels() != 1:
+                print(f"⚠️  {path.name}: se requiere mono {SAMPLE_RATE} Hz, omitido")
+                continue
+            pcm = np.frombuffer(wf.readframes(wf.getnframes()), dtype=np.int16)
+
+        label = labels.get(str(path), {})
+        text = label.get("text")
+        if text is None and path.with_suffix(".txt").exists():
+            text = path.with_suffix(".txt").read_text(encoding="utf-8").strip()
+        corpus.append(
+            {
+                "path": path,
+                "audio": pcm.astype(np.float32) / 32768.0,
+                "duration": len(pcm) / SAMPLE_RATE,
+                "text": text,
+                "wake_word": label.get("wake_word"),
+                "action": label.get("action"),
+            }
+        )
+    return corpus
+
+
+def bench_mfcc(corpus):
+    """MFCC incremental por stride, como InferenceThread; retorna (métricas, features)"""
+    frontend = StreamingMFCC(
+        SAMPLE_RATE, WINDOW_SIZE, n_mfcc=MFCC_COUNT, max_frames=MAX_PADDING_LENGTH
+    )
+    times, features = [], []
+    for item in corpus:
+        ring = RingBuffer(WINDOW_SIZE, SAMPLE_RATE)
+        frontend.reset()
+        windows = []
+        audio = item["audio"]
+        for offset in range(0, len(audio), STRIDE_SIZE):
+            ring.write(audio[offset : offset + STRIDE_SIZE])
+            if ring.total_written < WINDOW_SIZE:
+                continue
+            start = time.perf_counter()
+            output = frontend.compute(ring.get_window(), ring.total_written)
+            times.append(time.perf_counter() - start)
+            windows.append(output.copy())  # compute() reutiliza su buffer
+        features.append(windows)
+
+    if not times:
+        return {"skipped": "audios más cortos que una ventana"}, features
+    total_audio = sum(item["duration"] for item in corpus)
+    return {
+        "windows": len(times),
+        "throughput_per_s": len(times) / sum(times),
+        "rtf": sum(times) / total_audio,
+        "latency": latency_stats(times),
+        "peak_rss_mb": peak_rss_mb(),
+    }, features
+
+
+def bench_kws(corpus, features, model_path, threshold):
+    """Inferencia por ventana y detección por archivo (máximo >= umbral)"""
+    if not Path(model_path).exists():
+        return {"skipped": f"modelo no encontrado: {model_path}"}
+    try:
+        from tflite_backend import InferenceSession, create_interpreter
+
+        interpreter, info = create_interpreter(str(model_path))
+    except (ImportError, RuntimeError) as e:
+        return {"skipped": f"backend TFLite no disponible: {e}"}
+    session = InferenceSession(interpreter)
+
+    times = []
+    correct = labeled = false_accepts = false_rejects = 0
+    for item, windows in zip(corpus, features):
+        max_prob = 0.0
+        for window in windows:
+            start = time.perf_counter()
+            prob = session.run(window)
+            times.append(time.perf_counter() - start)
+            max_prob = max(max_prob, prob)
+
+        if item["wake_word"] is not None:
+            detected = max_prob >= threshold
+            labeled += 1
+            correct += detected == item["wake_word"]
+            false_accepts += detected and not item["wake_word"]
+            false_rejects += item["wake_word"] and not detected
+
+    if not times:
+        return {"skipped": "sin ventanas de features"}
+    total_audio = sum(item["duration"] for item in corpus)
+    return {
+        "backend": info.name,
+        "load_time_ms": info.load_time * 1000,
+        "inferences": len(times),
+        "throughput_per_s": len(times) / sum(times),
+        "rtf": sum(times) / total_audio,
+        "latency": latency_stats(times),
+        "accuracy": correct / labeled if labeled else None,
+        "false_accepts": false_accepts,
+        "false_rejects": false_rejects,
+        "peak_rss_mb": peak_rss_mb(),
+    }
+
+
+def bench_stt(corpus, engines):
+    """Cada motor en un subproceso aislado (ver bench_stt_engines.py)"""
+    from bench_stt_engines import benchmark_engine
+
+    files = [item["path"] for item in corpus]
+    references = {str(item["path"]): item["text"] for item in corpus if item["text"]}
+    results = {}
+    for engine in engines:
+        report = benchmark_engine(engine, files, references)
+        if report is None:
+            results[engine] = {"skipped": "el motor falló (ver stderr)"}
+            continue
+        total_time = report["rtf"] * sum(item["duration"] for item in corpus)
+        results[engine] = {
+            "class": report["class"],
+            "load_time_s": report["load_time_s"],
+            "throughput_per_s": report["files"] / total_time if total_time else None,
+            "rtf": report["rtf"],
+            "latency": {
+                "count": report["files"],
+                "p50_ms": report["latency_p50_ms"],
+                "p95_ms": report["latency_p95_ms"],
+                "p99_ms": report["latency_p99_ms"],
+            },
+            "wer": report["wer"],
+            "peak_rss_mb": report["peak_rss_mb"],
+        }
+    return results
+
+
+def bench_gemini(corpus, runs, latency_ms, jitter_ms):
+    """GeminiEngine.process_command contra el mock local"""
+    from mock_gemini import MockGeminiServer
+
+    commands = [(item["text"], item["action"]) for item in corpus if item["text"]]
+    if not commands:
+        commands = [(text, None) for text in FALLBACK_COMMANDS]
+
+    server = MockGeminiServer(latency_ms=latency_ms, jitter_ms=jitter_ms).start()
+    Config.GEMINI_BASE_URL = server.url
+    Config.GEMINI_API_KEY = Config.GEMINI_API_KEY or "mock"
+    try:
+        from gemini_engine import GeminiEngine
+
+        with contextlib.redirect_stdout(io.StringIO()):
+            engine = GeminiEngine()
+        # Medir siempre el camino de red
+        engine.local_parser = None
+        engine.cache = None
+    except (ImportError, ValueError) as e:
+        server.stop()
+        return {"skipped": str(e)}
+
+    times = []
+    correct = labeled = failures = 0
+    try:
+        for _ in range(runs):
+            for text, action in commands:
+                start = time.perf_counter()
+                with contextlib.redirect_stdout(io.StringIO()):
+                    result = engine.process_command(text)
+                times.append(time.perf_counter() - start)
+                if result is None:
+                    failures += 1
+                elif action is not None:
+                    labeled += 1
+                    correct += result.get("action") == action
+    finally:
+        server.stop()
+
+    stats = latency_stats(times)
+    return {
+        "requests": len(times),
+        "mock_latency_ms": latency_ms,
+        "mock_jitter_ms": jitter_ms,
+        "throughput_per_s": len(times) / sum(times),
+        "latency": stats,
+        "client_overhead_p50_ms": stats["p50_ms"] - latency_ms - jitter_ms / 2,
+        "failures": failures,
+        "accuracy": correct / labeled if labeled else None,
+        "peak_rss_mb": peak_rss_mb(),
+    }
+
+
+def flatten(report, prefix=""):
+    """Métricas numéricas como {"etapa.métrica": valor} para comparar"""
+    values = {}
+    for key, value in report.items():
+        name = f"{prefix}{key}"
+        if isinstance(value, dict):
+            values.update(flatten(value, name + "."))
+        elif isinstance(value, (int, float)) and not isinstance(value, bool):
+            values[name] = value
+    return values
+
+
+def print_comparison(previous, current, threshold=0.05):
+    """Imprime las métricas que cambiaron más de threshold entre dos reportes"""
+    before = flatten(previous["stages"])
+    after = flatten(current["stages"])
+    print(
+        f"\n🔍 Comparación con {previous['meta'].get('git_revision') or 'anterior'} "
+        f"(cambios > {threshold * 100:.0f}%):"
+    )
+    changed = 0
+    for name in sorted(before.keys() & after.keys()):
+        old, new = before[name], after[name]
+        if old == 0 or abs(new - old) / abs(old) <= threshold:
+            continue
+        changed += 1
+        print(f"   {name:45} {old:12.3f} -> {new:12.3f} ({(new - old) / old:+.1%})")
+    if not changed:
+        print("   Sin cambios significativos")
+
+
+def print_report(report):
+    stages = report["stages"]
+    print(
+        f"\n{'Etapa':22} {'p50 ms':>9} {'p95 ms':>9} {'p99 ms':>9} {'RTF':>7} {'/s':>9} {'RSS MB':>8}  Calidad"
+    )
+    rows = [
+        (name, stages[name]) for name in ("mfcc", "kws", "gemini") if name in stages
+    ]
+    rows += [(f"stt:{e}", r) for e, r in stages.get("stt", {}).items()]
+    rows.sort(key=lambda row: STAGES.index(row[0].split(":")[0]))
+    for name, r in rows:
+        if "skipped" in r:
+            print(f"{name:22} ⏭️  {r['skipped']}")
+            continue
+        lat = r["latency"]
+        rtf = f"{r['rtf']:7.3f}" if r.get("rtf") is not None else "    n/a"
+        quality = ""
+        if r.get("wer") is not None:
+            quality = f"WER {r['wer'] * 100:.1f}%"
+        elif r.get("accuracy") is not None:
+            quality = f"precisión {r['accuracy'] * 100:.1f}%"
+        print(
+            f"{name:22} {lat['p50_ms']:9.2f} {lat['p95_ms']:9.2f} {lat['p99_ms']:9.2f} "
+            f"{rtf} {r['throughput_per_s'] or 0:9.1f} {r['peak_rss_mb']:8.1f}  {quality}"
+        )
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Suite de benchmarks de Jeepy AI")
+    parser.add_argument(
+        "inputs", nargs="*", help="WAVs o directorios (por defecto captured_commands/)"
+    )
+    parser.add_argument("--stages", nargs="+", choices=STAGES, default=STAGES)
+    parser.add_argument(
+        "--engines", nargs="+", default=[Config.STT_ENGINE], help="Motores STT"
+    )
+    parser.add_argument("--model", default=str(DEFAULT_MODEL), help="Modelo KWS")
+    parser.add_argument("--threshold", type=float, default=ACTIVATION_THRESHOLD)
+    parser.add_argument("--gemini-runs", type=int, default=3)
+    parser.add_argument("--gemini-latency-ms", type=float, default=300.0)
+    parser.add_argument("--gemini-jitter-ms", type=float, default=0.0)
+    parser.add_argument("--output", help="Guardar resultados en JSON")
+    parser.add_argument("--compare", help="JSON de una ejecución anterior")
+    args = parser.parse_args()
+
+    inputs = [Path(p) for p in args.inputs] or [Config.CAPTURED_COMMANDS_DIR]
+    files = []
+    for path in inputs:
+        files += sorted(path.glob("*.wav")) if path.is_dir() else [path]
+    corpus = load_corpus(files)
+    if not corpus:
+        print("❌ No hay archivos WAV para el benchmark")
+        return 1
+
+    total_audio = sum(item["duration"] for item in corpus)
+    print("\n" + "=" * 70)
+    print(
+        f"📊 SUITE DE BENCHMARKS ({len(corpus)} archivos, {total_audio:.1f}s de audio)"
+    )
+    print("=" * 70)
+
+    stages = {}
+    features = None
+    if "mfcc" in args.stages or "kws" in args.stages:
+        print("⏱️  MFCC...")
+        mfcc_report, features = bench_mfcc(corpus)
+        if "mfcc" in args.stages:
+            stages["mfcc"] = mfcc_report
+    if "kws" in args.stages:
+        print("⏱️  KWS...")
+        stages["kws"] = bench_kws(corpus, features, args.model, args.threshold)
+    if "stt" in args.stages:
+        print(f"⏱️  STT ({', '.join(args.engines)})...")
+        stages["stt"] = bench_stt(corpus, args.engines)
+    if "gemini" in args.stages:
+        print("⏱️  Gemini (mock local)...")
+        stages["gemini"] = bench_gemini(
+            corpus, args.gemini_runs, args.gemini_latency_ms, args.gemini_jitter_ms
+        )
+
+    report = {
+        "meta": {
+            "timestamp": datetime.now().isoformat(),
+            "git_revision": git_revision(),
+            "python": platform.python_version(),
+            "machine": platform.machine(),
+            "cpu_count": os.cpu_count(),
+            "files": len(corpus),
+            "audio_s": total_audio,
+        },
+        "stages": stages,
+    }
+
+    print_report(report)
+    if args.compare:
+        with open(args.compare, encoding="utf-8") as f:
+            print_comparison(json.load(f), report)
+    print("=" * 70 + "\n")
+
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2, ensure_ascii=False)
+        print(f"💾 Resultados guardados en: {args.output}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
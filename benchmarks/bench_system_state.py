@@ -0,0 +1,198 @@
+#!/usr/bin/env python3
+"""
+Benchmark de contención de SystemState: lock compartido vs fotos inmutables
+Reproduce WAVs a máxima velocidad (WavReplayThread) y un consumidor hace por
+chunk las llamadas de estado del InferenceThread mientras hilos lectores
+sondean el estado (UI a 20 Hz más lectores agresivos que simulan scrapes).
+Reporta el costo por chunk de las llamadas de estado en el hilo de
+inferencia y el throughput de chunks.
+"""
+
+import argparse
+import os
+import queue
+import sys
+import tempfile
+import threading
+import time
+import wave
+from pathlib import Path
+
+import numpy as np
+
+ROOT_DIR = Path(__file__).parent.parent
+sys.path.insert(0, str(ROOT_DIR / "r-pi"))
+
+from kws_monitor import (
+    QUEUE_SIZE,
+    SAMPLE_RATE,
+    STATE_ERROR,
+    STATE_MONITORING,
+    SystemState,
+    WavReplayThread,
+)
+
+
+class LegacySystemState:
+    """SystemState anterior: todos los accesos toman el mismo lock"""
+
+    def __init__(self):
+        self.fps = 0.0
+        self.cpu_usage = 0.0
+        self.last_prediction = 0.0
+        self.is_speaking = False
+        self.noise_level = 0.0
+        self.current_state = STATE_MONITORING
+        self.paused = False
+        self.control_command = None
+        self.last_error = None
+        self.lock = threading.Lock()
+
+    def update_metrics(self, fps=None, cpu=None, pred=None, speaking=None, noise=None):
+        with self.lock:
+            if fps is not None:
+                self.fps = fps
+            if cpu is not None:
+                self.cpu_usage = cpu
+            if pred is not None:
+                self.last_prediction = pred
+            if speaking is not None:
+                self.is_speaking = speaking
+            if noise is not None:
+                self.noise_level = noise
+
+    def get_state(self):
+        with self.lock:
+            return self.current_state
+
+    def is_paused(self):
+        with self.lock:
+            return self.paused
+
+    def get_control_command(self):
+        with self.lock:
+            cmd = self.control_command
+            self.control_command = None
+            return cmd
+
+    def set_error(self, error_msg):
+        with self.lock:
+            self.last_error = error_msg
+            self.current_state = STATE_ERROR
+
+    def get_status_string(self):
+        with self.lock:
+            return (
+                f"CPU: {self.cpu_usage:4.1f}% | FPS: {self.fps:4.1f} | "
+                f"Conf: {self.last_prediction:.4f} | Noise: {self.noise_level:.4f}"
+            )
+
+
+def synthetic_corpus(directory, seconds=30):
+    """WAV de ruido con ráfagas de 'voz' para activar el VAD"""
+    rng = np.random.default_rng(0)
+    audio = 0.003 * rng.standard_normal(seconds * SAMPLE_RATE)
+    for start in range(0, seconds * SAMPLE_RATE, 3 * SAMPLE_RATE):
+        audio[start : start + SAMPLE_RATE] *= 30
+    path = os.path.join(directory, "synthetic.wav")
+    with wave.open(path, "wb") as wf:
+        wf.setnchannels(1)
+        wf.setsampwidth(2)
+        wf.setframerate(SAMPLE_RATE)
+        wf.writeframes((np.clip(audio, -1, 1) * 32767).astype(np.int16).tobytes())
+    return [path]
+
+
+def reader(state, stop, interval):
+    """Sondea el estado como la UI (interval > 0) o como un scrape agresivo"""
+    while not stop.is_set():
+        state.get_status_string()
+        state.get_state()
+        if interval:
+            time.sleep(interval)
+
+
+def run(state_cls, paths, loops, aggressive_readers):
+    state = state_cls()
+    audio_queue = queue.Queue(maxsize=QUEUE_SIZE)
+    stop = threading.Event()
+    readers_stop = threading.Event()
+
+    source = WavReplayThread(
+        paths, audio_queue, stop, state, speed=0, gap_seconds=0, loops=loops
+    )
+    readers = [threading.Thread(target=reader, args=(state, readers_stop, 0.05))]
+    readers += [
+        threading.Thread(target=reader, args=(state, readers_stop, 0))
+        for _ in range(aggressive_readers)
+    ]
+    for t in readers:
+        t.daemon = True
+        t.start()
+
+    costs = []
+    noise_floor = 0.005
+    start = time.perf_counter()
+    source.start()
+    while source.is_alive() or not audio_queue.empty():
+        try:
+            chunk = audio_queue.get(timeout=0.1)
+        except queue.Empty:
+            continue
+        # Llamadas de estado del InferenceThread por chunk (modo monitoring)
+        t0 = time.perf_counter_ns()
+        state.get_control_command()
+        state.is_paused()
+        state.get_state()
+        noise_floor = 0.95 * noise_floor + 0.05 * chunk.rms
+        state.update_metrics(noise=noise_floor, speaking=chunk.rms > noise_floor * 1.5)
+        state.update_metrics(pred=0.0, fps=4)
+        costs.append(time.perf_counter_ns() - t0)
+    elapsed = time.perf_counter() - start
+
+    readers_stop.set()
+    stop.set()
+    for t in readers:
+        t.join()
+
+    costs = np.array(costs) / 1000
+    return {
+        "chunks": len(costs),
+        "chunks_per_s": len(costs) / elapsed,
+        "p50_us": float(np.percentile(costs, 50)),
+        "p99_us": float(np.percentile(costs, 99)),
+        "max_us": float(costs.max()),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Contención de SystemState")
+    parser.add_argument("inputs", nargs="*", help="WAVs o directorios a reproducir")
+    parser.add_argument("--loops", type=int, default=5)
+    parser.add_argument(
+        "--readers", type=int, default=2, help="Lectores agresivos (scrapes)"
+    )
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        paths = args.inputs or synthetic_corpus(tmp)
+
+        print("\n" + "=" * 70)
+        print(f"🔒 CONTENCIÓN DE SystemState ({args.readers} lectores agresivos + UI)")
+        print("=" * 70)
+        print(
+            f"{'Variante':18} {'chunks':>8} {'chunks/s':>10} {'p50 us':>8} {'p99 us':>9} {'máx us':>9}"
+        )
+        for name, cls in (("lock", LegacySystemState), ("snapshot", SystemState)):
+            r = run(cls, paths, args.loops, args.readers)
+            print(
+                f"{name:18} {r['chunks']:8d} {r['chunks_per_s']:10.0f} "
+                f"{r['p50_us']:8.1f} {r['p99_us']:9.1f} {r['max_us']:9.1f}"
+            )
+        print("\nCosto de las llamadas de estado por chunk en el hilo de inferencia.")
+        print("=" * 70 + "\n")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,271 @@
+#!/usr/bin/env python3
+"""
+Servidor local que imita la API generateContent de Gemini
+Responde con interpretaciones JSON deterministas (reglas por palabras clave)
+tras una latencia configurable, para medir el camino GeminiEngine sin red ni
+cuota. Se usa apuntando GEMINI_BASE_URL a http://127.0.0.1:<puerto>.
+
+streamGenerateContent (?alt=sse) envía el mismo JSON en fragmentos de
+stream_chunk_chars caracteres: el primero tras la latencia del modelo y el
+resto cada stream_chunk_ms, como la generación token a token.
+
+connect_latency_ms se paga una vez por conexión TCP nueva (imita DNS + TLS
+sobre LTE) para medir el efecto de las conexiones keep-alive y el
+pre-calentamiento; GET models/<modelo> responde los metadatos del modelo.
+"""
+
+import argparse
+import json
+import random
+import re
+import sys
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+# (palabras clave, acción, parámetros) en orden de prioridad
+RULES = [
+    (
+        ("ventana", "vidrio"),
+        "control_ventana",
+        {"posicion": "piloto", "accion": "bajar"},
+    ),
+    (
+        ("aire", "clima", "temperatura", "calefacción"),
+        "control_climatizacion",
+        {"accion": "encender"},
+    ),
+    (
+        ("luz", "luces", "faros", "intermitentes"),
+        "control_luces",
+        {"tipo": "delanteras", "accion": "encender"},
+    ),
+    (
+        ("puerta", "puertas", "bloquea", "desbloquea", "seguro"),
+        "control_cerraduras",
+        {"accion": "bloquear", "puertas": "todas"},
+    ),
+    (
+        ("música", "musica", "canción", "radio"),
+        "reproducir_musica",
+        {"accion": "reproducir", "fuente": "bluetooth"},
+    ),
+    (
+        ("navega", "ruta", "llévame", "llevame"),
+        "navegacion",
+        {"accion": "iniciar", "destino": ""},
+    ),
+    (
+        ("llama", "llamada", "cuelga"),
+        "llamada_telefono",
+        {"accion": "llamar", "contacto": ""},
+    ),
+]
+
+COMMAND_PATTERN = re.compile(r"Comando del usuario: '(.*?)'", re.DOTALL)
+
+
+def interpret(command_text):
+    """Interpretación determinista con el formato que pide el prompt de GeminiEngine"""
+    words = command_text.lower()
+    for keywords, action, parameters in RULES:
+        if any(k in words for k in keywords):
+            return {
+                "action": action,
+                "parameters": dict(parameters),
+                "confidence": 0.9,
+                "natural_response": "Listo, ya me encargo. ¿Necesitas algo más?",
+            }
+    return {
+        "action": "aclaracion_requerida",
+        "parameters": {"question": "¿Puedes repetir?"},
+        "confidence": 0.0,
+        "natural_response": "No entendí bien, ¿podrías repetir?",
+    }
+
+
+def extract_command(body):
+    """Texto del comando dentro de contents (formato REST de generateContent)"""
+    texts = [
+        part.get("text", "")
+        for content in body.get("contents", [])
+        for part in content.get("parts", [])
+    ]
+    match = COMMAND_PATTERN.search("\n".join(texts))
+    return match.group(1) if match else "\n".join(texts)
+
+
+def candidate_payload(text, finish_reason=None):
+    """Cuerpo de respuesta de generateContent (o un evento del stream)"""
+    candidate = {"content": {"role": "model", "parts": [{"text": text}]}}
+    if finish_reason:
+        candidate["finishReason"] = finish_reason
+    return {"candidates": [candidate], "modelVersion": "mock-gemini"}
+
+
+class MockGeminiHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"  # Conexiones keep-alive como la API real
+
+    def setup(self):
+        super().setup()
+        server = self.server
+        with server.lock:
+            server.connections_opened += 1
+        time.sleep(server.connect_latency)  # "Handshake" de la conexión nueva
+
+    def do_GET(self):
+        if "/models/" not in self.path:
+            self._send(404, {"error": {"code": 404, "message": self.path}})
+            return
+        name = self.path.split("?")[0].split("/models/", 1)[1]
+        self._send(
+            200,
+            {
+                "name": f"models/{name}",
+                "displayName": "Mock Gemini",
+                "supportedGenerationMethods": [
+                    "generateContent",
+                    "streamGenerateContent",
+                ],
+            },
+        )
+
+    def do_POST(self):
+        length = int(self.headers.get("Content-Length", 0))
+        try:
+            body = json.loads(self.rfile.read(length) or b"{}")
+        except json.JSONDecodeError:
+            body = {}
+
+        streaming = ":streamGenerateContent" in self.path
+        if not streaming and ":generateContent" not in self.path:
+            self._send(404, {"error": {"code": 404, "message": self.path}})
+            return
+
+        server = self.server
+        delay = server.latency + random.uniform(0, server.jitter)
+        time.sleep(delay)
+
+        command = extract_command(body)
+        with server.lock:
+            server.requests_served += 1
+        text = json.dumps(interpret(command), ensure_ascii=False)
+        if streaming:
+            self._send_stream(text)
+        else:
+            self._send(200, candidate_payload(text, "STOP"))
+
+    def _send_stream(self, text):
+        """Eventos SSE con un fragmento del texto cada uno"""
+        server = self.server
+        self.send_response(200)
+        self.send_header("Content-Type", "text/event-stream")
+        self.send_header("Connection", "close")
+        self.end_headers()
+        self.close_connection = True
+        size = server.stream_chunk_chars
+        pieces = [text[i : i + size] for i in range(0, len(text), size)]
+        for i, piece in enumerate(pieces):
+            if i:
+                time.sleep(server.stream_chunk_s)
+            finish = "STOP" if i == len(pieces) - 1 else None
+            event = json.dumps(candidate_payload(piece, finish), ensure_ascii=False)
+            self.wfile.write(f"data: {event}\r\n\r\n".encode("utf-8"))
+            self.wfile.flush()
+
+    def _send(self, status, payload):
+        data = json.dumps(payload, ensure_ascii=False).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json; charset=UTF-8")
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def log_message(self, format, *args):
+        pass  # Sin una línea por petición
+
+
+class MockGeminiServer(ThreadingHTTPServer):
+    """
+    Servidor mock en segundo plano
+
+    Args:
+        port: Puerto TCP (0 = libre elegido por el sistema)
+        latency_ms: Latencia fija simulada del modelo (hasta el primer fragmento)
+        jitter_ms: Latencia extra uniforme [0, jitter_ms]
+        stream_chunk_chars: Caracteres por fragmento en streaming
+        stream_chunk_ms: Pausa entre fragmentos en streaming
+        connect_latency_ms: Costo de abrir cada conexión nueva
+    """
+
+    daemon_threads = True
+
+    def __init__(
+        self,
+        port=0,
+        latency_ms=0.0,
+        jitter_ms=0.0,
+        stream_chunk_chars=16,
+        stream_chunk_ms=20.0,
+        connect_latency_ms=0.0,
+    ):
+        super().__init__(("127.0.0.1", port), MockGeminiHandler)
+        self.connect_latency = connect_latency_ms / 1000
+        self.connections_opened = 0
+        self.latency = latency_ms / 1000
+        self.jitter = jitter_ms / 1000
+        self.stream_chunk_chars = stream_chunk_chars
+        self.stream_chunk_s = stream_chunk_ms / 1000
+        self.lock = threading.Lock()
+        self.requests_served = 0
+        self._thread = None
+
+    @property
+    def url(self):
+        return f"http://127.0.0.1:{self.server_address[1]}"
+
+    def start(self):
+        self._thread = threading.Thread(target=self.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self.shutdown()
+        self.server_close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Mock local de la API de Gemini")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--latency-ms", type=float, default=300.0)
+    parser.add_argument("--jitter-ms", type=float, default=100.0)
+    parser.add_argument("--stream-chunk-chars", type=int, default=16)
+    parser.add_argument("--stream-chunk-ms", type=float, default=20.0)
+    parser.add_argument("--connect-latency-ms", type=float, default=0.0)
+    args = parser.parse_args()
+
+    server = MockGeminiServer(
+        args.port,
+        args.latency_ms,
+        args.jitter_ms,
+        args.stream_chunk_chars,
+        args.stream_chunk_ms,
+        args.connect_latency_ms,
+    )
+    print(f"🤖 Mock Gemini en {server.url} (latencia {args.latency_ms:.0f} ms)")
+    print(f"   Usa: GEMINI_BASE_URL={server.url} GEMINI_API_KEY=mock")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+        print(
+            f"\n👋 Mock detenido ({server.requests_served} peticiones, "
+            f"{server.connections_opened} conexiones)"
+        )
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
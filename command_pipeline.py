@@ -0,0 +1,383 @@
+"""
+Jeepy AI - Pipeline post-activación
+Ejecuta STT y NLU fuera del hilo de inferencia KWS: la transcripción corre en
+un pool de procesos (Whisper es CPU-bound y retiene el GIL) y la
+interpretación con Gemini en un hilo (I/O de red). Los resultados vuelven por
+una cola para que el monitor los persista y ejecute.
+"""
+
+import multiprocessing
+import queue
+import threading
+import time
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from typing import Any, Dict, Optional
+
+import numpy as np
+
+from config import Config
+from instrumentation import record_latency
+
+# Motores STT que consumen CPU local (se ejecutan en procesos separados)
+LOCAL_STT_ENGINES = {"whisper_local", "faster_whisper", "vosk"}
+# Motores con transcripción incremental nativa (streaming por defecto)
+STREAMING_STT_ENGINES = {"vosk", "google_cloud"}
+
+# STTManager del proceso worker (uno por proceso, cargado una sola vez)
+_worker_stt = None
+
+
+def _init_stt_worker():
+    """Inicializador del pool: carga el motor STT una vez por proceso"""
+    global _worker_stt
+    from stt_engine import STTManager
+
+    _worker_stt = STTManager()
+
+
+def _warmup_worker() -> bool:
+    """Tarea vacía para forzar la carga del modelo antes del primer comando"""
+    return _worker_stt is not None
+
+
+def _transcribe_in_worker(audio, sample_rate: int):
+    """Transcribe en el proceso worker y retorna (texto, segundos de servicio)"""
+    start = time.perf_counter()
+    text = _worker_stt.transcribe(audio, sample_rate)
+    return text, time.perf_counter() - start
+
+
+class CommandJob:
+    """Comando grabado que atraviesa las etapas STT -> NLU"""
+
+    def __init__(
+        self,
+        audio,
+        duration: float,
+        audio_file: Optional[str] = None,
+        sample_rate: int = 16000,
+    ):
+        self.audio = audio  # Buffer NumPy o ruta a WAV; se libera tras STT
+        self.recording = None  # Grabación retenida para el consumidor de results
+        self.audio_file = audio_file  # Ruta de persistencia/identificador
+        self.sample_rate = sample_rate
+        self.duration = duration
+        self.stream = None  # StreamingSession en modo streaming
+        self.mode = "batch"
+        self.created_at = time.perf_counter()
+        self.transcription: Optional[str] = None
+        self.interpretation: Optional[Dict[str, Any]] = None
+        self.stt_latency = 0.0  # Fin de habla -> texto (cola + transcripción)
+        self.nlu_latency = 0.0  # Espera en cola + interpretación
+        self.total_latency = 0.0
+        self.error: Optional[str] = None
+
+    def partial(self) -> str:
+        """Hipótesis parcial de la transcripción en streaming"""
+        return self.stream.partial() if self.stream else ""
+
+
+class StageMetrics:
+    """Profundidad de cola y latencias recientes de una etapa"""
+
+    def __init__(self, name: str, history: int = 100):
+        self.name = f"pipeline.{name}"  # Histograma en instrumentation
+        self.pending = 0
+        self.completed = 0
+        self.failed = 0
+        self.latencies = deque(maxlen=history)
+        self.lock = threading.Lock()
+
+    def enqueue(self):
+        with self.lock:
+            self.pending += 1
+
+    def done(self, latency: float, ok: bool = True):
+        with self.lock:
+            self.pending -= 1
+            if ok:
+                self.completed += 1
+            else:
+                self.failed += 1
+            self.latencies.append(latency)
+        record_latency(self.name, int(latency * 1e9))
+
+    def snapshot(self) -> Dict[str, Any]:
+        with self.lock:
+            latencies = list(self.latencies)
+            result = {
+                "queue_depth": self.pending,
+                "completed": self.completed,
+                "failed": self.failed,
+            }
+        if latencies:
+            result["latency_p50_ms"] = float(np.percentile(latencies, 50)) * 1000
+            result["latency_p95_ms"] = float(np.percentile(latencies, 95)) * 1000
+        return result
+
+
+class CommandPipeline:
+    """
+    Pipeline asíncrono STT -> Gemini para comandos grabados.
+
+    submit() retorna inmediatamente; los CommandJob terminados (con o sin
+    error) se publican en self.results.
+
+    En modo streaming, start_stream()/feed()/finish_stream() transcriben
+    mientras se graba. La sesión necesita el modelo en este proceso, así que
+    streaming usa hilos para STT (durante la grabación el KWS no infiere).
+    """
+
+    def __init__(
+        self,
+        gemini_engine=None,
+        stt_workers: int = 1,
+        use_processes: Optional[bool] = None,
+        streaming: Optional[bool] = False,
+        on_action=None,
+    ):
+        """
+        Args:
+            gemini_engine: GeminiEngine para la etapa NLU (None = sólo STT)
+            stt_workers: Workers del pool STT
+            use_processes: Pool de procesos para STT (None = según el motor)
+            streaming: STT mientras se graba (None = si el motor lo soporta)
+            on_action: Callable(action, parameters); si se da, la NLU usa
+                Gemini en streaming y ejecuta la acción en cuanto se conoce
+        """
+        if streaming is None:
+            streaming = Config.STT_ENGINE in STREAMING_STT_ENGINES
+        if use_processes is None:
+            from stt_engine import stt_server_available
+
+            # Con el servidor STT activo el modelo ya vive en otro proceso
+            use_processes = (
+                Config.STT_ENGINE in LOCAL_STT_ENGINES
+                and not streaming
+                and not (Config.STT_USE_SERVER and stt_server_available())
+            )
+        elif use_processes and streaming:
+            print("⚠️ Streaming STT no disponible con pool de procesos; usando lote")
+            streaming = False
+
+        self.use_processes = use_processes
+        self.streaming = streaming
+        self.gemini_engine = gemini_engine
+        self.on_action = on_action
+        self.results: "queue.Queue[CommandJob]" = queue.Queue()
+        self.metrics = {
+            "stt": StageMetrics("stt"),
+            "stt_stream": StageMetrics("stt_stream"),
+            "nlu": StageMetrics("nlu"),
+        }
+
+        if use_processes:
+            # spawn: no heredar hilos de captura/inferencia en el fork
+            self._stt_executor = ProcessPoolExecutor(
+                max_workers=stt_workers,
+                mp_context=multiprocessing.get_context("spawn"),
+                initializer=_init_stt_worker,
+            )
+            self._stt_manager = None
+            self._stt_executor.submit(_warmup_worker)
+        else:
+            from stt_engine import STTManager
+
+            self._stt_manager = STTManager()
+            self._stt_executor = ThreadPoolExecutor(
+                max_workers=stt_workers, thread_name_prefix="stt"
+            )
+
+        self._nlu_executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="nlu")
+        # Un solo hilo: los chunks de un stream se procesan en orden
+        self._stream_executor = (
+            ThreadPoolExecutor(max_workers=1, thread_name_prefix="stt-stream")
+            if streaming
+            else None
+        )
+
+    def _transcribe_local(self, audio, sample_rate: int):
+        start = time.perf_counter()
+        text = self._stt_manager.transcribe(audio, sample_rate)
+        return text, time.perf_counter() - start
+
+    def submit(
+        self,
+        audio,
+        duration: float,
+        audio_file: Optional[str] = None,
+        sample_rate: int = 16000,
+        retain_audio: bool = False,
+    ) -> CommandJob:
+        """
+        Encola un comando grabado para transcripción e interpretación
+
+        Args:
+            audio: Buffer NumPy (float32/int16) o ruta a un WAV
+            duration: Duración del comando en segundos
+            audio_file: Ruta donde se persiste el audio (si aplica)
+            sample_rate: Frecuencia de muestreo del buffer
+            retain_audio: Conservar el buffer en job.recording tras STT (p.ej.
+                para guardarlo sólo si el comando falla)
+
+        Returns:
+            CommandJob que se publicará en self.results al terminar
+        """
+        if audio_file is None and isinstance(audio, str):
+            audio_file = audio
+        job = CommandJob(audio, duration, audio_file, sample_rate)
+        if retain_audio:
+            job.recording = audio
+        self.metrics["stt"].enqueue()
+
+        # En modo procesos el array se serializa al worker (sin pasar por disco)
+        if self.use_processes:
+            future = self._stt_executor.submit(
+                _transcribe_in_worker, audio, sample_rate
+            )
+        else:
+            future = self._stt_executor.submit(
+                self._transcribe_local, audio, sample_rate
+            )
+        future.add_done_callback(lambda f: self._on_stt_done(job, f))
+        return job
+
+    def _on_stt_done(self, job: CommandJob, future):
+        job.stt_latency = time.perf_counter() - job.created_at
+        if future.cancelled():
+            job.error = "Transcripción cancelada"
+        else:
+            try:
+                job.transcription, _ = future.result()
+            except Exception as e:
+                job.error = f"Error en transcripción: {e}"
+        job.audio = None
+
+        self.metrics["stt"].done(job.stt_latency, ok=bool(job.transcription))
+        self._dispatch_nlu(job)
+
+    def start_stream(self, sample_rate: int = 16000) -> CommandJob:
+        """
+        Inicia la transcripción incremental de un comando que se está grabando
+
+        Returns:
+            CommandJob a alimentar con feed() y cerrar con finish_stream()
+        """
+        job = CommandJob(None, 0.0, sample_rate=sample_rate)
+        job.mode = "streaming"
+        self._stream_executor.submit(self._open_stream, job)
+        return job
+
+    def _open_stream(self, job: CommandJob):
+        try:
+            job.stream = self._stt_manager.start_stream(job.sample_rate)
+        except Exception as e:
+            job.error = f"Error iniciando streaming: {e}"
+
+    def feed(self, job: CommandJob, chunk: np.ndarray):
+        """Encola un chunk de la grabación (no bloquea el hilo KWS)"""
+        self._stream_executor.submit(self._accept_chunk, job, chunk)
+
+    def _accept_chunk(self, job: CommandJob, chunk: np.ndarray):
+        if job.stream is None or job.error:
+            return
+        try:
+            job.stream.accept(chunk)
+        except Exception as e:
+            job.error = f"Error en transcripción streaming: {e}"
+
+    def finish_stream(
+        self,
+        job: CommandJob,
+        duration: float,
+        audio_file: Optional[str] = None,
+        audio=None,
+        retain_audio: bool = False,
+    ):
+        """
+        Marca el fin de habla: la latencia STT se mide desde este punto
+
+        Args:
+            audio: Grabación completa para transcribir en lote si el
+                streaming falla (None = sin respaldo)
+            retain_audio: Conservar la grabación en job.recording (ver submit)
+        """
+        job.duration = duration
+        job.audio_file = audio_file
+        job.audio = audio
+        if retain_audio:
+            job.recording = audio
+        job.created_at = time.perf_counter()
+        self.metrics["stt_stream"].enqueue()
+        self._stream_executor.submit(self._close_stream, job)
+
+    def _close_stream(self, job: CommandJob):
+        if job.stream is not None and not job.error:
+            try:
+                job.transcription = job.stream.finish()
+            except Exception as e:
+                job.error = f"Error en transcripción streaming: {e}"
+        if (job.error or job.stream is None) and job.audio is not None:
+            print(f"⚠️ {job.error or 'Streaming no iniciado'}; transcribiendo en lote")
+            job.mode = "batch"
+            job.error = None
+            try:
+                job.transcription, _ = self._transcribe_local(
+                    job.audio, job.sample_rate
+                )
+            except Exception as e:
+                job.error = f"Error en transcripción: {e}"
+        job.audio = None
+        job.stt_latency = time.perf_counter() - job.created_at
+
+        self.metrics["stt_stream"].done(job.stt_latency, ok=bool(job.transcription))
+        self._dispatch_nlu(job)
+
+    def _dispatch_nlu(self, job: CommandJob):
+        if job.transcription and self.gemini_engine:
+            self.metrics["nlu"].enqueue()
+            self._nlu_executor.submit(self._run_nlu, job, time.perf_counter())
+        else:
+            self._complete(job)
+
+    def _run_nlu(self, job: CommandJob, enqueued_at: float):
+        try:
+            if self.on_action:
+                job.interpretation = self.gemini_engine.process_command_stream(
+                    job.transcription, on_action=self.on_action
+                )
+            else:
+                job.interpretation = self.gemini_engine.process_command(
+                    job.transcription
+                )
+        except Exception as e:
+            job.error = f"Error en procesamiento Gemini: {e}"
+        job.nlu_latency = time.perf_counter() - enqueued_at
+        self.metrics["nlu"].done(job.nlu_latency, ok=job.interpretation is not None)
+        self._complete(job)
+
+    def _complete(self, job: CommandJob):
+        job.total_latency = time.perf_counter() - job.created_at
+        record_latency("pipeline.total", int(job.total_latency * 1e9))
+        self.results.put(job)
+
+    def get_metrics(self) -> Dict[str, Any]:
+        """Profundidad de cola y latencias p50/p95 por etapa"""
+        metrics = {name: stage.snapshot() for name, stage in self.metrics.items()}
+        metrics["results_pending"] = self.results.qsize()
+        return metrics
+
+    def shutdown(self, wait: bool = False, cancel_futures: bool = True):
+        """
+        Detiene los pools
+
+        Args:
+            wait: Esperar a que terminen los trabajos en curso
+            cancel_futures: Cancelar los trabajos aún no iniciados
+        """
+        # En orden: STT y streaming aún encolan NLU al terminar
+        self._stt_executor.shutdown(wait=wait, cancel_futures=cancel_futures)
+        if self._stream_executor:
+            self._stream_executor.shutdown(wait=wait, cancel_futures=cancel_futures)
+        self._nlu_executor.shutdown(wait=wait, cancel_futures=cancel_futures)
@@ -24,11 +24,52 @@ class Config:
     # --- GEMINI API ---
     GEMINI_API_KEY: Optional[str] = os.getenv("GEMINI_API_KEY")
     GEMINI_MODEL: str = os.getenv("GEMINI_MODEL", "gemini-2.0-flash-exp")
+    # Endpoint alternativo (p.ej. benchmarks/mock_gemini.py); None = API de Google
+    GEMINI_BASE_URL: Optional[str] = os.getenv("GEMINI_BASE_URL")
+    # generate_content_stream: ejecutar la acción antes de la respuesta completa
+    GEMINI_STREAMING: bool = os.getenv("GEMINI_STREAMING", "false").lower() == "true"
+    # Motor asíncrono (gemini_async.py): pool keep-alive, pre-calentamiento y plazos
+    GEMINI_ASYNC: bool = os.getenv("GEMINI_ASYNC", "false").lower() == "true"
+    GEMINI_POOL_SIZE: int = int(os.getenv("GEMINI_POOL_SIZE", "4"))
+    GEMINI_KEEPALIVE_S: float = float(os.getenv("GEMINI_KEEPALIVE_S", "120"))
+    GEMINI_DEADLINE_S: float = float(os.getenv("GEMINI_DEADLINE_S", "8"))
+    GEMINI_PREWARM: bool = os.getenv("GEMINI_PREWARM", "true").lower() == "true"
+
+    # Parser de intención local (intent_parser.py): comandos simples sin Gemini
+    LOCAL_INTENT_ENABLED: bool = (
+        os.getenv("LOCAL_INTENT_ENABLED", "true").lower() == "true"
+    )
+    LOCAL_INTENT_MIN_CONFIDENCE: float = float(
+        os.getenv("LOCAL_INTENT_MIN_CONFIDENCE", "0.85")
+    )
+
+    # Caché de interpretaciones (frase normalizada + modelo + versión del prompt)
+    GEMINI_CACHE_ENABLED: bool = (
+        os.getenv("GEMINI_CACHE_ENABLED", "true").lower() == "true"
+    )
+    GEMINI_CACHE_PATH: str = os.getenv(
+        "GEMINI_CACHE_PATH", str(BASE_DIR / ".cache" / "gemini_cache.sqlite3")
+    )
+    GEMINI_CACHE_MAX_ENTRIES: int = int(os.getenv("GEMINI_CACHE_MAX_ENTRIES", "2000"))
+    GEMINI_CACHE_TTL_HOURS: float = float(os.getenv("GEMINI_CACHE_TTL_HOURS", "168"))
+    # Búsqueda de frases casi iguales por embedding (opcional)
+    GEMINI_CACHE_SEMANTIC: bool = (
+        os.getenv("GEMINI_CACHE_SEMANTIC", "false").lower() == "true"
+    )
+    GEMINI_CACHE_SIMILARITY: float = float(os.getenv("GEMINI_CACHE_SIMILARITY", "0.9"))
+
+    # NLU especulativa (speculative_nlu.py): interpretar el prefijo estable de
+    # las transcripciones parciales y confirmar con el texto final
+    SPECULATIVE_NLU: bool = os.getenv("SPECULATIVE_NLU", "false").lower() == "true"
+    SPECULATIVE_STABLE_PARTIALS: int = int(
+        os.getenv("SPECULATIVE_STABLE_PARTIALS", "3")
+    )
+    SPECULATIVE_MIN_WORDS: int = int(os.getenv("SPECULATIVE_MIN_WORDS", "2"))
 
     # --- STT Configuration ---
     STT_ENGINE: str = os.getenv(
         "STT_ENGINE", "whisper_local"
-    )  # google_cloud, openai, whisper_local, vosk
+    )  # google_cloud, openai, whisper_local, faster_whisper, vosk, stub
     STT_LANGUAGE: str = os.getenv("STT_LANGUAGE", "es-MX")
 
     # Google Cloud STT
@@ -44,10 +85,49 @@ class Config:
     USE_LOCAL_WHISPER: bool = os.getenv("USE_LOCAL_WHISPER", "true").lower() == "true"
     LOCAL_WHISPER_MODEL: str = os.getenv("LOCAL_WHISPER_MODEL", "base")
 
+    # faster-whisper (CTranslate2, cuantizado int8)
+    FASTER_WHISPER_MODEL: str = os.getenv(
+        "FASTER_WHISPER_MODEL", os.getenv("LOCAL_WHISPER_MODEL", "base")
+    )
+    FASTER_WHISPER_COMPUTE_TYPE: str = os.getenv("FASTER_WHISPER_COMPUTE_TYPE", "int8")
+    FASTER_WHISPER_CPU_THREADS: int = int(os.getenv("FASTER_WHISPER_CPU_THREADS", "4"))
+    FASTER_WHISPER_BEAM_SIZE: int = int(os.getenv("FASTER_WHISPER_BEAM_SIZE", "1"))
+    FASTER_WHISPER_VAD_FILTER: bool = (
+        os.getenv("FASTER_WHISPER_VAD_FILTER", "true").lower() == "true"
+    )
+
     # Vosk
     USE_VOSK: bool = os.getenv("USE_VOSK", "false").lower() == "true"
     VOSK_MODEL_PATH: Optional[str] = os.getenv("VOSK_MODEL_PATH")
 
+    # Carrera de motores STT (hedged requests): principal offline + respaldos
+    STT_HEDGE_ENABLED: bool = os.getenv("STT_HEDGE_ENABLED", "false").lower() == "true"
+    STT_HEDGE_PRIMARY: str = os.getenv("STT_HEDGE_PRIMARY", "vosk")
+    STT_HEDGE_BACKUPS: str = os.getenv("STT_HEDGE_BACKUPS", "openai,google_cloud")
+    STT_HEDGE_DELAY_MS: float = float(os.getenv("STT_HEDGE_DELAY_MS", "800"))
+    STT_HEDGE_AUTOTUNE: bool = os.getenv("STT_HEDGE_AUTOTUNE", "true").lower() == "true"
+    STT_HEDGE_MIN_CONFIDENCE: float = float(
+        os.getenv("STT_HEDGE_MIN_CONFIDENCE", "0.5")
+    )
+
+    # Motor simulado ("stub") para pruebas sin red
+    STT_STUB_LATENCY_MS: float = float(os.getenv("STT_STUB_LATENCY_MS", "300"))
+    STT_STUB_TEXT: str = os.getenv("STT_STUB_TEXT", "enciende las luces")
+
+    # Caché de transcripciones (huella del audio + motor + modelo + idioma)
+    STT_CACHE_ENABLED: bool = os.getenv("STT_CACHE_ENABLED", "true").lower() == "true"
+    STT_CACHE_PATH: str = os.getenv(
+        "STT_CACHE_PATH", str(BASE_DIR / ".cache" / "stt_cache.sqlite3")
+    )
+    STT_CACHE_MAX_ENTRIES: int = int(os.getenv("STT_CACHE_MAX_ENTRIES", "5000"))
+    STT_CACHE_MAX_BYTES: int = int(
+        os.getenv("STT_CACHE_MAX_BYTES", str(8 * 1024 * 1024))
+    )
+
+    # Servidor STT persistente (stt_server.py)
+    STT_SERVER_SOCKET: str = os.getenv("STT_SERVER_SOCKET", "/tmp/jeepy_stt.sock")
+    STT_USE_SERVER: bool = os.getenv("STT_USE_SERVER", "true").lower() == "true"
+
     # --- General Settings ---
     DEBUG_MODE: bool = os.getenv("DEBUG_MODE", "false").lower() == "true"
     LOG_LEVEL: str = os.getenv("LOG_LEVEL", "INFO")
@@ -84,7 +164,7 @@ class Config:
             elif not Path(cls.VOSK_MODEL_PATH).exists():
                 errors.append(f"❌ Modelo Vosk no encontrado: {cls.VOSK_MODEL_PATH}")
 
-        # whisper_local no requiere validación de API keys
+        # whisper_local y faster_whisper no requieren validación de API keys
 
         return len(errors) == 0, errors
 
@@ -103,6 +183,30 @@ class Config:
         print(f"\n📡 Gemini API:")
         print(f"  {gemini_status} API Key: {gemini_key}")
         print(f"  📝 Modelo: {cls.GEMINI_MODEL}")
+        if cls.GEMINI_BASE_URL:
+            print(f"  🔌 Endpoint: {cls.GEMINI_BASE_URL}")
+        if cls.GEMINI_STREAMING:
+            print("  📶 Streaming: sí (despacho anticipado de acciones)")
+        if cls.GEMINI_ASYNC:
+            print(
+                f"  🔁 Asíncrono: pool {cls.GEMINI_POOL_SIZE}, plazo {cls.GEMINI_DEADLINE_S:.1f}s"
+                f"{', pre-calentamiento' if cls.GEMINI_PREWARM else ''}"
+            )
+        if cls.LOCAL_INTENT_ENABLED:
+            print(
+                f"  ⚡ Intención local: sí (confianza >= {cls.LOCAL_INTENT_MIN_CONFIDENCE:.2f})"
+            )
+        if cls.GEMINI_CACHE_ENABLED:
+            print(
+                f"  💾 Caché: {cls.GEMINI_CACHE_MAX_ENTRIES} entradas, "
+                f"TTL {cls.GEMINI_CACHE_TTL_HOURS:.0f} h"
+                f"{', semántica' if cls.GEMINI_CACHE_SEMANTIC else ''}"
+            )
+        if cls.SPECULATIVE_NLU:
+            print(
+                f"  🔮 NLU especulativa: prefijo estable en "
+                f"{cls.SPECULATIVE_STABLE_PARTIALS} parciales"
+            )
 
         # STT
         print(f"\n🎤 Speech-to-Text:")
@@ -111,6 +215,14 @@ class Config:
 
         if cls.STT_ENGINE == "whisper_local":
             print(f"  📦 Modelo Local: {cls.LOCAL_WHISPER_MODEL}")
+        elif cls.STT_ENGINE == "faster_whisper":
+            print(
+                f"  📦 Modelo: {cls.FASTER_WHISPER_MODEL} ({cls.FASTER_WHISPER_COMPUTE_TYPE})"
+            )
+            print(
+                f"  ⚙️  Hilos: {cls.FASTER_WHISPER_CPU_THREADS} | Beam: {cls.FASTER_WHISPER_BEAM_SIZE} | "
+                f"VAD: {'sí' if cls.FASTER_WHISPER_VAD_FILTER else 'no'}"
+            )
         elif cls.STT_ENGINE == "openai":
             openai_status = "✅" if cls.OPENAI_API_KEY else "❌"
             print(
@@ -136,6 +248,12 @@ class Config:
                 f"  {vosk_status} Vosk Model: {cls.VOSK_MODEL_PATH or 'No configurado'}"
             )
 
+        if cls.STT_HEDGE_ENABLED:
+            print(
+                f"  🏁 Carrera: {cls.STT_HEDGE_PRIMARY} -> {cls.STT_HEDGE_BACKUPS} "
+                f"(retraso {cls.STT_HEDGE_DELAY_MS:.0f} ms{', auto' if cls.STT_HEDGE_AUTOTUNE else ''})"
+            )
+
         # Validación
         is_valid, errors = cls.validate()
         print(
@@ -0,0 +1,303 @@
+"""
+Jeepy AI - Motor Gemini asíncrono
+Variante asyncio de GeminiEngine sobre client.aio con un pool httpx propio de
+conexiones keep-alive. Permite pre-calentar la conexión al detectar la
+palabra clave (mientras corre el STT), aplica un plazo por petición y ejecuta
+peticiones concurrentes cancelables.
+
+Los métodos síncronos (process_command, process_command_stream) corren en el
+event loop propio del motor (un hilo daemon), así que es un reemplazo directo
+de GeminiEngine en CommandPipeline y JeepyAssistant. Desde código asyncio se
+usan las corrutinas a*; no mezclar ambos modos en el mismo motor: el pool
+httpx queda ligado al primer loop que lo usa.
+"""
+
+import asyncio
+import concurrent.futures
+import threading
+import time
+from typing import Any, Dict, List, Optional
+
+from config import Config
+from gemini_engine import GeminiEngine, StreamingInterpretation
+from instrumentation import now_ns, record_latency
+
+
+class AsyncGeminiEngine(GeminiEngine):
+    """
+    GeminiEngine asíncrono con conexiones persistentes
+
+    Args:
+        pool_size: Conexiones keep-alive y peticiones simultáneas máximas
+        keepalive_s: Segundos que una conexión ociosa sigue abierta
+        deadline_s: Plazo por defecto de cada petición (incluye la espera
+            del pre-calentamiento en curso)
+    """
+
+    def __init__(
+        self,
+        pool_size: Optional[int] = None,
+        keepalive_s: Optional[float] = None,
+        deadline_s: Optional[float] = None,
+    ):
+        try:
+            import httpx
+        except ImportError:
+            raise ImportError("httpx no instalado. Ejecuta: uv add httpx")
+
+        self.pool_size = pool_size or Config.GEMINI_POOL_SIZE
+        self.keepalive_s = keepalive_s or Config.GEMINI_KEEPALIVE_S
+        self.deadline_s = deadline_s or Config.GEMINI_DEADLINE_S
+        # El plazo lo impone asyncio.timeout; httpx sólo acota la conexión
+        self._http = httpx.AsyncClient(
+            limits=httpx.Limits(
+                max_connections=self.pool_size,
+                max_keepalive_connections=self.pool_size,
+                keepalive_expiry=self.keepalive_s,
+            ),
+            timeout=httpx.Timeout(None, connect=self.deadline_s),
+        )
+        self._semaphore = asyncio.Semaphore(self.pool_size)
+        self._inflight = set()
+        self._prewarm_task: Optional[asyncio.Task] = None
+        self._warm_until = 0.0
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._loop_lock = threading.Lock()
+        self.prewarms = 0
+        self.deadline_misses = 0
+        self.cancelled = 0
+
+        super().__init__()
+        print(
+            f"🔁 Gemini asíncrono: pool {self.pool_size}, "
+            f"keep-alive {self.keepalive_s:.0f}s, plazo {self.deadline_s:.1f}s"
+        )
+
+    def _http_options(self):
+        options = {"base_url": Config.GEMINI_BASE_URL} if Config.GEMINI_BASE_URL else {}
+        return self.types.HttpOptions(httpx_async_client=self._http, **options)
+
+    # --- Corrutinas ---
+
+    async def aprewarm(self, force: bool = False) -> bool:
+        """
+        Abre (o refresca) una conexión del pool con una petición ligera (los
+        metadatos del modelo) para que el comando no pague DNS + TCP + TLS
+
+        Returns:
+            True si se hizo la petición y tuvo éxito
+        """
+        if not force and time.monotonic() < self._warm_until:
+            return False
+        start = now_ns()
+        try:
+            async with asyncio.timeout(self.deadline_s):
+                await self.client.aio.models.get(model=self.model_name)
+        except Exception as e:
+            print(f"⚠️  Pre-calentamiento de Gemini falló: {e!r}")
+            return False
+        record_latency("gemini.prewarm", now_ns() - start)
+        self.prewarms += 1
+        # Margen para no confiar en una conexión a punto de expirar
+        self._warm_until = time.monotonic() + self.keepalive_s * 0.8
+        return True
+
+    def schedule_prewarm(self) -> asyncio.Task:
+        """Lanza aprewarm() en el loop actual (una sola a la vez)"""
+        if self._prewarm_task is None or self._prewarm_task.done():
+            self._prewarm_task = asyncio.get_running_loop().create_task(self.aprewarm())
+        return self._prewarm_task
+
+    async def _await_prewarm(self):
+        """Espera un pre-calentamiento en curso para reutilizar su conexión"""
+        task = self._prewarm_task
+        if task is not None and not task.done():
+            await asyncio.wait({task})
+
+    async def aprocess_command(
+        self,
+        command_text: str,
+        context: Optional[Dict[str, Any]] = None,
+        deadline_s: Optional[float] = None,
+        speculative: bool = False,
+    ) -> Optional[Dict[str, Any]]:
+        """
+        Versión asíncrona de process_command
+
+        Returns:
+            Igual que process_command; None también si se supera el plazo
+        """
+        result, use_cache = self._resolve_offline(command_text, context, speculative)
+        if result:
+            return result
+
+        deadline_s = deadline_s or self.deadline_s
+        try:
+            async with asyncio.timeout(deadline_s):
+                async with self._semaphore:
+                    await self._await_prewarm()
+                    start = now_ns()
+                    response = await self.client.aio.models.generate_content(
+                        model=self.model_name,
+                        contents=self._user_message(command_text, context),
+                        config=self._request_config(),
+                    )
+                    record_latency("gemini.request", now_ns() - start)
+        except TimeoutError:
+            self.deadline_misses += 1
+            print(f"⏱️  Gemini superó el plazo de {deadline_s:.1f}s")
+            return None
+        except asyncio.CancelledError:
+            self.cancelled += 1
+            raise
+        except Exception as e:
+            print(f"❌ Error procesando comando con Gemini: {e}")
+            return None
+        return self._interpret_response(
+            response.text, command_text, use_cache and not speculative
+        )
+
+    async def aprocess_command_stream(
+        self,
+        command_text: str,
+        on_action=None,
+        context: Optional[Dict[str, Any]] = None,
+        on_text=None,
+        deadline_s: Optional[float] = None,
+    ) -> Optional[Dict[str, Any]]:
+        """
+        Versión asíncrona de process_command_stream (on_action y on_text se
+        llaman en el loop: deben ser rápidos)
+        """
+        state = StreamingInterpretation(on_action, on_text)
+        result, use_cache = self._resolve_offline(command_text, context)
+        if result:
+            return state.complete_offline(result)
+
+        deadline_s = deadline_s or self.deadline_s
+        try:
+            async with asyncio.timeout(deadline_s):
+                async with self._semaphore:
+                    await self._await_prewarm()
+                    stream = await self.client.aio.models.generate_content_stream(
+                        model=self.model_name,
+                        contents=self._user_message(command_text, context),
+                        config=self._request_config(),
+                    )
+                    async for chunk in stream:
+                        state.feed(chunk.text)
+        except TimeoutError:
+            self.deadline_misses += 1
+            print(f"⏱️  Gemini superó el plazo de {deadline_s:.1f}s")
+            if not state.dispatched:
+                return None
+        except asyncio.CancelledError:
+            self.cancelled += 1
+            raise
+        except Exception as e:
+            print(f"❌ Error procesando comando con Gemini (streaming): {e}")
+            if not state.dispatched:
+                return None
+
+        result = state.finish()
+        if result and use_cache and state.parser.done:
+            self.cache.put(command_text, result)
+        return result
+
+    async def aprocess_many(
+        self, commands: List[str], deadline_s: Optional[float] = None
+    ) -> List[Optional[Dict[str, Any]]]:
+        """Interpreta varios comandos a la vez (hasta pool_size en vuelo)"""
+        return await asyncio.gather(
+            *(self.aprocess_command(text, deadline_s=deadline_s) for text in commands)
+        )
+
+    async def aclose(self):
+        await self._http.aclose()
+
+    # --- Puente síncrono (event loop propio en un hilo) ---
+
+    @property
+    def loop(self) -> asyncio.AbstractEventLoop:
+        """Event loop del motor; se crea al primer uso síncrono"""
+        with self._loop_lock:
+            if self._loop is None:
+                self._loop = asyncio.new_event_loop()
+                threading.Thread(
+                    target=self._loop.run_forever, name="gemini-async", daemon=True
+                ).start()
+        return self._loop
+
+    def submit(self, coro) -> concurrent.futures.Future:
+        """
+        Programa una corrutina en el loop del motor desde cualquier hilo
+
+        Returns:
+            Future; cancel() cancela la petición en curso
+        """
+        return asyncio.run_coroutine_threadsafe(self._track(coro), self.loop)
+
+    async def _track(self, coro):
+        task = asyncio.current_task()
+        self._inflight.add(task)
+        try:
+            return await coro
+        finally:
+            self._inflight.discard(task)
+
+    def process_command(
+        self,
+        command_text: str,
+        context: Optional[Dict[str, Any]] = None,
+        speculative: bool = False,
+    ) -> Optional[Dict[str, Any]]:
+        coro = self.aprocess_command(command_text, context, speculative=speculative)
+        try:
+            return self.submit(coro).result()
+        except concurrent.futures.CancelledError:
+            return None
+
+    def process_command_stream(
+        self,
+        command_text: str,
+        on_action=None,
+        context: Optional[Dict[str, Any]] = None,
+        on_text=None,
+    ) -> Optional[Dict[str, Any]]:
+        coro = self.aprocess_command_stream(command_text, on_action, context, on_text)
+        try:
+            return self.submit(coro).result()
+        except concurrent.futures.CancelledError:
+            return None
+
+    def prewarm(self):
+        """Pre-calienta sin bloquear (p.ej. al confirmar la palabra clave)"""
+        self.loop.call_soon_threadsafe(self.schedule_prewarm)
+
+    def cancel_all(self) -> int:
+        """Cancela las peticiones en vuelo; retorna cuántas había"""
+        pending = len(self._inflight)
+        self.loop.call_soon_threadsafe(
+            lambda: [task.cancel() for task in list(self._inflight)]
+        )
+        return pending
+
+    def close(self):
+        """Cierra el pool y detiene el loop del motor"""
+        if self._loop is None:
+            return
+        try:
+            self.submit(self.aclose()).result(timeout=5)
+        except Exception:
+            pass
+        self._loop.call_soon_threadsafe(self._loop.stop)
+
+    def connection_stats(self) -> Dict[str, Any]:
+        return {
+            "pool_size": self.pool_size,
+            "inflight": len(self._inflight),
+            "warm": time.monotonic() < self._warm_until,
+            "prewarms": self.prewarms,
+            "deadline_misses": self.deadline_misses,
+            "cancelled": self.cancelled,
+        }
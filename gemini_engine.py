@@ -4,49 +4,29 @@ Gestiona la comunicación con Google Gemini para NLU y Tool-Use
 """
 
 from typing import Optional, Dict, Any, List
+import hashlib
 import json
-from config import Config
-
-
-class GeminiEngine:
-    """Motor de procesamiento de lenguaje natural con Gemini"""
-
-    def __init__(self):
-        if not Config.GEMINI_API_KEY:
-            raise ValueError("GEMINI_API_KEY no configurada en .env")
-
-        try:
-            from google import genai
-            from google.genai import types
-
-            self.client = genai.Client(api_key=Config.GEMINI_API_KEY)
-            self.types = types
-            self.model_name = Config.GEMINI_MODEL
-
-            print(f"✅ Gemini configurado (modelo: {self.model_name})")
-
-        except ImportError:
-            raise ImportError("google-genai no instalado. Ejecuta: uv add google-genai")
-
-    def process_command(
-        self, command_text: str, context: Optional[Dict[str, Any]] = None
-    ) -> Optional[Dict[str, Any]]:
-        """
-        Procesa un comando de voz y extrae la intención y parámetros
+import sqlite3
+import threading
+import time
+import zlib
+from pathlib import Path
 
-        Args:
-            command_text: Texto transcrito del comando
-            context: Contexto adicional (ubicación, estado del vehículo, etc.)
-
-        Returns:
-            Dict con:
-                - action: Acción a ejecutar
-                - parameters: Parámetros de la acción
-                - confidence: Nivel de confianza
-                - raw_response: Respuesta completa de Gemini
-        """
+import numpy as np
 
-        system_prompt = """Eres el asistente de voz "Jeepy" para un vehículo Jeep.
+from config import Config
+from instrumentation import now_ns, record_latency
+from intent_parser import (
+    FAN_SPEED_RANGE,
+    TEMPERATURE_RANGE,
+    LocalIntentParser,
+    key_terms,
+    normalize_utterance,
+)
+from json_stream import IncrementalJSONParser
+from speculative_nlu import SpeculativeNLU
+
+SYSTEM_PROMPT = """Eres el asistente de voz "Jeepy" para un vehículo Jeep.
 Tu tarea es interpretar comandos de voz del usuario y convertirlos en acciones estructuradas.
 
 ACCIONES DISPONIBLES:
@@ -91,36 +71,643 @@ Si el comando no es claro o no coincide con ninguna acción, devuelve:
 }
 """
 
-        user_message = f"Comando del usuario: '{command_text}'"
-        if context:
-            user_message += f"\n\nContexto: {json.dumps(context, indent=2)}"
+# Cambia con cada edición de SYSTEM_PROMPT e invalida la caché anterior
+PROMPT_VERSION = hashlib.blake2b(
+    SYSTEM_PROMPT.encode("utf-8"), digest_size=4
+).hexdigest()
+
+# Parámetros válidos por acción: conjunto de valores, rango (mín, máx) o str libre
+ACTION_SCHEMA = {
+    "control_ventana": {
+        "posicion": {
+            "piloto",
+            "copiloto",
+            "trasera_izquierda",
+            "trasera_derecha",
+            "todas",
+        },
+        "accion": {"subir", "bajar"},
+        "porcentaje": (0, 100),
+    },
+    "control_climatizacion": {
+        "accion": {"encender", "apagar", "ajustar"},
+        "temperatura": TEMPERATURE_RANGE,
+        "velocidad": FAN_SPEED_RANGE,
+    },
+    "control_luces": {
+        "tipo": {"delanteras", "traseras", "intermitentes", "todas"},
+        "accion": {"encender", "apagar"},
+    },
+    "control_cerraduras": {
+        "accion": {"bloquear", "desbloquear"},
+        "puertas": {"todas", "piloto", "copiloto"},
+    },
+    "reproducir_musica": {
+        "accion": {"reproducir", "pausar", "siguiente", "anterior"},
+        "fuente": {"radio", "bluetooth", "usb"},
+    },
+    "navegacion": {
+        "accion": {"iniciar", "cancelar", "ruta_alternativa"},
+        "destino": str,
+    },
+    "llamada_telefono": {"accion": {"llamar", "colgar"}, "contacto": str},
+    "aclaracion_requerida": {"question": str},
+}
 
-        try:
-            response = self.client.models.generate_content(
-                model=self.model_name,
-                contents=user_message,
-                config=self.types.GenerateContentConfig(
-                    system_instruction=system_prompt,
-                    temperature=0.3,  # Baja temperatura para respuestas más deterministas
-                    response_mime_type="application/json",
+# Por debajo de esta confianza la respuesta de Gemini no se guarda en caché
+CACHE_MIN_CONFIDENCE = 0.5
+CACHED_FIELDS = ("action", "parameters", "confidence", "natural_response")
+EMBEDDING_DIM = 256
+
+
+def validate_interpretation(result: Any) -> bool:
+    """Comprueba acción, nombres y valores de los parámetros contra ACTION_SCHEMA"""
+    if not isinstance(result, dict):
+        return False
+    schema = ACTION_SCHEMA.get(result.get("action"))
+    parameters = result.get("parameters", {})
+    if schema is None or not isinstance(parameters, dict):
+        return False
+    for name, value in parameters.items():
+        rule = schema.get(name)
+        if rule is None:
+            return False
+        if rule is str:
+            if not isinstance(value, str):
+                return False
+        elif isinstance(rule, tuple):
+            if isinstance(value, bool) or not isinstance(value, (int, float)):
+                return False
+            if not rule[0] <= value <= rule[1]:
+                return False
+        elif value not in rule:
+            return False
+    return True
+
+
+def ngram_embedding(text: str) -> np.ndarray:
+    """
+    Embedding ligero sin dependencias: trigramas de caracteres con hashing,
+    normalizado L2 (el producto punto es la similitud coseno)
+    """
+    vector = np.zeros(EMBEDDING_DIM, dtype=np.float32)
+    padded = f" {text} "
+    for i in range(len(padded) - 2):
+        vector[zlib.crc32(padded[i : i + 3].encode("utf-8")) % EMBEDDING_DIM] += 1
+    norm = np.linalg.norm(vector)
+    return vector / norm if norm else vector
+
+
+class InterpretationCache:
+    """
+    Caché persistente de interpretaciones de Gemini (SQLite).
+
+    La clave es la frase normalizada (normalize_utterance) más el modelo y
+    PROMPT_VERSION. Las entradas caducan tras ttl_s y se expulsan por LRU.
+    No se guardan resultados con parámetros de texto libre (destino,
+    contacto). Con semantic=True, un fallo exacto busca la frase guardada más
+    parecida por embedding, exigiendo los mismos términos clave. Todo acierto
+    se valida contra ACTION_SCHEMA y las entradas inválidas se borran.
+    """
+
+    def __init__(
+        self,
+        model_name: str,
+        path: Optional[str] = None,
+        max_entries: Optional[int] = None,
+        ttl_s: Optional[float] = None,
+        semantic: Optional[bool] = None,
+        similarity: Optional[float] = None,
+        embed=ngram_embedding,
+    ):
+        self.model_name = model_name
+        self.path = str(path or Config.GEMINI_CACHE_PATH)
+        self.max_entries = max_entries or Config.GEMINI_CACHE_MAX_ENTRIES
+        self.ttl_s = ttl_s or Config.GEMINI_CACHE_TTL_HOURS * 3600
+        self.semantic = Config.GEMINI_CACHE_SEMANTIC if semantic is None else semantic
+        self.similarity = similarity or Config.GEMINI_CACHE_SIMILARITY
+        self.embed = embed
+        self.hits = 0
+        self.near_hits = 0
+        self.misses = 0
+        self.expired = 0
+        self.rejected = 0
+        self.evictions = 0
+        self.lock = threading.Lock()
+
+        Path(self.path).parent.mkdir(parents=True, exist_ok=True)
+        self.db = sqlite3.connect(self.path, timeout=10, check_same_thread=False)
+        self.db.execute("PRAGMA journal_mode=WAL")
+        self.db.execute("""CREATE TABLE IF NOT EXISTS interpretations (
+                key TEXT PRIMARY KEY,
+                model TEXT NOT NULL,
+                prompt_version TEXT NOT NULL,
+                result TEXT NOT NULL,
+                terms TEXT NOT NULL,
+                embedding BLOB NOT NULL,
+                created REAL NOT NULL,
+                last_access REAL NOT NULL
+            )""")
+        self.db.execute(
+            "CREATE INDEX IF NOT EXISTS idx_interp_last_access ON interpretations(last_access)"
+        )
+        self.db.commit()
+
+    def make_key(self, normalized: str) -> str:
+        return f"{self.model_name}:{PROMPT_VERSION}:{normalized}"
+
+    def get(self, command_text: str) -> Optional[Dict[str, Any]]:
+        """
+        Interpretación guardada para el comando
+
+        Returns:
+            Copia con source="cache" (y similar_to si fue un acierto
+            semántico) o None
+        """
+        normalized = normalize_utterance(command_text)
+        if not normalized:
+            return None
+        now = time.time()
+        with self.lock:
+            key = self.make_key(normalized)
+            row = self.db.execute(
+                "SELECT result, created FROM interpretations WHERE key = ?", (key,)
+            ).fetchone()
+            if row and now - row[1] > self.ttl_s:
+                self.db.execute("DELETE FROM interpretations WHERE key = ?", (key,))
+                self.db.commit()
+                self.expired += 1
+                row = None
+
+            similar_to = None
+            if row is None and self.semantic:
+                match = self._nearest(normalized, now)
+                if match:
+                    key, similar_to, row = match[0], match[1], (match[2], None)
+            if row is None:
+                self.misses += 1
+                return None
+
+            result = json.loads(row[0])
+            if not validate_interpretation(result) or self._has_free_text(result):
+                self.db.execute("DELETE FROM interpretations WHERE key = ?", (key,))
+                self.db.commit()
+                self.rejected += 1
+                self.misses += 1
+                return None
+
+            self.db.execute(
+                "UPDATE interpretations SET last_access = ? WHERE key = ?", (now, key)
+            )
+            self.db.commit()
+            self.hits += 1
+            if similar_to:
+                self.near_hits += 1
+                result["similar_to"] = similar_to
+
+        result["source"] = "cache"
+        return result
+
+    def _nearest(self, normalized: str, now: float):
+        """(clave, frase, resultado) más parecido que cumpla las restricciones"""
+        terms = " ".join(sorted(key_terms(normalized)))
+        rows = self.db.execute(
+            "SELECT key, result, embedding FROM interpretations "
+            "WHERE model = ? AND prompt_version = ? AND terms = ? AND created >= ?",
+            (self.model_name, PROMPT_VERSION, terms, now - self.ttl_s),
+        ).fetchall()
+        if not rows:
+            return None
+        query = self.embed(normalized)
+        best, best_score = None, self.similarity
+        for key, result, embedding in rows:
+            score = float(np.dot(query, np.frombuffer(embedding, dtype=np.float32)))
+            if score >= best_score:
+                best, best_score = (key, key.split(":", 2)[2], result), score
+        return best
+
+    @staticmethod
+    def _has_free_text(result: Dict[str, Any]) -> bool:
+        """
+        normalize_utterance descarta muletillas y artículos también dentro de
+        destinos o contactos, así que esos resultados no comparten clave
+        """
+        schema = ACTION_SCHEMA.get(result.get("action"), {})
+        return any(
+            schema.get(name) is str and value
+            for name, value in result.get("parameters", {}).items()
+        )
+
+    def put(self, command_text: str, result: Dict[str, Any]) -> bool:
+        """
+        Guarda una interpretación de Gemini si es cacheable (válida, no es una
+        aclaración, sin parámetros de texto libre y con confianza >=
+        CACHE_MIN_CONFIDENCE)
+        """
+        normalized = normalize_utterance(command_text)
+        if (
+            not normalized
+            or not validate_interpretation(result)
+            or result["action"] == "aclaracion_requerida"
+            or result.get("confidence", 0) < CACHE_MIN_CONFIDENCE
+            or self._has_free_text(result)
+        ):
+            return False
+        stored = {k: result[k] for k in CACHED_FIELDS if k in result}
+        embedding = self.embed(normalized).astype(np.float32).tobytes()
+        terms = " ".join(sorted(key_terms(normalized)))
+        now = time.time()
+        with self.lock:
+            self.db.execute(
+                "INSERT OR REPLACE INTO interpretations VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                (
+                    self.make_key(normalized),
+                    self.model_name,
+                    PROMPT_VERSION,
+                    json.dumps(stored, ensure_ascii=False),
+                    terms,
+                    embedding,
+                    now,
+                    now,
                 ),
             )
+            self._evict(now)
+            self.db.commit()
+        return True
+
+    def _evict(self, now: float):
+        """Borra las entradas caducadas y luego las menos usadas sobre el límite"""
+        expired = self.db.execute(
+            "DELETE FROM interpretations WHERE created < ?", (now - self.ttl_s,)
+        ).rowcount
+        self.expired += expired
+        (count,) = self.db.execute("SELECT COUNT(*) FROM interpretations").fetchone()
+        if count > self.max_entries:
+            self.db.execute(
+                "DELETE FROM interpretations WHERE key IN ("
+                "SELECT key FROM interpretations ORDER BY last_access LIMIT ?)",
+                (count - self.max_entries,),
+            )
+            self.evictions += count - self.max_entries
+
+    def clear(self):
+        with self.lock:
+            self.db.execute("DELETE FROM interpretations")
+            self.db.commit()
+
+    def stats(self) -> Dict[str, object]:
+        """Contadores de este proceso y tamaño del almacén"""
+        with self.lock:
+            (count,) = self.db.execute(
+                "SELECT COUNT(*) FROM interpretations"
+            ).fetchone()
+        lookups = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "near_hits": self.near_hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / lookups if lookups else 0.0,
+            "expired": self.expired,
+            "rejected": self.rejected,
+            "evictions": self.evictions,
+            "entries": count,
+            "path": self.path,
+        }
+
+
+def dispatch_action(interpretation: Dict[str, Any], on_action):
+    """
+    Ejecuta la acción con on_action si procede; retorna su resultado o None.
+    Una acción fuera de ACTION_SCHEMA marca interpretation["dispatch_rejected"]
+    para que nadie la ejecute después.
+    """
+    action = interpretation.get("action")
+    if action == "aclaracion_requerida":
+        return None
+    candidate = {"action": action, "parameters": interpretation["parameters"]}
+    if not validate_interpretation(candidate):
+        print(f"⚠️  Acción fuera del esquema, no se despacha: {candidate}")
+        interpretation["dispatch_rejected"] = True
+        return None
+    if on_action is None:
+        return None
+    return on_action(action, interpretation["parameters"])
+
+
+class StreamingInterpretation:
+    """
+    Estado de una respuesta de Gemini en streaming: parser incremental,
+    despacho anticipado de la acción y tiempos desde la creación
+
+    Args:
+        on_action: Callable(action, parameters) llamado en cuanto ambos llegan
+        on_text: Callable(texto parcial) con natural_response según llega
+    """
+
+    def __init__(self, on_action=None, on_text=None):
+        self.parser = IncrementalJSONParser()
+        self.on_action = on_action
+        self.on_text = on_text
+        self.timing: Dict[str, float] = {}
+        self.execution = None
+        self.start_ns = time.perf_counter_ns()
+
+    def elapsed_ms(self) -> float:
+        return (time.perf_counter_ns() - self.start_ns) / 1e6
+
+    @property
+    def dispatched(self) -> bool:
+        return "action_ms" in self.timing
+
+    def feed(self, text: Optional[str]):
+        """Procesa un fragmento; despacha la acción si ya está completa"""
+        self.timing.setdefault("first_chunk_ms", self.elapsed_ms())
+        self.parser.feed(text or "")
+        fields = self.parser.fields
+        if not self.dispatched and "action" in fields and "parameters" in fields:
+            self.timing["action_ms"] = self.elapsed_ms()
+            print(f"\n🤖 Gemini interpretó: {fields['action']} (streaming)")
+            self.execution = dispatch_action(fields, self.on_action)
+        if self.on_text:
+            partial = self.parser.partial_string()
+            if partial and partial[0] == "natural_response":
+                self.on_text(partial[1])
+
+    def complete_offline(self, result: Dict[str, Any]) -> Dict[str, Any]:
+        """Resultado del parser local o la caché: despacho inmediato"""
+        execution = dispatch_action(result, self.on_action)
+        if execution is not None:
+            result["execution"] = execution
+        total = self.elapsed_ms()
+        result["timing"] = {
+            "first_chunk_ms": total,
+            "action_ms": total,
+            "response_ms": total,
+        }
+        return result
+
+    def finish(self) -> Optional[Dict[str, Any]]:
+        """
+        Resultado final tras el último fragmento (o un error)
+
+        Returns:
+            Interpretación con execution/timing, o None si la respuesta no
+            sirve y no se despachó nada. Con la acción ya despachada se
+            retorna aunque el resto no llegara, para no ejecutarla de nuevo.
+        """
+        timing = self.timing
+        timing["response_ms"] = self.elapsed_ms()
+        if not self.parser.done and not self.dispatched:
+            print("❌ Respuesta JSON incompleta de Gemini")
+            print(f"   Respuesta raw: {self.parser.buffer}")
+            return None
+        if "action" not in self.parser.fields:
+            print("❌ Respuesta de Gemini sin campo action")
+            print(f"   Respuesta raw: {self.parser.buffer}")
+            return None
+
+        result = dict(self.parser.fields)
+        result["raw_response"] = self.parser.buffer
+        result["source"] = "gemini"
+        result["timing"] = timing
+        if self.execution is not None:
+            result["execution"] = self.execution
+        if self.dispatched:
+            record_latency("gemini.time_to_action", int(timing["action_ms"] * 1e6))
+        record_latency("gemini.time_to_response", int(timing["response_ms"] * 1e6))
+
+        print(f"   Confianza: {result.get('confidence', 0):.2f}")
+        print(
+            f"   ⏱️  Acción: {timing.get('action_ms', 0):.0f} ms | "
+            f"respuesta completa: {timing['response_ms']:.0f} ms"
+        )
+        return result
+
+
+class GeminiEngine:
+    """Motor de procesamiento de lenguaje natural con Gemini"""
+
+    def __init__(self):
+        if not Config.GEMINI_API_KEY:
+            raise ValueError("GEMINI_API_KEY no configurada en .env")
+
+        try:
+            from google import genai
+            from google.genai import types
+
+            self.types = types
+            self.client = genai.Client(
+                api_key=Config.GEMINI_API_KEY, http_options=self._http_options()
+            )
+            self.model_name = Config.GEMINI_MODEL
+            self.local_parser = (
+                LocalIntentParser(Config.LOCAL_INTENT_MIN_CONFIDENCE)
+                if Config.LOCAL_INTENT_ENABLED
+                else None
+            )
+            self.cache = None
+            if Config.GEMINI_CACHE_ENABLED:
+                try:
+                    self.cache = InterpretationCache(self.model_name)
+                except Exception as e:
+                    print(f"⚠️  Caché de interpretaciones no disponible: {e}")
+
+            print(f"✅ Gemini configurado (modelo: {self.model_name})")
+
+        except ImportError:
+            raise ImportError("google-genai no instalado. Ejecuta: uv add google-genai")
+
+    def _http_options(self):
+        """Opciones HTTP del cliente genai (endpoint alternativo si hay)"""
+        if Config.GEMINI_BASE_URL:
+            return self.types.HttpOptions(base_url=Config.GEMINI_BASE_URL)
+        return None
 
-            result = json.loads(response.text)
-            result["raw_response"] = response.text
+    def process_command(
+        self,
+        command_text: str,
+        context: Optional[Dict[str, Any]] = None,
+        speculative: bool = False,
+    ) -> Optional[Dict[str, Any]]:
+        """
+        Procesa un comando de voz y extrae la intención y parámetros.
+        Primero consulta el parser local y luego la caché de
+        interpretaciones (sin contexto); sólo si ninguno lo resuelve se
+        llama a Gemini.
 
-            print(f"\n🤖 Gemini interpretó: {result['action']}")
-            print(f"   Confianza: {result.get('confidence', 0):.2f}")
+        Args:
+            command_text: Texto transcrito del comando
+            context: Contexto adicional (ubicación, estado del vehículo, etc.)
+            speculative: Interpretación de una transcripción parcial: no
+                cuenta estadísticas del parser local ni escribe en la caché
+                hasta commit_speculation()
 
+        Returns:
+            Dict con:
+                - action: Acción a ejecutar
+                - parameters: Parámetros de la acción
+                - confidence: Nivel de confianza
+                - source: "local", "cache" o "gemini"
+                - raw_response: Respuesta completa de Gemini (sólo source="gemini")
+        """
+        result, use_cache = self._resolve_offline(command_text, context, speculative)
+        if result:
             return result
 
+        try:
+            start = now_ns()
+            response = self.client.models.generate_content(
+                model=self.model_name,
+                contents=self._user_message(command_text, context),
+                config=self._request_config(),
+            )
+            record_latency("gemini.request", now_ns() - start)
+        except Exception as e:
+            print(f"❌ Error procesando comando con Gemini: {e}")
+            return None
+        return self._interpret_response(
+            response.text, command_text, use_cache and not speculative
+        )
+
+    def commit_speculation(self, command_text: str, result: Dict[str, Any]):
+        """
+        Registra una interpretación especulativa confirmada por la
+        transcripción final: cuenta el parser local y guarda en caché la
+        respuesta de Gemini, como si se hubiera interpretado command_text
+        """
+        source = result.get("source")
+        if self.local_parser:
+            self.local_parser.record(source == "local")
+        if source == "gemini" and self.cache is not None:
+            self.cache.put(command_text, result)
+
+    def _interpret_response(
+        self, text: str, command_text: str, use_cache: bool
+    ) -> Optional[Dict[str, Any]]:
+        """Decodifica el JSON de Gemini, lo guarda en caché y lo retorna"""
+        parse_start = now_ns()
+        try:
+            result = json.loads(text)
         except json.JSONDecodeError as e:
             print(f"❌ Error parseando respuesta JSON de Gemini: {e}")
-            print(f"   Respuesta raw: {response.text}")
+            print(f"   Respuesta raw: {text}")
             return None
-        except Exception as e:
-            print(f"❌ Error procesando comando con Gemini: {e}")
+        record_latency("gemini.parse", now_ns() - parse_start)
+        if not isinstance(result, dict) or "action" not in result:
+            print("❌ Respuesta de Gemini sin campo action")
+            print(f"   Respuesta raw: {text}")
             return None
+        result["raw_response"] = text
+        result["source"] = "gemini"
+        if use_cache:
+            self.cache.put(command_text, result)
+
+        print(f"\n🤖 Gemini interpretó: {result['action']}")
+        print(f"   Confianza: {result.get('confidence', 0):.2f}")
+        return result
+
+    def process_command_stream(
+        self,
+        command_text: str,
+        on_action=None,
+        context: Optional[Dict[str, Any]] = None,
+        on_text=None,
+    ) -> Optional[Dict[str, Any]]:
+        """
+        Como process_command pero con generate_content_stream: en cuanto
+        action y parameters están completos se despacha la acción, mientras
+        natural_response sigue llegando
+
+        Args:
+            command_text: Texto transcrito del comando
+            on_action: Callable(action, parameters) que ejecuta la acción
+                (p.ej. VehicleController.execute_action); no se llama para
+                aclaraciones ni parámetros fuera de ACTION_SCHEMA
+            context: Contexto adicional (ubicación, estado del vehículo, etc.)
+            on_text: Callable(texto parcial) con natural_response según llega
+
+        Returns:
+            Igual que process_command más:
+                - execution: Retorno de on_action (si se despachó)
+                - timing: first_chunk_ms, action_ms y response_ms desde la
+                  llamada (tiempo hasta la acción vs. respuesta completa)
+        """
+        state = StreamingInterpretation(on_action, on_text)
+        result, use_cache = self._resolve_offline(command_text, context)
+        if result:
+            return state.complete_offline(result)
+
+        try:
+            stream = self.client.models.generate_content_stream(
+                model=self.model_name,
+                contents=self._user_message(command_text, context),
+                config=self._request_config(),
+            )
+            for chunk in stream:
+                state.feed(chunk.text)
+        except Exception as e:
+            print(f"❌ Error procesando comando con Gemini (streaming): {e}")
+            if not state.dispatched:
+                return None
+
+        result = state.finish()
+        if result and use_cache and state.parser.done:
+            self.cache.put(command_text, result)
+        return result
+
+    def _resolve_offline(
+        self,
+        command_text: str,
+        context: Optional[Dict[str, Any]],
+        speculative: bool = False,
+    ):
+        """
+        Parser local y caché de interpretaciones
+
+        Returns:
+            (interpretación o None, si la respuesta de Gemini debe cachearse)
+        """
+        if self.local_parser:
+            result = self.local_parser.interpret(command_text, count=not speculative)
+            if result and not validate_interpretation(result):
+                print(f"⚠️  Intención local fuera del esquema: {result['parameters']}")
+                result = None
+            if result:
+                print(f"\n⚡ Intención local: {result['action']}")
+                print(f"   Confianza: {result['confidence']:.2f}")
+                return result, False
+
+        use_cache = self.cache is not None and not context
+        if use_cache:
+            start = now_ns()
+            result = self.cache.get(command_text)
+            record_latency("gemini.cache_lookup", now_ns() - start)
+            if result:
+                print(f"\n💾 Interpretación en caché: {result['action']}")
+                return result, False
+        return None, use_cache
+
+    @staticmethod
+    def _user_message(command_text: str, context: Optional[Dict[str, Any]]) -> str:
+        user_message = f"Comando del usuario: '{command_text}'"
+        if context:
+            user_message += f"\n\nContexto: {json.dumps(context, indent=2)}"
+        return user_message
+
+    def _request_config(self):
+        return self.types.GenerateContentConfig(
+            system_instruction=SYSTEM_PROMPT,
+            temperature=0.3,  # Baja temperatura para respuestas más deterministas
+            response_mime_type="application/json",
+        )
+
+    def intent_stats(self) -> Optional[Dict[str, Any]]:
+        """Aciertos del parser local y latencia ahorrada (None si está desactivado)"""
+        return self.local_parser.stats() if self.local_parser else None
+
+    def cache_stats(self) -> Optional[Dict[str, object]]:
+        """Estadísticas de la caché de interpretaciones (None si está desactivada)"""
+        return self.cache.stats() if self.cache else None
 
     def generate_response(self, prompt: str) -> Optional[str]:
         """
@@ -231,6 +818,25 @@ class JeepyAssistant:
     def __init__(self):
         self.gemini = GeminiEngine()
         self.controller = VehicleController()
+        self.speculator = (
+            SpeculativeNLU(self.gemini) if Config.SPECULATIVE_NLU else None
+        )
+
+    def start_command(self):
+        """Inicio de un comando (tras la palabra clave)"""
+        if self.speculator:
+            self.speculator.reset()
+
+    def on_partial(self, partial_text: str):
+        """
+        Hipótesis parcial del STT: con NLU especulativa se interpreta su
+        prefijo estable mientras el usuario termina de hablar
+        """
+        if self.speculator and partial_text:
+            self.speculator.observe(partial_text)
+
+    def speculation_stats(self) -> Optional[Dict[str, Any]]:
+        return self.speculator.stats() if self.speculator else None
 
     def process_audio_command(self, transcribed_text: str) -> Dict[str, Any]:
         """
@@ -246,8 +852,19 @@ class JeepyAssistant:
         print(f"🎤 Comando recibido: '{transcribed_text}'")
         print(f"{'=' * 60}")
 
-        # 1. Interpretar con Gemini
-        interpretation = self.gemini.process_command(transcribed_text)
+        # 1. Interpretar: especulación confirmada o Gemini (en streaming la
+        # acción se ejecuta en cuanto llegan action y parameters)
+        interpretation = (
+            self.speculator.resolve(transcribed_text) if self.speculator else None
+        )
+        if interpretation:
+            print(f"🔮 Especulación confirmada: {interpretation['action']}")
+        elif Config.GEMINI_STREAMING:
+            interpretation = self.gemini.process_command_stream(
+                transcribed_text, on_action=self.controller.execute_action
+            )
+        else:
+            interpretation = self.gemini.process_command(transcribed_text)
 
         if not interpretation:
             return {
@@ -256,8 +873,13 @@ class JeepyAssistant:
                 "response": "Lo siento, no entendí tu comando.",
             }
 
-        # 2. Ejecutar acción (si no es aclaración)
-        if interpretation["action"] != "aclaracion_requerida":
+        # 2. Ejecutar acción (si no es aclaración, ni se despachó ya, ni la
+        # rechazó el esquema)
+        if "execution" in interpretation:
+            execution_result = interpretation["execution"]
+        elif interpretation.get("dispatch_rejected"):
+            execution_result = {"success": False, "error": "Acción fuera del esquema"}
+        elif interpretation["action"] != "aclaracion_requerida":
             execution_result = self.controller.execute_action(
                 interpretation["action"], interpretation.get("parameters", {})
             )
@@ -0,0 +1,190 @@
+"""
+Jeepy AI - Módulo de Instrumentación
+Histogramas de latencia de buckets fijos (log-lineales, estilo HDR) por
+etapa, registrados con perf_counter_ns. Registrar una muestra es O(1) y sin
+asignaciones; los percentiles se calculan sólo al consultar.
+
+JEEPY_INSTRUMENTATION=0 desactiva todo al importar: now_ns() y
+record_latency() pasan a ser funciones vacías y los puntos de medida sólo
+cuestan una llamada.
+"""
+
+import json
+import os
+import threading
+import time
+from typing import Any, Dict, Optional
+
+ENABLED = os.getenv("JEEPY_INSTRUMENTATION", "1").lower() not in ("0", "false")
+
+# Resolución: 2**SUB_BUCKET_BITS buckets lineales por potencia de 2 (error
+# relativo máximo ~3%); unidad de 1 us, rango hasta ~2**(BUCKET_COUNT/16) us
+SUB_BUCKET_BITS = 4
+SUB_BUCKETS = 1 << SUB_BUCKET_BITS
+BUCKET_COUNT = 512
+UNIT_NS = 1000
+
+PERCENTILES = (50, 90, 95, 99, 99.9)
+
+
+def _bucket_index(value_us: int) -> int:
+    if value_us < SUB_BUCKETS:
+        return value_us
+    shift = value_us.bit_length() - SUB_BUCKET_BITS - 1
+    return min(shift * SUB_BUCKETS + (value_us >> shift), BUCKET_COUNT - 1)
+
+
+def _bucket_upper_us(index: int) -> int:
+    """Límite superior (exclusivo) del bucket en us"""
+    if index < SUB_BUCKETS:
+        return index + 1
+    shift = index // SUB_BUCKETS - 1
+    mantissa = index - shift * SUB_BUCKETS
+    return (mantissa + 1) << shift
+
+
+class LatencyHistogram:
+    """
+    Histograma de latencias con buckets fijos.
+
+    Sin locks: cada etapa se registra desde un solo hilo; con escritores
+    concurrentes una carrera puede perder una muestra, nunca corromper.
+    """
+
+    def __init__(self):
+        self.counts = [0] * BUCKET_COUNT
+        self.count = 0
+        self.total_ns = 0
+        self.min_ns = None
+        self.max_ns = 0
+
+    def record(self, elapsed_ns: int):
+        self.counts[_bucket_index(elapsed_ns // UNIT_NS)] += 1
+        self.count += 1
+        self.total_ns += elapsed_ns
+        if elapsed_ns > self.max_ns:
+            self.max_ns = elapsed_ns
+        if self.min_ns is None or elapsed_ns < self.min_ns:
+            self.min_ns = elapsed_ns
+
+    def percentile(self, q: float) -> float:
+        """Percentil q (0-100) en ms (límite superior del bucket)"""
+        if not self.count:
+            return 0.0
+        target = max(1, int(round(self.count * q / 100)))
+        seen = 0
+        for index, n in enumerate(self.counts):
+            seen += n
+            if seen >= target:
+                upper_ms = _bucket_upper_us(index) * UNIT_NS / 1e6
+                return min(upper_ms, self.max_ns / 1e6)
+        return self.max_ns / 1e6
+
+    def cumulative_counts(self, bounds_us) -> list:
+        """Muestras <= cada límite (us, ascendente), para exportar a Prometheus"""
+        counts = list(self.counts)  # Copia: el escritor puede seguir registrando
+        result, seen, index = [], 0, 0
+        for bound in bounds_us:
+            while index < BUCKET_COUNT and _bucket_upper_us(index) <= bound:
+                seen += counts[index]
+                index += 1
+            result.append(seen)
+        return result
+
+    def to_dict(self, buckets: bool = False) -> Dict[str, Any]:
+        result = {
+            "count": self.count,
+            "mean_ms": self.total_ns / self.count / 1e6 if self.count else 0.0,
+            "min_ms": (self.min_ns or 0) / 1e6,
+            "max_ms": self.max_ns / 1e6,
+        }
+        for q in PERCENTILES:
+            result[f"p{q:g}_ms"] = self.percentile(q)
+        if buckets:
+            # [límite superior en us, muestras] de los buckets no vacíos
+            result["buckets"] = [
+                [_bucket_upper_us(i), n] for i, n in enumerate(self.counts) if n
+            ]
+        return result
+
+
+class Instrumentation:
+    """Registro de histogramas por nombre de etapa ("kws.mfcc", "pipeline.stt"...)"""
+
+    def __init__(self):
+        self.histograms: Dict[str, LatencyHistogram] = {}
+        self.lock = threading.Lock()  # Sólo para crear histogramas nuevos
+        self.started_at = time.time()
+
+    def histogram(self, stage: str) -> LatencyHistogram:
+        hist = self.histograms.get(stage)
+        if hist is None:
+            with self.lock:
+                hist = self.histograms.setdefault(stage, LatencyHistogram())
+        return hist
+
+    def record(self, stage: str, elapsed_ns: int):
+        self.histogram(stage).record(elapsed_ns)
+
+    def items(self):
+        """(etapa, histograma) ordenados; copia segura frente a etapas nuevas"""
+        with self.lock:
+            return sorted(self.histograms.items())
+
+    def snapshot(self, buckets: bool = False) -> Dict[str, Any]:
+        return {stage: hist.to_dict(buckets) for stage, hist in self.items()}
+
+    def reset(self):
+        with self.lock:
+            self.histograms = {}
+            self.started_at = time.time()
+
+    def dump_json(self, path: str) -> Optional[str]:
+        """
+        Guarda todos los histogramas (con buckets) en JSON
+
+        Returns:
+            Ruta escrita o None si la instrumentación está desactivada
+        """
+        if not ENABLED:
+            return None
+        data = {
+            "started_at": self.started_at,
+            "dumped_at": time.time(),
+            "stages": self.snapshot(buckets=True),
+        }
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump(data, f, indent=2)
+        return path
+
+    def print_summary(self):
+        if not ENABLED:
+            print("ℹ️  Instrumentación desactivada (JEEPY_INSTRUMENTATION=0)")
+            return
+        print(
+            f"  {'Etapa':24} {'n':>8} {'p50 ms':>9} {'p95 ms':>9} {'p99 ms':>9} {'máx ms':>9}"
+        )
+        for stage, s in self.snapshot().items():
+            print(
+                f"  {stage:24} {s['count']:8d} {s['p50_ms']:9.3f} {s['p95_ms']:9.3f} "
+                f"{s['p99_ms']:9.3f} {s['max_ms']:9.3f}"
+            )
+
+
+metrics = Instrumentation()
+
+
+def _noop(stage: str, elapsed_ns: int):
+    pass
+
+
+def _zero() -> int:
+    return 0
+
+
+if ENABLED:
+    now_ns = time.perf_counter_ns
+    record_latency = metrics.record
+else:
+    now_ns = _zero
+    record_latency = _noop
@@ -0,0 +1,629 @@
+"""
+Jeepy AI - Módulo de Intención Local
+Parser de reglas en el dispositivo para los comandos de vehículo comunes.
+Cubre las 7 acciones y los parámetros del prompt de GeminiEngine; sólo los
+comandos que entiende sin ambigüedad se resuelven aquí, el resto se escala a
+Gemini (varios dominios, negaciones, destinos/contactos faltantes, etc.).
+"""
+
+import re
+import unicodedata
+from typing import Any, Dict, List, Optional, Tuple
+
+from instrumentation import metrics, now_ns, record_latency
+
+# Confianza de una interpretación sin ambigüedades; cada slot ambiguo resta
+# AMBIGUITY_PENALTY, así que con el umbral por defecto (0.85) cualquiera escala
+BASE_CONFIDENCE = 0.95
+AMBIGUITY_PENALTY = 0.2
+
+# Rangos válidos (también los usa ACTION_SCHEMA en gemini_engine)
+TEMPERATURE_RANGE = (10, 35)
+FAN_SPEED_RANGE = (1, 5)
+
+# Latencia de Gemini supuesta para estimar el ahorro si aún no hay medidas
+DEFAULT_GEMINI_LATENCY_MS = 800.0
+
+_TOKEN_PATTERN = re.compile(r"\d+(?:[.,]\d+)?%?|\w+", re.UNICODE)
+
+# --- Vocabulario (sin acentos, en minúsculas) ---
+DOMAINS = {
+    "control_ventana": {
+        "ventana",
+        "ventanas",
+        "ventanilla",
+        "ventanillas",
+        "vidrio",
+        "vidrios",
+        "cristal",
+        "cristales",
+    },
+    "control_climatizacion": {
+        "aire",
+        "clima",
+        "climatizacion",
+        "calefaccion",
+        "temperatura",
+        "grados",
+        "ventilador",
+        "ac",
+    },
+    "control_luces": {
+        "luz",
+        "luces",
+        "faro",
+        "faros",
+        "intermitente",
+        "intermitentes",
+        "direccionales",
+    },
+    "control_cerraduras": {
+        "puerta",
+        "puertas",
+        "seguro",
+        "seguros",
+        "cerradura",
+        "cerraduras",
+    },
+    "reproducir_musica": {
+        "musica",
+        "cancion",
+        "canciones",
+        "rola",
+        "radio",
+        "estacion",
+        "emisora",
+        "bluetooth",
+        "usb",
+    },
+    "navegacion": {
+        "navega",
+        "navegar",
+        "navegacion",
+        "ruta",
+        "llevame",
+        "dirigeme",
+        "gps",
+    },
+    "llamada_telefono": {
+        "llama",
+        "llamar",
+        "llamale",
+        "llamada",
+        "marca",
+        "marcar",
+        "marcale",
+        "telefonea",
+        "cuelga",
+        "colgar",
+    },
+}
+
+ON = {"enciende", "encender", "enciendeme", "prende", "prender", "prendeme"}
+ON |= {"activa", "activar", "pon", "poner", "ponme", "ponle"}
+OFF = {"apaga", "apagar", "apagame", "desactiva", "desactivar", "quita", "quitar"}
+OFF |= {"quitale"}
+
+WINDOW_DOWN = {"baja", "bajar", "bajame", "abre", "abrir", "abreme"}
+WINDOW_UP = {"sube", "subir", "subeme", "cierra", "cerrar", "cierrame"}
+
+CLIMATE_ADJUST = {"ajusta", "ajustar", "sube", "subir", "subele", "baja", "bajar"}
+CLIMATE_ADJUST |= {"bajale", "cambia", "cambiar"}
+# "sube dos grados": cambio relativo, no una temperatura objetivo
+CLIMATE_RELATIVE = {"sube", "subir", "subele", "baja", "bajar", "bajale"}
+
+LOCK = {"bloquea", "bloquear", "asegura", "asegurar", "cierra", "cerrar", "pon"}
+LOCK |= {"ponle", "poner"}
+UNLOCK = {"desbloquea", "desbloquear", "abre", "abrir", "quita", "quitale"}
+UNLOCK |= {"quitar", "libera", "liberar"}
+
+MUSIC_PLAY = {"reproduce", "reproducir", "pon", "poner", "ponme", "toca", "tocar"}
+MUSIC_PLAY |= {"enciende", "prende", "play"}
+MUSIC_PAUSE = {"pausa", "pausar", "deten", "detener", "apaga", "silencia", "calla"}
+MUSIC_NEXT = {"siguiente", "salta", "saltar", "adelanta", "proxima"}
+MUSIC_PREVIOUS = {"anterior", "regresa", "previa"}
+
+NAV_CANCEL = {"cancela", "cancelar", "deten", "detener", "termina", "terminar"}
+NAV_CANCEL |= {"quita", "quitar"}
+NAV_START = {"navega", "navegar", "llevame", "lleva", "dirigeme", "inicia"}
+NAV_START |= {"iniciar", "ruta", "vamos", "ir"}
+
+CALL_HANGUP = {"cuelga", "colgar", "corta", "cortar", "termina", "terminar"}
+CALL_HANGUP |= {"finaliza"}
+CALL_START = {"llama", "llamar", "llamale", "marca", "marcar", "marcale"}
+CALL_START |= {"telefonea"}
+
+ARTICLES = {"el", "la", "los", "las", "un", "una"}
+
+# Matices que ninguna regla traduce a un parámetro ("más baja", "de adentro",
+# "más frío"): si aparecen, la interpretación local es dudosa
+QUALIFIERS = {"mas", "menos", "volumen", "alto", "alta", "fuerte", "bajito"}
+QUALIFIERS |= {"adentro", "dentro", "interior", "interiores", "cabina", "tablero"}
+QUALIFIERS |= {"frio", "fria", "caliente", "calor", "tantito", "poquito"}
+DESTINATION_PREPOSITIONS = {"a", "al", "hacia", "hasta"}
+# Acciones cuyos parámetros de texto libre pueden contener números y matices
+FREE_TEXT_ACTIONS = {"navegacion", "llamada_telefono"}
+
+# Muletillas y cortesías que no cambian la intención (normalize_utterance)
+FILLER_WORDS = {"oye", "hey", "jeepy", "jeep", "porfa", "porfavor", "eh", "em"}
+FILLER_WORDS |= {"mmm", "este", "pues", "bueno", "ya", "puedes", "podrias"}
+FILLER_WORDS |= {"quieres", "me", "unos", "unas"} | ARTICLES
+
+# Palabras que fijan acción o parámetros: dos frases con distintos términos
+# clave nunca son la misma intención (ver key_terms)
+KEY_TERMS = set().union(*DOMAINS.values())
+KEY_TERMS |= ON | OFF | WINDOW_DOWN | WINDOW_UP | CLIMATE_ADJUST | LOCK | UNLOCK
+KEY_TERMS |= MUSIC_PLAY | MUSIC_PAUSE | MUSIC_NEXT | MUSIC_PREVIOUS
+KEY_TERMS |= NAV_CANCEL | NAV_START | CALL_HANGUP | CALL_START
+KEY_TERMS |= {"piloto", "copiloto", "conductor", "chofer", "pasajero", "acompanante"}
+KEY_TERMS |= {"izquierda", "derecha", "trasera", "traseras", "trasero", "atras"}
+KEY_TERMS |= {"delanteras", "todas", "emergencia", "alternativa", "otra", "poco"}
+KEY_TERMS |= {"mitad", "medio", "media", "completa", "completamente", "toda", "todo"}
+KEY_TERMS |= {"velocidad", "nivel", "fm", "am", "memoria", "no", "ni", "%"}
+KEY_TERMS |= QUALIFIERS
+
+NUMBER_WORDS = {
+    "cero": 0,
+    "un": 1,
+    "uno": 1,
+    "una": 1,
+    "dos": 2,
+    "tres": 3,
+    "cuatro": 4,
+    "cinco": 5,
+    "seis": 6,
+    "siete": 7,
+    "ocho": 8,
+    "nueve": 9,
+    "diez": 10,
+    "once": 11,
+    "doce": 12,
+    "trece": 13,
+    "catorce": 14,
+    "quince": 15,
+    "dieciseis": 16,
+    "diecisiete": 17,
+    "dieciocho": 18,
+    "diecinueve": 19,
+    "veinte": 20,
+    "veintiuno": 21,
+    "veintidos": 22,
+    "veintitres": 23,
+    "veinticuatro": 24,
+    "veinticinco": 25,
+    "veintiseis": 26,
+    "veintisiete": 27,
+    "veintiocho": 28,
+    "veintinueve": 29,
+    "treinta": 30,
+    "cuarenta": 40,
+    "cincuenta": 50,
+    "sesenta": 60,
+    "setenta": 70,
+    "ochenta": 80,
+    "noventa": 90,
+    "cien": 100,
+}
+_TENS = {"treinta", "cuarenta", "cincuenta", "sesenta", "setenta", "ochenta"}
+_TENS |= {"noventa"}
+
+RESPONSES = {
+    ("control_ventana", "bajar"): "Bajando la ventana.",
+    ("control_ventana", "subir"): "Subiendo la ventana.",
+    ("control_climatizacion", "encender"): "Encendiendo el clima.",
+    ("control_climatizacion", "apagar"): "Apagando el clima.",
+    ("control_climatizacion", "ajustar"): "Ajustando la temperatura.",
+    ("control_luces", "encender"): "Encendiendo las luces.",
+    ("control_luces", "apagar"): "Apagando las luces.",
+    ("control_cerraduras", "bloquear"): "Puertas bloqueadas.",
+    ("control_cerraduras", "desbloquear"): "Puertas desbloqueadas.",
+    ("reproducir_musica", "reproducir"): "Reproduciendo música.",
+    ("reproducir_musica", "pausar"): "Música en pausa.",
+    ("reproducir_musica", "siguiente"): "Siguiente canción.",
+    ("reproducir_musica", "anterior"): "Canción anterior.",
+    ("navegacion", "iniciar"): "Iniciando navegación.",
+    ("navegacion", "cancelar"): "Navegación cancelada.",
+    ("navegacion", "ruta_alternativa"): "Buscando una ruta alternativa.",
+    ("llamada_telefono", "llamar"): "Llamando.",
+    ("llamada_telefono", "colgar"): "Llamada terminada.",
+}
+
+
+def strip_accents(text: str) -> str:
+    """Minúsculas sin acentos ni diéresis ("Música" -> "musica")"""
+    decomposed = unicodedata.normalize("NFD", text.lower())
+    return "".join(c for c in decomposed if unicodedata.category(c) != "Mn")
+
+
+def tokenize(text: str) -> Tuple[List[str], List[str]]:
+    """
+    Tokens normalizados y originales alineados
+
+    Returns:
+        (tokens sin acentos, tokens tal como se dijeron) para extraer
+        destinos y contactos conservando mayúsculas y acentos
+    """
+    raw = _TOKEN_PATTERN.findall(text)
+    return [strip_accents(t) for t in raw], raw
+
+
+def _parse_number(token: str) -> Optional[float]:
+    token = token.rstrip("%").replace(",", ".")
+    try:
+        return float(token)
+    except ValueError:
+        return None
+
+
+def extract_numbers(tokens: List[str]) -> List[Tuple[int, int, float]]:
+    """
+    Números en dígitos o palabras ("veinte", "treinta y dos")
+
+    Returns:
+        Lista de (índice inicial, índice final exclusivo, valor)
+    """
+    numbers = []
+    i = 0
+    while i < len(tokens):
+        token = tokens[i]
+        value = _parse_number(token)
+        end = i + 1
+        if value is None and token in NUMBER_WORDS:
+            value = NUMBER_WORDS[token]
+            if (
+                token in _TENS
+                and i + 2 < len(tokens)
+                and tokens[i + 1] == "y"
+                and NUMBER_WORDS.get(tokens[i + 2], 10) < 10
+            ):
+                value += NUMBER_WORDS[tokens[i + 2]]
+                end = i + 3
+        if value is not None:
+            numbers.append((i, end, value))
+        i = end
+    return numbers
+
+
+def _as_int(value: float):
+    return int(value) if float(value).is_integer() else value
+
+
+def normalize_utterance(text: str) -> str:
+    """
+    Forma canónica de un comando para claves de caché: minúsculas sin
+    acentos, números en dígitos ("veinte por ciento" -> "20 %") y sin
+    muletillas ni artículos ("Oye, baja la ventana por favor" -> "baja ventana")
+    """
+    tokens, _ = tokenize(text)
+    spans = {start: (end, value) for start, end, value in extract_numbers(tokens)}
+    words = []
+    i = 0
+    while i < len(tokens):
+        token = tokens[i]
+        if i in spans and token not in ("un", "una"):
+            end, value = spans[i]
+            words.append(str(_as_int(value)))
+            if token.endswith("%") or tokens[end : end + 2] == ["por", "ciento"]:
+                words.append("%")
+                end += 0 if token.endswith("%") else 2
+            i = end
+            continue
+        if token == "por" and tokens[i + 1 : i + 2] == ["favor"]:
+            i += 2
+            continue
+        if token not in FILLER_WORDS:
+            words.append(token)
+        i += 1
+    return " ".join(words)
+
+
+def key_terms(normalized: str) -> frozenset:
+    """Términos clave (vocabulario del esquema y números) de una frase normalizada"""
+    return frozenset(
+        w for w in normalized.split() if w in KEY_TERMS or _parse_number(w) is not None
+    )
+
+
+class LocalIntentParser:
+    """
+    Intérprete de reglas para comandos de vehículo
+
+    Args:
+        min_confidence: Confianza mínima para no escalar a Gemini
+    """
+
+    def __init__(self, min_confidence: float = 0.85):
+        self.min_confidence = min_confidence
+        self.hits = 0
+        self.escalations = 0
+
+    def interpret(
+        self, command_text: str, count: bool = True
+    ) -> Optional[Dict[str, Any]]:
+        """
+        Interpretación local si supera min_confidence
+
+        Args:
+            command_text: Texto del comando
+            count: Contar el acierto/escalado (False en especulaciones, que
+                se cuentan con record() si se confirman)
+
+        Returns:
+            Dict con el formato de GeminiEngine.process_command (source="local")
+            o None si el comando debe ir a Gemini
+        """
+        start = now_ns()
+        result = self.parse(command_text)
+        record_latency("intent.local", now_ns() - start)
+        hit = result is not None and result["confidence"] >= self.min_confidence
+        if count:
+            self.record(hit)
+        return result if hit else None
+
+    def record(self, hit: bool):
+        """Cuenta un comando resuelto localmente (hit) o escalado a Gemini"""
+        if hit:
+            self.hits += 1
+        else:
+            self.escalations += 1
+
+    def parse(self, command_text: str) -> Optional[Dict[str, Any]]:
+        """
+        Analiza el comando sin aplicar el umbral
+
+        Returns:
+            Interpretación con su confianza o None si no hay un único dominio
+            y una acción reconocibles
+        """
+        tokens, raw = tokenize(command_text)
+        words = set(tokens)
+        if not tokens or "no" in words or "ni" in words:
+            return None  # Negaciones: mejor que decida Gemini
+
+        domains = [action for action, vocab in DOMAINS.items() if words & vocab]
+        if len(domains) != 1:
+            return None  # Sin dominio o comando compuesto
+
+        action = domains[0]
+        parsed = getattr(self, f"_{action}")(tokens, raw, words)
+        if parsed is None:
+            return None
+        parameters, ambiguities = parsed
+        if action not in FREE_TEXT_ACTIONS:
+            ambiguities += len(words & QUALIFIERS)
+            ambiguities += self._unconsumed_numbers(tokens, parameters)
+
+        confidence = max(0.0, BASE_CONFIDENCE - AMBIGUITY_PENALTY * ambiguities)
+        return {
+            "action": action,
+            "parameters": parameters,
+            "confidence": round(confidence, 2),
+            "natural_response": RESPONSES.get(
+                (action, parameters.get("accion")), "Listo."
+            ),
+            "source": "local",
+        }
+
+    @staticmethod
+    def _unconsumed_numbers(tokens, parameters) -> int:
+        """Números dichos que no terminaron en ningún parámetro ("en veinte")"""
+        consumed = {v for v in parameters.values() if isinstance(v, (int, float))}
+        return sum(
+            1
+            for start, _, value in extract_numbers(tokens)
+            if tokens[start] not in ARTICLES and _as_int(value) not in consumed
+        )
+
+    # --- Una regla por acción: retorna (parámetros, nº de slots ambiguos) ---
+
+    def _control_ventana(self, tokens, raw, words):
+        if words & WINDOW_DOWN:
+            accion = "bajar"
+        elif words & WINDOW_UP:
+            accion = "subir"
+        else:
+            return None
+
+        ambiguities = 0
+        back = words & {"trasera", "traseras", "trasero", "atras"}
+        if "copiloto" in words or words & {"pasajero", "acompanante"}:
+            posicion = "copiloto"
+        elif "piloto" in words or words & {"conductor", "chofer"}:
+            posicion = "piloto"
+        elif back and "izquierda" in words:
+            posicion = "trasera_izquierda"
+        elif back and "derecha" in words:
+            posicion = "trasera_derecha"
+        elif "todas" in words or (
+            not back and words & {"ventanas", "ventanillas", "vidrios", "cristales"}
+        ):
+            posicion = "todas"
+        elif "izquierda" in words:
+            posicion = "piloto"
+        elif "derecha" in words:
+            posicion = "copiloto"
+        else:
+            posicion = "piloto"
+            ambiguities += 1  # "baja la ventana" o "las de atrás"
+
+        parameters = {"posicion": posicion, "accion": accion}
+        percent = self._percentage(tokens)
+        if percent is not None:
+            parameters["porcentaje"] = percent
+        elif "poco" in words:
+            ambiguities += 1  # "un poco": cantidad a criterio de Gemini
+        return parameters, ambiguities
+
+    def _percentage(self, tokens):
+        for start, end, value in extract_numbers(tokens):
+            if tokens[start].endswith("%") or tokens[end : end + 2] == [
+                "por",
+                "ciento",
+            ]:
+                return _as_int(value)
+        words = set(tokens)
+        if words & {"mitad", "medio", "media"}:
+            return 50
+        if words & {"completa", "completamente", "toda", "todo"}:
+            return 100
+        return None
+
+    def _control_climatizacion(self, tokens, raw, words):
+        temperature = None
+        speed = None
+        ambiguities = 0
+        for start, end, value in extract_numbers(tokens):
+            before = tokens[start - 1] if start else ""
+            after = tokens[end] if end < len(tokens) else ""
+            if before in {"velocidad", "nivel", "ventilador"}:
+                if FAN_SPEED_RANGE[0] <= value <= FAN_SPEED_RANGE[1]:
+                    speed = int(value)
+            elif after == "grados" or before == "a":
+                if before != "a" and words & CLIMATE_RELATIVE:
+                    ambiguities += 1  # "súbele dos grados": relativo
+                elif TEMPERATURE_RANGE[0] <= value <= TEMPERATURE_RANGE[1]:
+                    temperature = _as_int(value)
+
+        if words & OFF:
+            accion = "apagar"
+        elif words & (ON - {"pon", "poner", "ponme", "ponle"}):
+            accion = "encender"
+        elif words & (CLIMATE_ADJUST | {"pon", "poner", "ponme", "ponle"}):
+            accion = "ajustar" if temperature is not None or speed else "encender"
+            if temperature is None and speed is None and words & CLIMATE_ADJUST:
+                ambiguities += 1  # "sube la temperatura" sin valor
+        else:
+            return None
+
+        parameters = {"accion": accion}
+        if temperature is not None:
+            parameters["temperatura"] = temperature
+        if speed is not None:
+            parameters["velocidad"] = speed
+        return parameters, ambiguities
+
+    def _control_luces(self, tokens, raw, words):
+        if words & OFF:
+            accion = "apagar"
+        elif words & ON:
+            accion = "encender"
+        else:
+            return None
+
+        if words & {"intermitente", "intermitentes", "direccionales", "emergencia"}:
+            tipo = "intermitentes"
+        elif "todas" in words:
+            tipo = "todas"
+        elif words & {"traseras", "trasera", "atras"}:
+            tipo = "traseras"
+        else:
+            tipo = "delanteras"
+        return {"tipo": tipo, "accion": accion}, 0
+
+    def _control_cerraduras(self, tokens, raw, words):
+        # "quita el seguro" y "abre" ganan a "pon"/"cierra"
+        if words & UNLOCK:
+            accion = "desbloquear"
+        elif words & LOCK:
+            accion = "bloquear"
+        else:
+            return None
+
+        if "copiloto" in words or "pasajero" in words:
+            puertas = "copiloto"
+        elif "piloto" in words or "conductor" in words:
+            puertas = "piloto"
+        else:
+            puertas = "todas"
+        return {"accion": accion, "puertas": puertas}, 0
+
+    def _reproducir_musica(self, tokens, raw, words):
+        if words & MUSIC_PREVIOUS:
+            accion = "anterior"
+        elif words & MUSIC_NEXT or ("otra" in words and "cancion" in words):
+            accion = "siguiente"
+        elif words & MUSIC_PAUSE or tokens[0] == "para":
+            accion = "pausar"
+        elif words & MUSIC_PLAY:
+            accion = "reproducir"
+        else:
+            return None
+
+        parameters = {"accion": accion}
+        if words & {"radio", "estacion", "emisora", "fm", "am"}:
+            parameters["fuente"] = "radio"
+        elif "usb" in words or "memoria" in words:
+            parameters["fuente"] = "usb"
+        elif accion == "reproducir":
+            parameters["fuente"] = "bluetooth"
+        # "baja/sube la música": volumen, que no está en el esquema
+        volume = words & (CLIMATE_RELATIVE - MUSIC_PLAY - MUSIC_PAUSE)
+        return parameters, len(volume)
+
+    def _navegacion(self, tokens, raw, words):
+        if "alternativa" in words or ("otra" in words and "ruta" in words):
+            return {"accion": "ruta_alternativa"}, 0
+        if words & NAV_CANCEL:
+            return {"accion": "cancelar"}, 0
+        if not words & NAV_START:
+            return None
+
+        destino = ""
+        verb = next(i for i, t in enumerate(tokens) if t in NAV_START)
+        for i in range(verb + 1, len(tokens)):
+            if tokens[i] in DESTINATION_PREPOSITIONS:
+                rest = raw[i + 1 :]
+                if rest and strip_accents(rest[0]) in ARTICLES:
+                    rest = rest[1:]
+                destino = " ".join(rest)
+                break
+        return {"accion": "iniciar", "destino": destino}, 0 if destino else 2
+
+    def _llamada_telefono(self, tokens, raw, words):
+        if words & CALL_HANGUP:
+            return {"accion": "colgar"}, 0
+        starts = [i for i, t in enumerate(tokens) if t in CALL_START]
+        if not starts:
+            return None
+
+        rest_tokens, rest = tokens[starts[0] + 1 :], raw[starts[0] + 1 :]
+        if rest_tokens and rest_tokens[0] in {"a", "al"}:
+            rest_tokens, rest = rest_tokens[1:], rest[1:]
+        # "llama a mamá por teléfono" / "... al celular"
+        for i, t in enumerate(rest_tokens):
+            if t in {"por", "al"} and set(rest_tokens[i:]) <= {
+                "por",
+                "al",
+                "telefono",
+                "celular",
+                "movil",
+            }:
+                rest = rest[:i]
+                break
+        contacto = " ".join(rest)
+        return {"accion": "llamar", "contacto": contacto}, 0 if contacto else 2
+
+    # --- Estadísticas ---
+
+    def stats(self) -> Dict[str, Any]:
+        """
+        Tasa de aciertos locales y latencia ahorrada estimada
+
+        El ahorro por acierto es la media medida de gemini.request (o
+        DEFAULT_GEMINI_LATENCY_MS sin medidas) menos la media de intent.local.
+        """
+        total = self.hits + self.escalations
+        gemini = metrics.histograms.get("gemini.request")
+        local = metrics.histograms.get("intent.local")
+        gemini_ms = (
+            gemini.total_ns / gemini.count / 1e6
+            if gemini and gemini.count
+            else DEFAULT_GEMINI_LATENCY_MS
+        )
+        local_ms = local.total_ns / local.count / 1e6 if local and local.count else 0.0
+        return {
+            "hits": self.hits,
+            "escalations": self.escalations,
+            "hit_rate": self.hits / total if total else 0.0,
+            "saved_ms": self.hits * max(0.0, gemini_ms - local_ms),
+        }
@@ -0,0 +1,119 @@
+"""
+Jeepy AI - Módulo de JSON incremental
+Parser de un objeto JSON que llega en fragmentos (respuestas en streaming de
+Gemini): publica cada campo de primer nivel en cuanto su valor está completo,
+sin esperar al cierre del objeto.
+"""
+
+import json
+from typing import Any, Dict, List, Optional, Tuple
+
+_WHITESPACE = " \t\r\n"
+
+
+class IncrementalJSONParser:
+    """
+    Parser incremental de un objeto JSON de primer nivel
+
+    feed() retorna los campos (clave, valor) completados con ese fragmento;
+    self.fields acumula todos. Los valores anidados se decodifican enteros
+    con json.loads al cerrarse. Texto antes de la primera "{" (p.ej. una
+    valla ```json) se ignora.
+    """
+
+    def __init__(self):
+        self.buffer = ""
+        self.fields: Dict[str, Any] = {}
+        self.done = False
+        self._pos = 0
+        self._depth = 0
+        self._in_string = False
+        self._escape = False
+        self._key: Optional[str] = None
+        self._key_start: Optional[int] = None
+        self._expect_value = False
+        self._value_start: Optional[int] = None
+
+    def feed(self, text: str) -> List[Tuple[str, Any]]:
+        """Agrega un fragmento y retorna los campos completados"""
+        self.buffer += text
+        completed = []
+        buffer = self.buffer
+        i = self._pos
+        while i < len(buffer) and not self.done:
+            c = buffer[i]
+            if self._in_string:
+                if self._escape:
+                    self._escape = False
+                elif c == "\\":
+                    self._escape = True
+                elif c == '"':
+                    self._in_string = False
+                    if self._depth == 1:
+                        self._close_string(i, completed)
+            elif c == '"':
+                self._in_string = True
+                if self._depth == 1:
+                    if self._expect_value:
+                        self._value_start = i
+                    else:
+                        self._key_start = i
+            elif c in "{[":
+                if self._depth == 0:
+                    if c == "{":
+                        self._depth = 1
+                elif self._depth == 1 and self._value_start is None:
+                    self._value_start = i
+                    self._depth += 1
+                else:
+                    self._depth += 1
+            elif c in "}]" and self._depth > 0:
+                self._depth -= 1
+                if self._depth == 1:
+                    self._complete_value(i + 1, completed)  # Objeto/lista anidados
+                elif self._depth == 0:
+                    self._complete_value(i, completed)  # Escalar antes de "}"
+                    self.done = True
+            elif self._depth == 1:
+                if c == ":":
+                    self._expect_value = True
+                elif c == ",":
+                    self._complete_value(i, completed)
+                elif c not in _WHITESPACE and self._value_start is None:
+                    if self._expect_value:
+                        self._value_start = i  # Número, true, false, null
+            i += 1
+        self._pos = i
+        return completed
+
+    def _close_string(self, end: int, completed: list):
+        if self._key_start is not None and not self._expect_value:
+            self._key = json.loads(self.buffer[self._key_start : end + 1])
+            self._key_start = None
+        elif self._expect_value:
+            self._complete_value(end + 1, completed)
+
+    def _complete_value(self, end: int, completed: list):
+        if self._value_start is None or self._key is None:
+            return
+        value = json.loads(self.buffer[self._value_start : end])
+        self.fields[self._key] = value
+        completed.append((self._key, value))
+        self._key = None
+        self._expect_value = False
+        self._value_start = None
+
+    def partial_string(self) -> Optional[Tuple[str, str]]:
+        """
+        (clave, texto recibido hasta ahora) si un valor string de primer
+        nivel está a medio llegar; para mostrar natural_response en vivo
+        """
+        if not (self._in_string and self._expect_value and self._depth == 1):
+            return None
+        raw = self.buffer[self._value_start :]
+        if self._escape:
+            raw = raw[:-1]  # No cortar una secuencia de escape a la mitad
+        try:
+            return self._key, json.loads(raw + '"')
+        except json.JSONDecodeError:
+            return None  # \uXXXX incompleto
@@ -1,8 +1,5 @@
-import pyaudio
 import numpy as np
-import librosa
 import time
-import tensorflow as tf  # Usaremos tf.lite.Interpreter en lugar de tflite-runtime para simplicidad en el desarrollo
 import logging
 import json
 from datetime import datetime
@@ -10,15 +7,30 @@ import os
 import sys
 import threading
 import queue
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
 import psutil
 
+try:
+    import pyaudio
+except ImportError:
+    pyaudio = None  # Sólo necesario para el micrófono (la réplica WAV no lo usa)
+
 # Agregar directorio raíz al path para imports
 sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
+from ring_buffer import RingBuffer
+import mfcc_frontend
+from mfcc_frontend import StreamingMFCC
+from tflite_backend import InferenceSession, create_interpreter
+from instrumentation import metrics, now_ns, record_latency
+from metrics_exporter import Metric, MetricsExporter
+
 # Imports de módulos de integración
 try:
     from config import Config
     from stt_engine import STTManager
+    from command_pipeline import CommandPipeline
 
     STT_ENABLED = True
     print("✅ Módulos STT cargados")
@@ -43,15 +55,23 @@ else:
     print("ℹ️  Modo básico: KWS únicamente")
 
 # --- CONFIGURACIÓN DEL MODELO Y AUDIO ---
-TFLITE_MODEL_PATH = "jeepy_kws_model_quantized.tflite"
+TFLITE_MODEL_PATH = (
+    "jeepy_kws_model_quantized.tflite"  # o jeepy_kws_model_int8.tflite (entrada int8)
+)
 SAMPLE_RATE = 16000  # Debe coincidir con el entrenamiento (16 kHz)
 MFCC_COUNT = 40  # Debe coincidir con el entrenamiento (40 coeficientes)
 MAX_PADDING_LENGTH = 40  # Debe coincidir con el entrenamiento (~40 para 1 segundo)
 FORMAT = (
-    pyaudio.paFloat32
+    pyaudio.paFloat32 if pyaudio else None
 )  # Usamos Float32 para evitar conversiones complejas si el modelo TFLite lo requiere
 CHANNELS = 1
 
+# --- CONFIGURACIÓN DEL INTÉRPRETE TFLITE ---
+TFLITE_BACKEND = None  # None = automático (litert > tflite_runtime > tensorflow)
+TFLITE_NUM_THREADS = 4  # Hilos de inferencia (RPi 4/5: 4 núcleos)
+TFLITE_USE_XNNPACK = True  # Delegado XNNPACK por defecto del runtime
+TFLITE_DELEGATE_PATH = None  # Delegado externo opcional (.so)
+
 # --- CONFIGURACIÓN DE ACTIVACIÓN ---
 ACTIVATION_THRESHOLD = (
     0.95  # Umbral de confianza (ajustar aquí, usar >0.95 por la precisión baja)
@@ -59,9 +79,9 @@ ACTIVATION_THRESHOLD = (
 
 # --- CONFIGURACIÓN DE VENTANA DESLIZANTE ---
 WINDOW_DURATION_MS = 1000  # Duración de cada ventana de análisis (1 segundo, mantener compatibilidad con modelo)
-STRIDE_MS = 250  # Desplazamiento entre ventanas (250-500ms)
+STRIDE_MS = 256  # Desplazamiento entre ventanas (múltiplo de hop_length=512 para MFCC incremental)
 WINDOW_SIZE = int(SAMPLE_RATE * WINDOW_DURATION_MS / 1000)  # 16000 samples
-STRIDE_SIZE = int(SAMPLE_RATE * STRIDE_MS / 1000)  # 4000 samples
+STRIDE_SIZE = int(SAMPLE_RATE * STRIDE_MS / 1000)  # 4096 samples (8 frames MFCC)
 
 # --- CONFIGURACIÓN ANTI-FALSOS POSITIVOS ---
 CONFIRMATION_COUNT = 2  # Número de detecciones consecutivas requeridas (2-3)
@@ -76,12 +96,18 @@ PRE_BUFFER_SIZE = int(SAMPLE_RATE * PRE_ACTIVATION_BUFFER_SECONDS)
 LOG_LEVEL = "INFO"  # DEBUG, INFO, WARNING, ERROR
 LOG_FILE = "kws_monitor.log"
 LOG_STATS_INTERVAL_SECONDS = 60  # Intervalo para registrar estadísticas
+METRICS_DUMP_PATH = "kws_metrics.json"  # Histogramas por etapa ('dump' y al salir)
+METRICS_EXPORTER_ENABLED = True  # Endpoint HTTP /metrics (Prometheus)
+METRICS_EXPORTER_HOST = "127.0.0.1"  # "0.0.0.0" para scraping remoto
+METRICS_EXPORTER_PORT = 9108
 ENABLE_DEBUG_AUDIO_DUMP = False  # Guardar audio cuando se detecta palabra clave (debug)
 DEBUG_AUDIO_PATH = "./debug_audio/"
 
 # --- CONFIGURACIÓN VAD Y THREADING ---
 VAD_INITIAL_THRESHOLD_RMS = 0.005  # Umbral inicial de energía para detectar voz
 QUEUE_SIZE = 20  # Tamaño de la cola de audio (aprox 5 segundos)
+CATCHUP_MIN_BACKLOG = 3  # Chunks pendientes para activar inferencia por lotes
+CATCHUP_MAX_BATCH = QUEUE_SIZE + 1  # Ventanas máximas por lote de recuperación
 CPU_MONITOR_INTERVAL = 2.0  # Segundos entre lecturas de CPU
 
 # --- CONFIGURACIÓN DE GRABACIÓN DE COMANDOS ---
@@ -95,6 +121,7 @@ RECORDING_MAX_DURATION_SEC = 10.0  # Duración máxima de grabación (safety tim
 RECORDING_MIN_DURATION_SEC = (
     0.5  # Duración mínima antes de permitir finalización por silencio
 )
+SAVE_COMMAND_AUDIO = True  # Persistir WAV en segundo plano (fuera del camino STT)
 CAPTURED_COMMANDS_DIR = "./captured_commands/"
 
 # --- CONFIGURACIÓN FASE 4: ROBUSTEZ ---
@@ -104,6 +131,10 @@ MAX_MICROPHONE_RECONNECT_ATTEMPTS = 5  # Intentos de reconexión antes de aborta
 ERROR_RECOVERY_COOLDOWN = 1.0  # Cooldown después de errores para evitar spam
 AUDIO_CHUNK_TIMEOUT = 2.0  # Timeout para detectar micrófono congelado
 
+# --- CONFIGURACIÓN DE RÉPLICA (--replay) ---
+REPLAY_SPEED = 1.0  # 1.0 = tiempo real, 0 = lo más rápido posible
+REPLAY_GAP_SECONDS = 3.0  # Silencio entre archivos (cierra grabación y cooldown)
+
 # --- CONFIGURACIÓN FASE 5: UX AVANZADO ---
 ENABLE_CONTROL_COMMANDS = True  # Habilitar comandos de control ("Jeepy, detente")
 CONTROL_COMMANDS = {
@@ -116,6 +147,7 @@ CONTROL_COMMANDS = {
     "calibrar": "recalibrate",
     "estado": "status",
     "estadísticas": "stats",
+    "métricas": "dump",
 }
 ENABLE_INTERACTIVE_MODE = True  # Permitir entrada de texto manual (desarrollo)
 LED_PATTERN_MONITORING = "slow_pulse"  # Patrón LED en modo monitoring
@@ -124,9 +156,12 @@ LED_PATTERN_ERROR = "fast_blink"  # Patrón LED en error
 
 # --- CONFIGURACIÓN DE INTEGRACIÓN STT ---
 ENABLE_STT_PROCESSING = True  # Habilitar transcripción automática de comandos
-STT_AUTO_DELETE_AUDIO = True  # Eliminar WAV después de transcribir
+STT_AUTO_DELETE_AUDIO = True  # No conservar el WAV de comandos transcritos
 STT_SAVE_TRANSCRIPTIONS = True  # Guardar transcripciones en archivo
 TRANSCRIPTIONS_DIR = "./transcriptions/"  # Directorio para transcripciones
+STT_WORKERS = 1  # Transcripciones en paralelo (procesos o hilos)
+STT_USE_PROCESS_POOL = None  # None = procesos para motores locales, hilos para APIs
+STT_STREAMING = None  # None = transcribir mientras se graba si el motor lo soporta
 
 # --- CONFIGURACIÓN DE INTEGRACIÓN GEMINI ---
 ENABLE_GEMINI_NLU = True  # Habilitar interpretación de comandos con Gemini
@@ -189,96 +224,236 @@ class AudioChunk:
         self.data = data
         self.timestamp = timestamp
         self.rms = rms
+        self.created_ns = now_ns()  # Para medir la espera en la cola
+        # Resultado precalculado en modo recuperación (lote)
+        self.prob = None
+        self.inference_time = 0.0
+
+
+# Marca de fin de la réplica en la cola de audio: el InferenceThread procesa
+# lo pendiente, cierra la grabación abierta y termina
+END_OF_STREAM = object()
+
+
+STATE_ICONS = {
+    STATE_MONITORING: "👀",
+    STATE_RECORDING: "🔴",
+    STATE_PROCESSING: "⚙️",
+    STATE_TRANSCRIBING: "📝",
+    STATE_PROCESSING_NLU: "🤖",
+    STATE_ERROR: "❌",
+    STATE_PAUSED: "⏸️",
+}
+
+
+class StateSnapshot:
+    """Foto inmutable del estado del sistema (se reemplaza, nunca se modifica)"""
+
+    __slots__ = (
+        "fps",
+        "cpu_usage",
+        "last_prediction",
+        "is_speaking",
+        "noise_level",
+        "current_state",
+        "paused",
+        "last_error",
+        "version",
+    )
+
+    def __init__(
+        self,
+        fps=0.0,
+        cpu_usage=0.0,
+        last_prediction=0.0,
+        is_speaking=False,
+        noise_level=0.0,
+        current_state=STATE_MONITORING,
+        paused=False,
+        last_error=None,
+        version=0,
+    ):
+        self.fps = fps
+        self.cpu_usage = cpu_usage
+        self.last_prediction = last_prediction
+        self.is_speaking = is_speaking
+        self.noise_level = noise_level
+        self.current_state = current_state
+        self.paused = paused
+        self.last_error = last_error
+        self.version = version
+
+    def replace(self, **changes):
+        """Nueva foto con los campos indicados cambiados y versión + 1"""
+        snap = StateSnapshot.__new__(StateSnapshot)
+        for name in _SNAPSHOT_FIELDS:
+            setattr(snap, name, changes.get(name, getattr(self, name)))
+        snap.version = self.version + 1
+        return snap
+
+
+_SNAPSHOT_FIELDS = StateSnapshot.__slots__[:-1]  # Todos menos version
 
 
 class SystemState:
-    """Estado compartido thread-safe para monitoreo"""
+    """
+    Estado compartido publicado como fotos inmutables.
+
+    Los lectores (UI, /metrics, comprobaciones del bucle) leen la referencia
+    actual sin lock: reasignar un atributo es atómico en CPython y la foto
+    nunca cambia tras publicarse. Los escritores se serializan con un lock
+    propio para no perder actualizaciones concurrentes (la inferencia escribe
+    por chunk; el resto, rara vez). Los comandos de control viajan por una
+    cola en lugar de un campo sondeado.
+    """
+
+    __slots__ = ("_snapshot", "_write_lock", "_commands")
 
     def __init__(self):
-        self.fps = 0.0
-        self.cpu_usage = 0.0
-        self.last_prediction = 0.0
-        self.is_speaking = False
-        self.noise_level = 0.0
-        self.current_state = STATE_MONITORING  # Estado del sistema
-        self.paused = False
-        self.control_command = None  # Para comunicación de comandos de control
-        self.last_error = None
-        self.lock = threading.Lock()
+        self._snapshot = StateSnapshot()
+        self._write_lock = threading.Lock()
+        self._commands = queue.SimpleQueue()
+
+    def snapshot(self):
+        """Foto consistente del estado actual (sin bloquear)"""
+        return self._snapshot
+
+    def _publish(self, **changes):
+        with self._write_lock:
+            self._snapshot = self._snapshot.replace(**changes)
+
+    # Lectura de campos sueltos (compatibilidad)
+    fps = property(lambda self: self._snapshot.fps)
+    cpu_usage = property(lambda self: self._snapshot.cpu_usage)
+    last_prediction = property(lambda self: self._snapshot.last_prediction)
+    is_speaking = property(lambda self: self._snapshot.is_speaking)
+    noise_level = property(lambda self: self._snapshot.noise_level)
+    current_state = property(lambda self: self._snapshot.current_state)
+    last_error = property(lambda self: self._snapshot.last_error)
 
     def update_metrics(self, fps=None, cpu=None, pred=None, speaking=None, noise=None):
-        with self.lock:
-            if fps is not None:
-                self.fps = fps
-            if cpu is not None:
-                self.cpu_usage = cpu
-            if pred is not None:
-                self.last_prediction = pred
-            if speaking is not None:
-                self.is_speaking = speaking
-            if noise is not None:
-                self.noise_level = noise
+        # Camino caliente (una o dos veces por chunk): constructor directo
+        with self._write_lock:
+            old = self._snapshot
+            self._snapshot = StateSnapshot(
+                old.fps if fps is None else fps,
+                old.cpu_usage if cpu is None else cpu,
+                old.last_prediction if pred is None else pred,
+                old.is_speaking if speaking is None else speaking,
+                old.noise_level if noise is None else noise,
+                old.current_state,
+                old.paused,
+                old.last_error,
+                old.version + 1,
+            )
 
     def set_state(self, state):
-        with self.lock:
-            self.current_state = state
+        self._publish(current_state=state)
 
     def get_state(self):
-        with self.lock:
-            return self.current_state
+        return self._snapshot.current_state
 
     def set_paused(self, paused):
-        with self.lock:
-            self.paused = paused
+        self._publish(paused=paused)
 
     def is_paused(self):
-        with self.lock:
-            return self.paused
+        return self._snapshot.paused
 
     def send_control_command(self, command):
         """Envía comando de control al sistema"""
-        with self.lock:
-            self.control_command = command
+        self._commands.put(command)
 
-    def get_control_command(self):
-        """Obtiene y limpia comando de control pendiente"""
-        with self.lock:
-            cmd = self.control_command
-            self.control_command = None
-            return cmd
+    def get_control_command(self, timeout=None):
+        """
+        Obtiene el siguiente comando de control pendiente
+
+        Args:
+            timeout: Segundos a esperar uno (None = no esperar)
+
+        Returns:
+            Comando o None si no hay
+        """
+        try:
+            if timeout is None:
+                # empty() evita el costo de la excepción en cada chunk
+                return None if self._commands.empty() else self._commands.get_nowait()
+            return self._commands.get(timeout=timeout)
+        except queue.Empty:
+            return None
 
     def set_error(self, error_msg):
-        with self.lock:
-            self.last_error = error_msg
-            self.current_state = STATE_ERROR
+        self._publish(last_error=error_msg, current_state=STATE_ERROR)
 
     def get_status_string(self):
-        with self.lock:
-            vad_state = "🗣️" if self.is_speaking else ".."
-            state_icons = {
-                STATE_MONITORING: "👀",
-                STATE_RECORDING: "🔴",
-                STATE_PROCESSING: "⚙️",
-                STATE_TRANSCRIBING: "📝",
-                STATE_PROCESSING_NLU: "🤖",
-                STATE_ERROR: "❌",
-                STATE_PAUSED: "⏸️",
-            }
-            state_icon = state_icons.get(self.current_state, "❓")
-            pause_marker = " [PAUSADO]" if self.paused else ""
-            return f"{state_icon} CPU: {self.cpu_usage:4.1f}% | FPS: {self.fps:4.1f} | VAD: {vad_state} | Conf: {self.last_prediction:.4f} | Noise: {self.noise_level:.4f}{pause_marker}"
+        snap = self._snapshot
+        vad_state = "🗣️" if snap.is_speaking else ".."
+        state_icon = STATE_ICONS.get(snap.current_state, "❓")
+        pause_marker = " [PAUSADO]" if snap.paused else ""
+        return f"{state_icon} CPU: {snap.cpu_usage:4.1f}% | FPS: {snap.fps:4.1f} | VAD: {vad_state} | Conf: {snap.last_prediction:.4f} | Noise: {snap.noise_level:.4f}{pause_marker}"
 
 
-class AudioCaptureThread(threading.Thread):
-    """Hilo productor: Captura audio con reconexión automática"""
+class AudioSourceThread(threading.Thread):
+    """
+    Hilo productor base: entrega AudioChunk float32 de STRIDE_SIZE muestras a
+    la cola del InferenceThread. Las subclases implementan run().
+    """
 
-    def __init__(self, device_index, queue, stop_event, system_state):
+    def __init__(self, queue, stop_event, system_state):
         super().__init__()
-        self.device_index = device_index
         self.queue = queue
         self.stop_event = stop_event
         self.state = system_state
         self.daemon = True
+        self.completed = False  # La fuente terminó sin error (fin de la réplica)
+        # Contadores para /metrics (un solo escritor: este hilo)
+        self.chunks_captured = 0
+        self.chunks_dropped = 0
+
+    def _emit(self, data, timestamp, block=False):
+        """
+        Encola un chunk
+
+        Args:
+            data: Audio float32 del chunk
+            timestamp: Instante de captura (reloj del audio)
+            block: Esperar espacio en la cola en lugar de descartar el chunk
+                más antiguo (réplica acelerada: no se pierde audio)
+        """
+        rms = np.sqrt(np.mean(data**2))
+        chunk = AudioChunk(data, timestamp, rms)
+        self.chunks_captured += 1
+
+        if block:
+            self._put_blocking(chunk)
+            return
+
+        try:
+            self.queue.put(chunk, block=False)
+        except queue.Full:
+            # Drop oldest frame
+            self.chunks_dropped += 1
+            try:
+                self.queue.get_nowait()
+                self.queue.put(chunk, block=False)
+            except:
+                pass
+
+    def _put_blocking(self, item):
+        """Encola esperando espacio (hasta stop_event)"""
+        while not self.stop_event.is_set():
+            try:
+                self.queue.put(item, timeout=0.1)
+                return
+            except queue.Full:
+                continue
+
+
+class AudioCaptureThread(AudioSourceThread):
+    """Hilo productor: Captura audio con reconexión automática"""
+
+    def __init__(self, device_index, queue, stop_event, system_state):
+        super().__init__(queue, stop_event, system_state)
+        self.device_index = device_index
         self.last_chunk_time = time.time()
 
     def _open_stream(self, p):
@@ -329,19 +504,7 @@ class AudioCaptureThread(threading.Thread):
                         data = stream.read(STRIDE_SIZE, exception_on_overflow=False)
                         np_data = np.frombuffer(data, dtype=np.float32)
                         self.last_chunk_time = time.time()
-
-                        rms = np.sqrt(np.mean(np_data**2))
-                        chunk = AudioChunk(np_data, time.time(), rms)
-
-                        try:
-                            self.queue.put(chunk, block=False)
-                        except queue.Full:
-                            # Drop oldest frame
-                            try:
-                                self.queue.get_nowait()
-                                self.queue.put(chunk, block=False)
-                            except:
-                                pass
+                        self._emit(np_data, self.last_chunk_time)
 
                     except IOError as e:
                         print(f"⚠ Error I/O: {e}, reconectando...")
@@ -374,6 +537,114 @@ class AudioCaptureThread(threading.Thread):
             print("✓ Captura detenida")
 
 
+def read_wav_float32(path):
+    """Lee un WAV PCM 16-bit mono como float32 (formato del micrófono)"""
+    import wave
+
+    with wave.open(str(path), "rb") as wf:
+        if (
+            wf.getnchannels() != CHANNELS
+            or wf.getsampwidth() != 2
+            or wf.getframerate() != SAMPLE_RATE
+        ):
+            raise ValueError(f"{path}: se requiere WAV mono 16-bit a {SAMPLE_RATE} Hz")
+        pcm = np.frombuffer(wf.readframes(wf.getnframes()), dtype=np.int16)
+    return pcm.astype(np.float32) / 32768.0
+
+
+def expand_wav_paths(paths):
+    """Archivos WAV de una lista de archivos y directorios (orden estable)"""
+    files = []
+    for path in paths:
+        if os.path.isdir(path):
+            files += sorted(
+                os.path.join(path, f) for f in os.listdir(path) if f.endswith(".wav")
+            )
+        else:
+            files.append(path)
+    return files
+
+
+class WavReplayThread(AudioSourceThread):
+    """
+    Hilo productor: reproduce WAVs como si fueran el micrófono.
+
+    Entrega los mismos chunks de STRIDE_SIZE que AudioCaptureThread con
+    timestamps del reloj del audio (inicio + muestras / SAMPLE_RATE), así que
+    VAD, confirmaciones y grabación se comportan igual a cualquier velocidad.
+    Con speed > 0 se espera entre chunks (1.0 = tiempo real) y la cola
+    descarta como con el micrófono; con speed = 0 se entrega lo más rápido
+    posible esperando espacio en la cola.
+    """
+
+    def __init__(
+        self,
+        paths,
+        queue,
+        stop_event,
+        system_state,
+        speed=REPLAY_SPEED,
+        gap_seconds=REPLAY_GAP_SECONDS,
+        loops=1,
+    ):
+        super().__init__(queue, stop_event, system_state)
+        self.files = expand_wav_paths(paths)
+        self.speed = speed
+        self.gap = np.zeros(int(gap_seconds * SAMPLE_RATE), dtype=np.float32)
+        self.loops = loops
+        self.samples_sent = 0
+        self.wall_time = 0.0
+
+    def _replay(self, audio, start_wall, start_clock):
+        for offset in range(0, len(audio), STRIDE_SIZE):
+            if self.stop_event.is_set():
+                return
+            data = audio[offset : offset + STRIDE_SIZE]
+            if len(data) < STRIDE_SIZE:
+                data = np.pad(data, (0, STRIDE_SIZE - len(data)))
+            timestamp = start_clock + self.samples_sent / SAMPLE_RATE
+            if self.speed > 0:
+                delay = start_wall + (timestamp - start_clock) / self.speed
+                delay -= time.time()
+                if delay > 0:
+                    time.sleep(delay)
+            self._emit(data, timestamp, block=self.speed <= 0)
+            self.samples_sent += STRIDE_SIZE
+
+    def run(self):
+        if not self.files:
+            print("❌ Réplica: no hay archivos WAV")
+            self.state.set_error("Réplica sin archivos")
+            return
+
+        print(
+            f"✓ Réplica iniciada ({len(self.files)} archivos, "
+            f"{'máxima velocidad' if self.speed <= 0 else f'{self.speed:g}x'})"
+        )
+        start_wall = start_clock = time.time()
+        for _ in range(self.loops):
+            for path in self.files:
+                try:
+                    audio = read_wav_float32(path)
+                except (OSError, ValueError) as e:
+                    print(f"⚠ Réplica: {e}")
+                    continue
+                audio = np.concatenate((audio, self.gap))
+                self._replay(audio, start_wall, start_clock)
+
+        # El InferenceThread consume lo encolado (incluidos los chunks ya
+        # sacados por un lote de recuperación) antes de llegar a la marca
+        self._put_blocking(END_OF_STREAM)
+
+        self.wall_time = time.time() - start_wall
+        audio_seconds = self.samples_sent / SAMPLE_RATE
+        print(
+            f"\n✓ Réplica completada: {audio_seconds:.1f}s de audio en "
+            f"{self.wall_time:.1f}s ({audio_seconds / max(self.wall_time, 1e-9):.1f}x tiempo real)"
+        )
+        self.completed = True
+
+
 class FeedbackManager:
     """Gestiona feedback de usuario (sonidos y GPIO)"""
 
@@ -430,6 +701,8 @@ def save_wav_file(audio_data, filename, sample_rate=SAMPLE_RATE):
     """Guarda audio en formato WAV"""
     import wave
 
+    start = now_ns()
+
     # Convertir float32 a int16
     audio_int16 = (audio_data * 32767).astype(np.int16)
 
@@ -439,26 +712,54 @@ def save_wav_file(audio_data, filename, sample_rate=SAMPLE_RATE):
         wf.setframerate(sample_rate)
         wf.writeframes(audio_int16.tobytes())
 
+    record_latency("io.wav_write", now_ns() - start)
+
+
+def command_timestamp(audio_file):
+    """Timestamp del comando: el del nombre del WAV o, sin WAV, el actual"""
+    if audio_file:
+        return os.path.basename(audio_file).replace("cmd_", "").replace(".wav", "")
+    return datetime.now().strftime("%Y%m%d_%H%M%S")
+
+
+def save_wav_async(writer, audio_data, filename, logger):
+    """Encola la escritura del WAV en writer y registra si falla"""
+
+    def check(future):
+        error = future.exception()
+        if error:
+            logger.error(f"Error guardando {filename}: {error}")
+            print(f"⚠️ No se pudo guardar {filename}: {error}")
+
+    writer.submit(save_wav_file, audio_data, filename).add_done_callback(check)
+
 
 class InferenceThread(threading.Thread):
     """Hilo consumidor: Procesa audio, VAD e inferencia"""
 
-    def __init__(self, queue, stop_event, system_state, logger):
+    def __init__(self, queue, stop_event, system_state, logger, replay=False):
         super().__init__()
         self.queue = queue
         self.stop_event = stop_event
         self.state = system_state
         self.logger = logger
+        self.replay = replay  # Al salir, terminar los comandos ya encolados
         self.daemon = True
 
     def run(self):
         # Inicializar componentes en este hilo
-        interpreter, input_details, output_details = initialize_tflite_interpreter()
+        interpreter, input_details, output_details = initialize_tflite_interpreter(
+            self.logger
+        )
         if not interpreter:
             self.state.set_state(STATE_ERROR)
             return
+        session = InferenceSession(interpreter)
 
         sliding_buffer = SlidingWindowBuffer(WINDOW_SIZE, STRIDE_SIZE)
+        mfcc_frontend = StreamingMFCC(
+            SAMPLE_RATE, WINDOW_SIZE, n_mfcc=MFCC_COUNT, max_frames=MAX_PADDING_LENGTH
+        )
         pre_activation_buffer = CircularAudioBuffer(
             PRE_ACTIVATION_BUFFER_SECONDS, SAMPLE_RATE
         )
@@ -466,28 +767,23 @@ class InferenceThread(threading.Thread):
             CONFIRMATION_COUNT, CONFIRMATION_WINDOW_MS
         )
         stats = KWSStatistics()
+        self.stats = stats
         feedback = FeedbackManager()
+        pending_chunks = deque()  # Chunks ya inferidos en lote, en orden temporal
+        batch_features = np.zeros(
+            (CATCHUP_MAX_BATCH, MFCC_COUNT, MAX_PADDING_LENGTH, 1), dtype=np.float32
+        )
         error_manager = ErrorRecoveryManager()
 
-        # Inicializar STT Manager
-        if STT_ENABLED and ENABLE_STT_PROCESSING:
-            try:
-                self.stt_manager = STTManager()
-                self.logger.info(f"STT Manager inicializado: {Config.STT_ENGINE}")
-                print(f"🎤 STT habilitado: {Config.STT_ENGINE}")
-            except Exception as e:
-                self.logger.error(f"Error inicializando STT: {e}")
-                print(f"⚠️ STT no disponible: {e}")
-                self.stt_manager = None
-        else:
-            self.stt_manager = None
-            if not STT_ENABLED:
-                print("ℹ️ STT deshabilitado (módulos no disponibles)")
-
         # Inicializar Gemini Engine y Vehicle Controller
         if GEMINI_ENABLED and ENABLE_GEMINI_NLU:
             try:
-                self.gemini_engine = GeminiEngine()
+                if Config.GEMINI_ASYNC:
+                    from gemini_async import AsyncGeminiEngine
+
+                    self.gemini_engine = AsyncGeminiEngine()
+                else:
+                    self.gemini_engine = GeminiEngine()
                 self.vehicle_controller = VehicleController()
                 self.logger.info(f"Gemini NLU inicializado: {Config.GEMINI_MODEL}")
                 print(f"🤖 Gemini habilitado: {Config.GEMINI_MODEL}")
@@ -502,6 +798,47 @@ class InferenceThread(threading.Thread):
             if not GEMINI_ENABLED:
                 print("ℹ️ Gemini deshabilitado (módulos no disponibles)")
 
+        # Escritura de WAV en segundo plano (la SD no bloquea el comando)
+        self.audio_writer = ThreadPoolExecutor(max_workers=1, thread_name_prefix="wav")
+
+        # Inicializar pipeline post-activación (STT en pool + Gemini en hilo)
+        self.pipeline = None
+        if STT_ENABLED and ENABLE_STT_PROCESSING:
+            try:
+                self.pipeline = CommandPipeline(
+                    gemini_engine=self.gemini_engine,
+                    stt_workers=STT_WORKERS,
+                    use_processes=STT_USE_PROCESS_POOL,
+                    streaming=STT_STREAMING,
+                    # Gemini en streaming: ejecutar la acción desde el hilo NLU
+                    # en cuanto se conoce, sin esperar natural_response
+                    on_action=(
+                        self.vehicle_controller.execute_action
+                        if self.vehicle_controller
+                        and GEMINI_AUTO_EXECUTE
+                        and Config.GEMINI_STREAMING
+                        else None
+                    ),
+                )
+                CommandResultThread(
+                    self.pipeline,
+                    self.vehicle_controller,
+                    self.stop_event,
+                    self.logger,
+                    self.audio_writer,
+                ).start()
+                mode = "procesos" if self.pipeline.use_processes else "hilos"
+                self.logger.info(f"Pipeline STT inicializado: {Config.STT_ENGINE}")
+                print(f"🎤 STT habilitado: {Config.STT_ENGINE} ({STT_WORKERS} {mode})")
+                if self.pipeline.streaming:
+                    print("🎤 STT en streaming: transcripción durante la grabación")
+            except Exception as e:
+                self.logger.error(f"Error inicializando STT: {e}")
+                print(f"⚠️ STT no disponible: {e}")
+                self.pipeline = None
+        elif not STT_ENABLED:
+            print("ℹ️ STT deshabilitado (módulos no disponibles)")
+
         # Variables para VAD y métricas
         noise_floor = VAD_INITIAL_THRESHOLD_RMS
         vad_threshold = VAD_INITIAL_THRESHOLD_RMS * 1.5
@@ -509,6 +846,8 @@ class InferenceThread(threading.Thread):
 
         # Variables para grabación
         recording_buffer = []
+        stream_job = None  # Transcripción incremental del comando en curso
+        last_partial = ""
         recording_start_time = 0
         silence_start_time = None
         silence_chunks_count = 0
@@ -529,31 +868,67 @@ class InferenceThread(threading.Thread):
                 )
                 continue
 
-            # Verificar si está pausado
+            # En pausa se espera el siguiente comando (p.ej. resume) en la cola
             if self.state.is_paused():
-                time.sleep(0.1)
+                control_cmd = self.state.get_control_command(timeout=0.1)
+                if control_cmd:
+                    self._handle_control_command(
+                        control_cmd, stats, confirmation_tracker, feedback
+                    )
                 continue
 
-            try:
-                chunk = self.queue.get(timeout=1.0)
-            except queue.Empty:
-                continue
+            if pending_chunks:
+                chunk = pending_chunks.popleft()
+            else:
+                try:
+                    chunk = self.queue.get(timeout=1.0)
+                except queue.Empty:
+                    continue
 
-            current_time = time.time()
+            # Fin de la réplica: no quedan chunks, cerrar el último comando
+            if chunk is END_OF_STREAM:
+                if self.state.get_state() == STATE_RECORDING and recording_buffer:
+                    self._finish_recording(
+                        recording_buffer, feedback, current_time, stream_job
+                    )
+                    self.state.set_state(STATE_MONITORING)
+                break
+
+            if chunk.prob is None:
+                # Modo recuperación: si hay backlog, inferir todo en un lote
+                if (
+                    self.state.get_state() == STATE_MONITORING
+                    and self.queue.qsize() >= CATCHUP_MIN_BACKLOG
+                ):
+                    batch = self._run_catchup_batch(
+                        chunk, sliding_buffer, mfcc_frontend, session, batch_features
+                    )
+                    chunk = batch[0]
+                    pending_chunks.extend(batch[1:])
+
+            chunk_start = now_ns()
+            record_latency("kws.queue_wait", chunk_start - chunk.created_ns)
+
+            # Reloj de captura del chunk: en lote llega tarde y en la réplica
+            # acelerada el reloj del audio avanza más rápido que time.time()
+            current_time = chunk.timestamp
             current_state = self.state.get_state()
 
             # === ESTADO: MONITORING ===
             if current_state == STATE_MONITORING:
-                # 1. Actualizar buffers
-                sliding_buffer.add_samples(chunk.data)
+                # 1. Actualizar buffers (en lote la ventana ya se actualizó)
+                if chunk.prob is None:
+                    sliding_buffer.add_samples(chunk.data)
                 pre_activation_buffer.write(chunk.data)
 
                 # 2. Lógica VAD y Ruido Adaptativo
+                vad_start = now_ns()
                 noise_floor = (0.95 * noise_floor) + (0.05 * chunk.rms)
                 vad_threshold = noise_floor * 1.5
 
                 is_speaking = chunk.rms > vad_threshold
                 self.state.update_metrics(noise=noise_floor, speaking=is_speaking)
+                record_latency("kws.vad", now_ns() - vad_start)
 
                 # Si es silencio absoluto, saltar inferencia (ahorro CPU)
                 if not is_speaking and chunk.rms < VAD_INITIAL_THRESHOLD_RMS:
@@ -563,64 +938,92 @@ class InferenceThread(threading.Thread):
                 if not sliding_buffer.is_ready():
                     continue
 
-                # 3. Inferencia
-                window = sliding_buffer.get_window()
-                mfccs_input = extract_mfcc(window)
-
-                if mfccs_input is not None:
+                # 3. Inferencia (o resultado del lote de recuperación)
+                if chunk.prob is not None:
+                    prob = chunk.prob
+                    inf_time = chunk.inference_time
+                    now = chunk.timestamp  # Confirmación en orden temporal
+                else:
+                    mfcc_start = now_ns()
+                    window = sliding_buffer.get_window()
+                    mfccs_input = mfcc_frontend.compute(
+                        window, sliding_buffer.get_position()
+                    )
+                    inference_start = now_ns()
+                    record_latency("kws.mfcc", inference_start - mfcc_start)
                     start_time = time.time()
-                    interpreter.set_tensor(input_details[0]["index"], mfccs_input)
-                    interpreter.invoke()
-                    output_data = interpreter.get_tensor(output_details[0]["index"])
-                    prob = output_data[0][0]
+                    prob = session.run(mfccs_input)
                     inf_time = time.time() - start_time
-
-                    # Métricas FPS
-                    now = time.time()
-                    inference_count_window.append(now)
-                    inference_count_window = [
-                        t for t in inference_count_window if now - t < 1.0
-                    ]
-                    fps = len(inference_count_window)
-
-                    self.state.update_metrics(pred=prob, fps=fps)
-                    stats.record_inference(inf_time)
-
-                    # 4. Lógica de Activación
-                    if prob >= ACTIVATION_THRESHOLD:
-                        if not confirmation_tracker.is_in_cooldown(now):
-                            confirmation_tracker.add_detection(prob, now)
-                            stats.record_detection(prob, confirmed=False)
-
-                            if confirmation_tracker.is_confirmed():
-                                self.logger.info(
-                                    "ACTIVACIÓN CONFIRMADA",
-                                    extra={"confidence": float(prob)},
-                                )
-
-                                # TRANSICIÓN A RECORDING
-                                self.state.set_state(STATE_RECORDING)
-                                feedback.signal_listening()
-
-                                # Inicializar buffer de grabación con pre-activación
-                                recording_buffer = [
-                                    pre_activation_buffer.get_buffer_contents()
-                                ]
-                                recording_start_time = current_time
-                                silence_start_time = None
-                                silence_chunks_count = 0
-
-                                print("\n🔴 GRABANDO COMANDO (habla ahora)...\n")
-
-                                confirmation_tracker.activate(now)
-                                confirmation_tracker.clear()
-                    else:
-                        confirmation_tracker.clear_old_detections(now)
+                    record_latency("kws.inference", now_ns() - inference_start)
+                    now = current_time
+
+                # Captura -> probabilidad (incluye cola, lote y MFCC)
+                record_latency("kws.detect", now_ns() - chunk.created_ns)
+
+                # Métricas FPS
+                inference_count_window.append(now)
+                inference_count_window = [
+                    t for t in inference_count_window if now - t < 1.0
+                ]
+                fps = len(inference_count_window)
+
+                self.state.update_metrics(pred=prob, fps=fps)
+                stats.record_inference(inf_time)
+
+                # 4. Lógica de Activación
+                if prob >= ACTIVATION_THRESHOLD:
+                    if not confirmation_tracker.is_in_cooldown(now):
+                        confirmation_tracker.add_detection(prob, now)
+                        stats.record_detection(prob, confirmed=False)
+
+                        if confirmation_tracker.is_confirmed():
+                            self.logger.info(
+                                "ACTIVACIÓN CONFIRMADA",
+                                extra={"confidence": float(prob)},
+                            )
+
+                            # TRANSICIÓN A RECORDING
+                            self.state.set_state(STATE_RECORDING)
+                            feedback.signal_listening()
+
+                            # Abrir la conexión a Gemini mientras habla el usuario
+                            if (
+                                hasattr(self.gemini_engine, "prewarm")
+                                and Config.GEMINI_PREWARM
+                            ):
+                                self.gemini_engine.prewarm()
+
+                            # Inicializar buffer de grabación con pre-activación
+                            recording_buffer = [
+                                pre_activation_buffer.get_buffer_contents()
+                            ]
+                            recording_start_time = current_time
+                            silence_start_time = None
+                            silence_chunks_count = 0
+
+                            # Empezar a transcribir desde la pre-activación
+                            if self.pipeline and self.pipeline.streaming:
+                                stream_job = self.pipeline.start_stream(SAMPLE_RATE)
+                                self.pipeline.feed(stream_job, recording_buffer[0])
+                                last_partial = ""
+
+                            print("\n🔴 GRABANDO COMANDO (habla ahora)...\n")
+
+                            confirmation_tracker.activate(now)
+                            confirmation_tracker.clear()
+                else:
+                    confirmation_tracker.clear_old_detections(now)
 
             # === ESTADO: RECORDING ===
             elif current_state == STATE_RECORDING:
                 # Añadir chunk al buffer de grabación
                 recording_buffer.append(chunk.data)
+                if stream_job:
+                    self.pipeline.feed(stream_job, chunk.data)
+                    partial = stream_job.partial()
+                    if partial and partial != last_partial:
+                        print(f"   ✏️  {partial}")
+                        last_partial = partial
 
                 # Actualizar noise floor incluso durante grabación
                 noise_floor = (0.95 * noise_floor) + (0.05 * chunk.rms)
@@ -646,11 +1049,14 @@ class InferenceThread(threading.Thread):
                         and recording_duration >= RECORDING_MIN_DURATION_SEC
                     ):
                         # FIN DE GRABACIÓN POR SILENCIO
-                        self._finish_recording(recording_buffer, feedback, current_time)
+                        self._finish_recording(
+                            recording_buffer, feedback, current_time, stream_job
+                        )
 
                         # TRANSICIÓN A MONITORING
                         self.state.set_state(STATE_MONITORING)
                         recording_buffer = []
+                        stream_job = None
 
                 else:
                     # Hay voz, resetear contador de silencio
@@ -662,12 +1068,73 @@ class InferenceThread(threading.Thread):
                     self.logger.warning(
                         f"Grabación alcanzó timeout máximo ({RECORDING_MAX_DURATION_SEC}s)"
                     )
-                    self._finish_recording(recording_buffer, feedback, current_time)
+                    self._finish_recording(
+                        recording_buffer, feedback, current_time, stream_job
+                    )
                     self.state.set_state(STATE_MONITORING)
                     recording_buffer = []
+                    stream_job = None
 
         # Cleanup
+        if self.pipeline:
+            self.pipeline.shutdown(wait=self.replay, cancel_futures=not self.replay)
+        if hasattr(self.gemini_engine, "close"):
+            self.gemini_engine.close()
+        self.audio_writer.shutdown(wait=True)
         feedback.cleanup()
+        if metrics.dump_json(METRICS_DUMP_PATH):
+            print(f"📈 Métricas por etapa guardadas en {METRICS_DUMP_PATH}")
+
+    def _run_catchup_batch(
+        self, first_chunk, sliding_buffer, mfcc_frontend, session, batch_features
+    ):
+        """
+        Drena la cola y ejecuta todas las ventanas pendientes en una sola
+        inferencia por lotes. Retorna los chunks en orden de captura con
+        prob ya calculada; el bucle principal los procesa uno a uno (VAD,
+        confirmación, grabación) como si hubieran llegado a tiempo; si el lote
+        alcanza END_OF_STREAM, la marca va al final de la lista.
+        """
+        batch_start = now_ns()
+        chunks = []
+        end_of_stream = False
+        chunk = first_chunk
+        # Ventanas solapadas, una por chunk: cada chunk se escribe en la
+        # ventana y se calcula su MFCC (copiado al lote) antes de sacar el
+        # siguiente de la cola, así cada salto se evalúa sobre su propio audio
+        # (get_window() es una vista válida sólo hasta la próxima escritura).
+        # La cola es FIFO con un solo productor: los chunks llegan en orden.
+        while chunk is not None:
+            sliding_buffer.add_samples(chunk.data)
+            features = mfcc_frontend.compute(
+                sliding_buffer.get_window(), sliding_buffer.get_position()
+            )
+            np.copyto(batch_features[len(chunks)], features[0])
+            chunks.append(chunk)
+            chunk = None
+            if len(chunks) < len(batch_features):
+                try:
+                    chunk = self.queue.get_nowait()
+                except queue.Empty:
+                    pass
+                if chunk is END_OF_STREAM:
+                    chunk, end_of_stream = None, True
+
+        start_time = time.time()
+        probs = session.run_batch(batch_features[: len(chunks)])
+        per_chunk_time = (time.time() - start_time) / len(chunks)
+
+        for c, prob in zip(chunks, probs):
+            c.prob = prob
+            c.inference_time = per_chunk_time
+        record_latency("kws.catchup_batch", now_ns() - batch_start)
+
+        self.logger.debug(
+            f"Recuperación por lotes: {len(chunks)} ventanas en {per_chunk_time * len(chunks) * 1000:.1f} ms"
+        )
+        if end_of_stream:
+            chunks.append(END_OF_STREAM)
+        return chunks
 
     def _handle_control_command(self, command, stats, confirmation_tracker, feedback):
         """Procesa comandos de control del sistema"""
@@ -698,95 +1165,202 @@ class InferenceThread(threading.Thread):
 
         elif command == "stats":
             stats.print_summary(self.logger)
+            intent = self.gemini_engine.intent_stats() if self.gemini_engine else None
+            if intent:
+                print(
+                    f"⚡ Intención local: {intent['hits']} aciertos, "
+                    f"{intent['escalations']} a Gemini ({intent['hit_rate'] * 100:.0f}%), "
+                    f"~{intent['saved_ms'] / 1000:.1f}s ahorrados"
+                )
+            cache = self.gemini_engine.cache_stats() if self.gemini_engine else None
+            if cache:
+                print(
+                    f"💾 Caché NLU: {cache['hits']} aciertos "
+                    f"({cache['near_hits']} semánticos), {cache['misses']} fallos, "
+                    f"{cache['entries']} entradas"
+                )
+            if hasattr(self.gemini_engine, "connection_stats"):
+                conn = self.gemini_engine.connection_stats()
+                print(
+                    f"🔁 Gemini asíncrono: {conn['prewarms']} pre-calentamientos, "
+                    f"{conn['deadline_misses']} fuera de plazo, "
+                    f"{conn['cancelled']} canceladas"
+                )
+
+        elif command == "dump":
+            path = metrics.dump_json(METRICS_DUMP_PATH)
+            if path:
+                print(f"\n📈 Métricas por etapa guardadas en {path}")
+            else:
+                print("\nℹ️  Instrumentación desactivada (JEEPY_INSTRUMENTATION=0)")
 
     def _print_detailed_status(self, stats):
         """Imprime estado detallado del sistema"""
         print("\n" + "=" * 60)
         print("📊 ESTADO DETALLADO DEL SISTEMA")
         print("=" * 60)
-        print(f"Estado actual: {self.state.get_state()}")
-        print(f"Pausado: {self.state.is_paused()}")
-        print(f"FPS: {self.state.fps:.1f}")
-        print(f"CPU: {self.state.cpu:.1f}%")
-        print(f"Nivel de ruido: {self.state.noise_level:.4f}")
-        print(f"Hablando: {self.state.is_speaking}")
+        snap = self.state.snapshot()
+        print(f"Estado actual: {snap.current_state}")
+        print(f"Pausado: {snap.paused}")
+        print(f"FPS: {snap.fps:.1f}")
+        print(f"CPU: {snap.cpu_usage:.1f}%")
+        print(f"Nivel de ruido: {snap.noise_level:.4f}")
+        print(f"Hablando: {snap.is_speaking}")
         print(f"\nEstadísticas KWS:")
         print(f"  Total inferencias: {stats.total_inferences}")
-        print(f"  Detecciones: {stats.detections}")
-        print(f"  Activaciones confirmadas: {stats.confirmed_activations}")
-        print(f"  Falsos positivos: {stats.false_positives}")
-        if stats.detections > 0:
+        print(f"  Detecciones: {stats.total_detections_above_threshold}")
+        print(f"  Activaciones confirmadas: {stats.total_confirmed_activations}")
+        if stats.total_detections_above_threshold > 0:
             print(
-                f"  Tasa de confirmación: {100 * stats.confirmed_activations / stats.detections:.1f}%"
+                f"  Tasa de confirmación: {100 * stats.total_confirmed_activations / stats.total_detections_above_threshold:.1f}%"
             )
+        if self.pipeline:
+            print(f"\nPipeline post-activación:")
+            for stage, m in self.pipeline.get_metrics().items():
+                if isinstance(m, dict):
+                    latency = (
+                        f" | p50 {m['latency_p50_ms']:.0f} ms | p95 {m['latency_p95_ms']:.0f} ms"
+                        if "latency_p50_ms" in m
+                        else ""
+                    )
+                    print(
+                        f"  {stage}: cola {m['queue_depth']} | ok {m['completed']} | fallos {m['failed']}{latency}"
+                    )
         print("=" * 60 + "\n")
 
-    def _finish_recording(self, recording_buffer, feedback, timestamp):
-        """Procesa y guarda el comando grabado"""
+    def _finish_recording(self, recording_buffer, feedback, timestamp, stream_job=None):
+        """Procesa y guarda el comando grabado (cierra el stream STT si existe)"""
+        start = now_ns()
         self.state.set_state(STATE_PROCESSING)
         feedback.signal_processing()
 
         # Concatenar todo el audio
         full_audio = np.concatenate(recording_buffer)
 
-        # Guardar archivo
         filename = os.path.join(
             CAPTURED_COMMANDS_DIR, f"cmd_{datetime.now().strftime('%Y%m%d_%H%M%S')}.wav"
         )
-        save_wav_file(full_audio, filename)
-
         duration = len(full_audio) / SAMPLE_RATE
-        self.logger.info(f"Comando guardado: {filename} ({duration:.2f}s)")
-        print(f"\n✅ Comando guardado: {filename} ({duration:.2f}s)")
 
-        # Procesar con STT si está habilitado
-        if STT_ENABLED and ENABLE_STT_PROCESSING and hasattr(self, "stt_manager"):
-            self._transcribe_command(filename, duration)
+        # Persistir en disco sólo como efecto secundario asíncrono; con
+        # STT_AUTO_DELETE_AUDIO el buffer viaja en el job y CommandResultThread
+        # lo guarda sólo si el comando falla
+        save_on_failure = bool(
+            SAVE_COMMAND_AUDIO and self.pipeline and STT_AUTO_DELETE_AUDIO
+        )
+        if SAVE_COMMAND_AUDIO and not save_on_failure:
+            save_wav_async(self.audio_writer, full_audio, filename, self.logger)
+            self.logger.info(f"Comando guardado: {filename} ({duration:.2f}s)")
+            print(f"\n✅ Comando guardado: {filename} ({duration:.2f}s)")
+        else:
+            self.logger.info(f"Comando capturado en memoria ({duration:.2f}s)")
+            print(f"\n✅ Comando capturado ({duration:.2f}s)")
+            if not save_on_failure:
+                filename = None  # Nada que registrar como audio del comando
+
+        # Encolar el buffer para STT/NLU sin bloquear el KWS (el cooldown evita
+        # re-activación)
+        if stream_job:
+            self.pipeline.finish_stream(
+                stream_job, duration, filename, full_audio, save_on_failure
+            )
+        elif self.pipeline:
+            self.pipeline.submit(
+                full_audio, duration, filename, SAMPLE_RATE, save_on_failure
+            )
+            depth = self.pipeline.get_metrics()["stt"]["queue_depth"]
+            print(f"📝 Comando encolado para transcripción (cola STT: {depth})")
+        record_latency("kws.finish_recording", now_ns() - start)
 
-        # Pequeña pausa para evitar re-activación
-        time.sleep(0.5)
 
-    def _transcribe_command(self, audio_file, duration):
-        """Transcribe comando de audio a texto y lo procesa con Gemini"""
-        try:
-            self.state.set_state(STATE_TRANSCRIBING)
-            print(f"📝 Transcribiendo comando...")
+class CommandResultThread(threading.Thread):
+    """
+    Hilo consumidor de resultados del pipeline post-activación.
+    Muestra, persiste y ejecuta los comandos ya transcritos/interpretados sin
+    bloquear el hilo de inferencia KWS.
+    """
 
-            # Transcribir usando STTManager
-            transcription = self.stt_manager.transcribe(audio_file)
+    def __init__(
+        self, pipeline, vehicle_controller, stop_event, logger, audio_writer=None
+    ):
+        super().__init__()
+        self.pipeline = pipeline
+        self.vehicle_controller = vehicle_controller
+        self.stop_event = stop_event
+        self.logger = logger
+        self.audio_writer = audio_writer  # Guarda el WAV de comandos fallidos
+        self.daemon = True
 
-            if transcription:
-                self.logger.info(f"Transcripción: {transcription}")
-                print(f'\n💬 Transcripción: "{transcription}"\n')
+    def run(self):
+        while not self.stop_event.is_set():
+            try:
+                job = self.pipeline.results.get(timeout=0.5)
+            except queue.Empty:
+                continue
 
-                # Guardar transcripción si está habilitado
-                if STT_SAVE_TRANSCRIPTIONS:
-                    self._save_transcription(audio_file, transcription, duration)
+            try:
+                self._handle_job(job)
+            except Exception as e:
+                print(f"❌ Error procesando resultado: {e}")
+                self.logger.error(f"Error procesando resultado: {e}")
+
+    def _handle_job(self, job):
+        """Procesa un CommandJob terminado"""
+        if job.recording is not None:
+            self._keep_failed_audio(job)
+
+        self.logger.info(
+            "Comando procesado",
+            extra={
+                "audio_file": job.audio_file,
+                "stt_mode": job.mode,
+                "stt_latency_ms": job.stt_latency * 1000,
+                "nlu_latency_ms": job.nlu_latency * 1000,
+                "total_latency_ms": job.total_latency * 1000,
+            },
+        )
 
-                # Procesar con Gemini si está habilitado
-                if self.gemini_engine and ENABLE_GEMINI_NLU:
-                    self._process_with_gemini(transcription, audio_file)
+        if not job.transcription:
+            print(f"⚠️ No se pudo transcribir el comando")
+            self.logger.warning(f"Transcripción falló: {job.error or 'sin texto'}")
+            return
 
-                # Eliminar audio si está configurado
-                if STT_AUTO_DELETE_AUDIO:
-                    try:
-                        os.remove(audio_file)
-                        self.logger.info(f"Audio eliminado: {audio_file}")
-                    except Exception as e:
-                        self.logger.warning(f"No se pudo eliminar audio: {e}")
+        self.logger.info(f"Transcripción: {job.transcription}")
+        print(f'\n💬 Transcripción: "{job.transcription}"')
+        print(
+            f"   ⏱️  STT ({job.mode}): {job.stt_latency * 1000:.0f} ms tras fin de habla\n"
+        )
 
-                return transcription
-            else:
-                print(f"⚠️ No se pudo transcribir el comando")
-                self.logger.warning("Transcripción falló")
-                return None
+        # Guardar transcripción si está habilitado
+        if STT_SAVE_TRANSCRIPTIONS:
+            self._save_transcription(job.audio_file, job.transcription, job.duration)
 
-        except Exception as e:
-            print(f"❌ Error en transcripción: {e}")
-            self.logger.error(f"Error en transcripción: {e}")
-            return None
-        finally:
-            self.state.set_state(STATE_MONITORING)
+        # Resultado de Gemini (si la etapa NLU está habilitada)
+        if job.interpretation:
+            self._handle_interpretation(
+                job.interpretation, job.transcription, job.audio_file
+            )
+        elif job.error:
+            print(f"❌ {job.error}")
+            self.logger.error(job.error)
+
+    def _keep_failed_audio(self, job):
+        """Guarda el WAV retenido sólo si STT/NLU fallaron; si no, se descarta"""
+        recording, job.recording = job.recording, None
+        if (
+            job.audio_file
+            and self.audio_writer
+            and (not job.transcription or job.error)
+        ):
+            try:
+                save_wav_async(
+                    self.audio_writer, recording, job.audio_file, self.logger
+                )
+                print(f"💾 Audio del comando fallido: {job.audio_file}")
+                return
+            except RuntimeError:  # Escritor ya cerrado (apagado)
+                pass
+        job.audio_file = None
 
     def _save_transcription(self, audio_file, transcription, duration):
         """Guarda transcripción en archivo"""
@@ -795,19 +1369,19 @@ class InferenceThread(threading.Thread):
             os.makedirs(TRANSCRIPTIONS_DIR, exist_ok=True)
 
             # Generar nombre de archivo (mismo timestamp que el audio)
-            timestamp = (
-                os.path.basename(audio_file).replace("cmd_", "").replace(".wav", "")
-            )
+            timestamp = command_timestamp(audio_file)
             txt_filename = os.path.join(TRANSCRIPTIONS_DIR, f"trans_{timestamp}.txt")
 
             # Guardar con metadata
+            start = now_ns()
             with open(txt_filename, "w", encoding="utf-8") as f:
                 f.write(f"# Transcripción de comando\n")
-                f.write(f"# Audio: {audio_file}\n")
+                f.write(f"# Audio: {audio_file or 'no guardado'}\n")
                 f.write(f"# Duración: {duration:.2f}s\n")
                 f.write(f"# Fecha: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}\n")
                 f.write(f"# Motor STT: {Config.STT_ENGINE if STT_ENABLED else 'N/A'}\n")
                 f.write(f"\n{transcription}\n")
+            record_latency("io.transcription_write", now_ns() - start)
 
             self.logger.info(f"Transcripción guardada: {txt_filename}")
             print(f"   💾 Guardado en: {txt_filename}")
@@ -816,59 +1390,47 @@ class InferenceThread(threading.Thread):
             self.logger.error(f"Error guardando transcripción: {e}")
             print(f"   ⚠️ No se pudo guardar transcripción: {e}")
 
-    def _process_with_gemini(self, transcription, audio_file):
-        """Procesa transcripción con Gemini NLU y ejecuta acción"""
-        try:
-            self.state.set_state(STATE_PROCESSING_NLU)
-            print(f"\n🤖 Procesando con Gemini...\n")
-
-            # Interpretar comando con Gemini
-            result = self.gemini_engine.process_command(transcription)
-
-            if not result:
-                print(f"⚠️ Gemini no pudo interpretar el comando")
-                self.logger.warning("Interpretación Gemini falló")
-                return None
+    def _handle_interpretation(self, result, transcription, audio_file):
+        """Ejecuta la acción interpretada por Gemini y guarda el resultado"""
+        # Log del resultado
+        self.logger.info(
+            f"NLU ({result.get('source', 'gemini')}) - Acción: {result.get('action')}, "
+            f"Confianza: {result.get('confidence', 0):.2f}"
+        )
 
-            # Log del resultado
-            self.logger.info(
-                f"Gemini - Acción: {result.get('action')}, Confianza: {result.get('confidence', 0):.2f}"
+        timing = result.get("timing")
+        if timing:
+            print(
+                f"   ⏱️  Acción a {timing.get('action_ms', 0):.0f} ms, "
+                f"respuesta completa a {timing['response_ms']:.0f} ms"
             )
 
-            # Ejecutar acción si auto-ejecutar está habilitado
-            if GEMINI_AUTO_EXECUTE and result["action"] != "aclaracion_requerida":
-                execution_result = self.vehicle_controller.execute_action(
+        # Ejecutar acción si auto-ejecutar está habilitado (en streaming ya
+        # se despachó desde el pipeline y trae "execution", o el esquema la
+        # rechazó y trae "dispatch_rejected")
+        if GEMINI_AUTO_EXECUTE and result["action"] != "aclaracion_requerida":
+            if result.get("dispatch_rejected"):
+                print("   ⛔ Acción fuera del esquema: no se ejecuta")
+            elif "execution" not in result:
+                result["execution"] = self.vehicle_controller.execute_action(
                     result["action"], result.get("parameters", {})
                 )
-                result["execution"] = execution_result
 
-                # Mostrar respuesta natural
-                if result.get("natural_response"):
-                    print(f"\n💬 Jeepy: {result['natural_response']}\n")
-            else:
-                # Solo mostrar qué haría sin ejecutar
-                print(f"   🔍 Acción detectada: {result['action']}")
-                print(
-                    f"   📊 Parámetros: {json.dumps(result.get('parameters', {}), indent=2)}"
-                )
-                if result.get("natural_response"):
-                    print(f"   💬 Respuesta: {result['natural_response']}\n")
-
-            # Guardar resultado si está habilitado
-            if GEMINI_SAVE_RESULTS:
-                self._save_gemini_result(audio_file, transcription, result)
-
-            return result
-
-        except Exception as e:
-            print(f"❌ Error procesando con Gemini: {e}")
-            self.logger.error(f"Error en procesamiento Gemini: {e}")
-            import traceback
+            # Mostrar respuesta natural
+            if result.get("natural_response"):
+                print(f"\n💬 Jeepy: {result['natural_response']}\n")
+        else:
+            # Solo mostrar qué haría sin ejecutar
+            print(f"   🔍 Acción detectada: {result['action']}")
+            print(
+                f"   📊 Parámetros: {json.dumps(result.get('parameters', {}), indent=2)}"
+            )
+            if result.get("natural_response"):
+                print(f"   💬 Respuesta: {result['natural_response']}\n")
 
-            traceback.print_exc()
-            return None
-        finally:
-            self.state.set_state(STATE_MONITORING)
+        # Guardar resultado si está habilitado
+        if GEMINI_SAVE_RESULTS:
+            self._save_gemini_result(audio_file, transcription, result)
 
     def _save_gemini_result(self, audio_file, transcription, result):
         """Guarda resultado de interpretación Gemini"""
@@ -877,9 +1439,7 @@ class InferenceThread(threading.Thread):
             os.makedirs(INTERPRETATIONS_DIR, exist_ok=True)
 
             # Generar nombre de archivo (mismo timestamp que el audio)
-            timestamp = (
-                os.path.basename(audio_file).replace("cmd_", "").replace(".wav", "")
-            )
+            timestamp = command_timestamp(audio_file)
             json_filename = os.path.join(
                 INTERPRETATIONS_DIR, f"interpret_{timestamp}.json"
             )
@@ -894,8 +1454,10 @@ class InferenceThread(threading.Thread):
             }
 
             # Guardar como JSON
+            start = now_ns()
             with open(json_filename, "w", encoding="utf-8") as f:
                 json.dump(full_result, f, indent=2, ensure_ascii=False)
+            record_latency("io.interpretation_write", now_ns() - start)
 
             self.logger.info(f"Interpretación guardada: {json_filename}")
             print(f"   💾 Interpretación guardada: {json_filename}")
@@ -913,18 +1475,19 @@ class SlidingWindowBuffer:
     def __init__(self, window_size, stride_size):
         self.window_size = window_size
         self.stride_size = stride_size
-        self.buffer = np.zeros(window_size, dtype=np.float32)
+        self.ring = RingBuffer(window_size, SAMPLE_RATE)
 
     def add_samples(self, samples):
-        """Añade nuevas muestras al buffer (desplaza y añade al final)"""
-        # Desplazar el buffer hacia la izquierda
-        self.buffer = np.roll(self.buffer, -len(samples))
-        # Escribir nuevas muestras al final
-        self.buffer[-len(samples) :] = samples
+        """Añade nuevas muestras al buffer (sin desplazar ni reasignar)"""
+        self.ring.write(samples)
 
     def get_window(self):
-        """Retorna la ventana actual completa"""
-        return self.buffer
+        """Retorna la ventana actual completa (vista, válida hasta la próxima escritura)"""
+        return self.ring.get_window()
+
+    def get_position(self):
+        """Total de muestras escritas (usado por el frontend MFCC incremental)"""
+        return self.ring.total_written
 
     def is_ready(self):
         """Verifica si hay suficientes datos para una ventana (siempre True si inicializamos con ceros)"""
@@ -980,16 +1543,19 @@ class CircularAudioBuffer:
     def __init__(self, buffer_duration_seconds, sample_rate):
         self.sample_rate = sample_rate
         self.buffer_size = int(sample_rate * buffer_duration_seconds)
-        self.buffer = np.zeros(self.buffer_size, dtype=np.float32)
+        self.ring = RingBuffer(self.buffer_size, sample_rate)
 
     def write(self, samples):
         """Escribe nuevas muestras en el buffer circular"""
-        self.buffer = np.roll(self.buffer, -len(samples))
-        self.buffer[-len(samples) :] = samples
+        self.ring.write(samples)
 
     def get_buffer_contents(self):
-        """Retorna el contenido completo del buffer en orden cronológico"""
-        return self.buffer
+        """Retorna una copia del contenido completo en orden cronológico"""
+        return self.ring.get_window().copy()
+
+    def get_last_seconds(self, seconds):
+        """Retorna una copia de los últimos N segundos de audio"""
+        return self.ring.get_last_seconds(seconds).copy()
 
 
 class KWSStatistics:
@@ -1002,14 +1568,12 @@ class KWSStatistics:
         self.total_inferences = 0
         self.total_detections_above_threshold = 0
         self.total_confirmed_activations = 0
-        self.inference_times = []
+        self.total_inference_time = 0.0
 
     def record_inference(self, inference_time):
-        """Registra el tiempo de una inferencia"""
+        """Registra el tiempo de una inferencia (distribución en kws.inference)"""
         self.total_inferences += 1
-        self.inference_times.append(inference_time)
-        if len(self.inference_times) > 1000:  # Mantener solo los últimos 1000
-            self.inference_times.pop(0)
+        self.total_inference_time += inference_time
 
     def record_detection(self, confidence, confirmed=False):
         """Registra una detección"""
@@ -1021,8 +1585,8 @@ class KWSStatistics:
     def get_stats_dict(self):
         """Retorna diccionario con todas las estadísticas"""
         avg_inf = (
-            sum(self.inference_times) / len(self.inference_times)
-            if self.inference_times
+            self.total_inference_time / self.total_inferences
+            if self.total_inferences
             else 0
         )
         return {
@@ -1037,6 +1601,24 @@ class KWSStatistics:
         """Registra estadísticas periódicas en el log"""
         logger.info("Estadísticas KWS", extra=self.get_stats_dict())
 
+    def print_summary(self, logger=None):
+        """Imprime contadores e histogramas de latencia por etapa"""
+        data = self.get_stats_dict()
+        print("\n" + "=" * 60)
+        print("📈 ESTADÍSTICAS KWS")
+        print("=" * 60)
+        print(f"Tiempo activo: {data['uptime_seconds']:.0f}s")
+        print(f"Inferencias: {data['total_inferences']}")
+        print(f"Detecciones sobre umbral: {data['detections_above_threshold']}")
+        print(f"Activaciones confirmadas: {data['confirmed_activations']}")
+        print(f"\nLatencia por etapa:")
+        metrics.print_summary()
+        print("=" * 60 + "\n")
+        if logger:
+            logger.info(
+                "Estadísticas KWS", extra={**data, "stages": metrics.snapshot()}
+            )
+
 
 class ActivationEvent:
     """
@@ -1132,11 +1714,11 @@ def get_input_device_index():
 def extract_mfcc(audio_chunk):
     """
     Función para extraer MFCCs, idéntica a la usada en el entrenamiento.
+    Referencia sin estado; el hilo de inferencia usa StreamingMFCC.
     """
     try:
-        # Extraer MFCCs
-        # Nota: librosa espera muestras de punto flotante (dtype=float32)
-        mfccs = librosa.feature.mfcc(y=audio_chunk, sr=SAMPLE_RATE, n_mfcc=MFCC_COUNT)
+        # Extraer MFCCs (NumPy puro, equivalente a librosa.feature.mfcc)
+        mfccs = mfcc_frontend.mfcc(audio_chunk, SAMPLE_RATE, n_mfcc=MFCC_COUNT)
 
         # Aplicar Padding
         if mfccs.shape[1] < MAX_PADDING_LENGTH:
@@ -1156,20 +1738,27 @@ def extract_mfcc(audio_chunk):
         return None
 
 
-def initialize_tflite_interpreter():
+def initialize_tflite_interpreter(logger=None):
     """
     Carga el modelo TFLite cuantizado y prepara el intérprete.
+    Usa el backend más ligero disponible (LiteRT / tflite_runtime / TF).
     """
     try:
-        # Cargar el modelo TFLite (En RPi, usar tflite_runtime.interpreter)
-        interpreter = tf.lite.Interpreter(model_path=TFLITE_MODEL_PATH)
-        interpreter.allocate_tensors()
+        interpreter, backend_info = create_interpreter(
+            TFLITE_MODEL_PATH,
+            num_threads=TFLITE_NUM_THREADS,
+            use_xnnpack=TFLITE_USE_XNNPACK,
+            delegate_path=TFLITE_DELEGATE_PATH,
+            backend=TFLITE_BACKEND,
+        )
 
         # Obtener los detalles de las capas de entrada y salida
         input_details = interpreter.get_input_details()
         output_details = interpreter.get_output_details()
 
-        print("✅ Intérprete TFLite cargado con éxito.")
+        print(f"✅ Intérprete TFLite cargado con éxito ({backend_info})")
+        if logger:
+            logger.info("Intérprete TFLite cargado", extra=backend_info.to_dict())
         return interpreter, input_details, output_details
     except Exception as e:
         print(
@@ -1178,9 +1767,156 @@ def initialize_tflite_interpreter():
         return None, None, None
 
 
-def kws_monitor(device_index, interactive=ENABLE_INTERACTIVE_MODE):
+def build_metrics_collector(system_state, capture_thread, inference_thread, queue):
+    """
+    Callback de /metrics: lee la foto de SystemState y contadores sueltos sin
+    locks (una lectura desfasada un chunk es aceptable)
+    """
+    process = psutil.Process(os.getpid())
+    start_time = time.time()
+
+    def collect():
+        snap = system_state.snapshot()
+        stats = getattr(inference_thread, "stats", None)
+        pipeline = getattr(inference_thread, "pipeline", None)
+        gemini_engine = getattr(inference_thread, "gemini_engine", None)
+        families = [
+            Metric(
+                "jeepy_audio_chunks",
+                "counter",
+                "Chunks de audio capturados",
+                capture_thread.chunks_captured,
+            ),
+            Metric(
+                "jeepy_audio_chunks_dropped",
+                "counter",
+                "Chunks descartados por cola llena",
+                capture_thread.chunks_dropped,
+            ),
+            Metric(
+                "jeepy_audio_queue_depth",
+                "gauge",
+                "Chunks en la cola de inferencia",
+                queue.qsize(),
+            ),
+            Metric("jeepy_kws_fps", "gauge", "Inferencias por segundo", snap.fps),
+            Metric(
+                "jeepy_kws_last_prediction",
+                "gauge",
+                "Última probabilidad de la palabra clave",
+                snap.last_prediction,
+            ),
+            Metric(
+                "jeepy_noise_level",
+                "gauge",
+                "Nivel de ruido (RMS)",
+                snap.noise_level,
+            ),
+            Metric("jeepy_cpu_percent", "gauge", "Uso de CPU", snap.cpu_usage),
+            Metric(
+                "jeepy_state",
+                "gauge",
+                "Estado actual del monitor",
+                1,
+                {"state": snap.current_state},
+            ),
+            Metric(
+                "jeepy_process_resident_memory_bytes",
+                "gauge",
+                "RSS del proceso",
+                process.memory_info().rss,
+            ),
+            Metric(
+                "jeepy_uptime_seconds",
+                "gauge",
+                "Tiempo activo",
+                time.time() - start_time,
+            ),
+        ]
+        if stats:
+            families += [
+                Metric(
+                    "jeepy_kws_inferences",
+                    "counter",
+                    "Inferencias KWS",
+                    stats.total_inferences,
+                ),
+                Metric(
+                    "jeepy_kws_detections",
+                    "counter",
+                    "Detecciones sobre el umbral",
+                    stats.total_detections_above_threshold,
+                ),
+                Metric(
+                    "jeepy_kws_activations",
+                    "counter",
+                    "Activaciones confirmadas",
+                    stats.total_confirmed_activations,
+                ),
+            ]
+        if pipeline:
+            depth = Metric(
+                "jeepy_pipeline_queue_depth", "gauge", "Trabajos pendientes por etapa"
+            )
+            jobs = Metric(
+                "jeepy_pipeline_jobs", "counter", "Trabajos terminados por etapa"
+            )
+            for stage, m in pipeline.get_metrics().items():
+                if isinstance(m, dict):
+                    depth.add(m["queue_depth"], stage=stage)
+                    jobs.add(m["completed"], stage=stage, status="ok")
+                    jobs.add(m["failed"], stage=stage, status="error")
+            families += [depth, jobs]
+        intent = gemini_engine.intent_stats() if gemini_engine else None
+        if intent:
+            families += [
+                Metric(
+                    "jeepy_intent_requests",
+                    "counter",
+                    "Comandos por intérprete (local o escalados a Gemini)",
+                )
+                .add(intent["hits"], resolver="local")
+                .add(intent["escalations"], resolver="gemini"),
+                Metric(
+                    "jeepy_intent_saved_seconds",
+                    "counter",
+                    "Latencia de Gemini ahorrada estimada por el parser local",
+                    intent["saved_ms"] / 1000,
+                ),
+            ]
+        cache = gemini_engine.cache_stats() if gemini_engine else None
+        if cache:
+            families.append(
+                Metric(
+                    "jeepy_nlu_cache_lookups",
+                    "counter",
+                    "Búsquedas en la caché de interpretaciones",
+                )
+                .add(cache["hits"] - cache["near_hits"], result="hit")
+                .add(cache["near_hits"], result="near_hit")
+                .add(cache["misses"], result="miss")
+            )
+        return families
+
+    return collect
+
+
+def kws_monitor(
+    device_index=None,
+    interactive=ENABLE_INTERACTIVE_MODE,
+    replay_paths=None,
+    replay_speed=REPLAY_SPEED,
+    replay_loops=1,
+):
     """
     Bucle principal de monitoreo de audio en vivo con mejoras Fases 4-5.
+
+    Args:
+        device_index: Índice del micrófono PyAudio (sin réplica)
+        interactive: Aceptar comandos por teclado
+        replay_paths: WAVs o directorios a reproducir en lugar del micrófono
+        replay_speed: Velocidad de la réplica (1.0 = tiempo real, 0 = máxima)
+        replay_loops: Repeticiones del corpus de réplica
     """
     # 1. INICIALIZACIÓN
     logger = setup_logger(LOG_LEVEL, LOG_FILE)
@@ -1191,14 +1927,42 @@ def kws_monitor(device_index, interactive=ENABLE_INTERACTIVE_MODE):
     system_state = SystemState()
 
     # 2. INICIAR HILOS
-    capture_thread = AudioCaptureThread(
-        device_index, audio_queue, stop_event, system_state
+    if replay_paths:
+        capture_thread = WavReplayThread(
+            replay_paths,
+            audio_queue,
+            stop_event,
+            system_state,
+            speed=replay_speed,
+            loops=replay_loops,
+        )
+    else:
+        capture_thread = AudioCaptureThread(
+            device_index, audio_queue, stop_event, system_state
+        )
+    inference_thread = InferenceThread(
+        audio_queue, stop_event, system_state, logger, replay=bool(replay_paths)
     )
-    inference_thread = InferenceThread(audio_queue, stop_event, system_state, logger)
 
     capture_thread.start()
     inference_thread.start()
 
+    exporter = None
+    if METRICS_EXPORTER_ENABLED:
+        try:
+            exporter = MetricsExporter(
+                build_metrics_collector(
+                    system_state, capture_thread, inference_thread, audio_queue
+                ),
+                port=METRICS_EXPORTER_PORT,
+                host=METRICS_EXPORTER_HOST,
+            )
+            exporter.start()
+            print(f"📈 Métricas Prometheus en {exporter.address}")
+        except OSError as e:
+            logger.warning(f"Exportador de métricas no disponible: {e}")
+            exporter = None
+
     print("\n" + "=" * 70)
     print("🚗 JEEPY KWS MONITOR - Sistema de Activación por Voz")
     print("=" * 70)
@@ -1219,6 +1983,7 @@ def kws_monitor(device_index, interactive=ENABLE_INTERACTIVE_MODE):
         print("   - Escribe 'resume' para continuar")
         print("   - Escribe 'status' para ver estado detallado")
         print("   - Escribe 'stats' para ver estadísticas")
+        print(f"   - Escribe 'dump' para guardar métricas en {METRICS_DUMP_PATH}")
         print("   - Escribe 'recalibrate' para recalibrar")
         print("   - Escribe 'quit' o Ctrl+C para salir")
     print("=" * 70 + "\n")
@@ -1239,6 +2004,7 @@ def kws_monitor(device_index, interactive=ENABLE_INTERACTIVE_MODE):
                         "resume",
                         "status",
                         "stats",
+                        "dump",
                         "recalibrate",
                         "stop",
                     ]:
@@ -1274,12 +2040,17 @@ def kws_monitor(device_index, interactive=ENABLE_INTERACTIVE_MODE):
                 last_ui_update = current_time
 
             # Verificar salud de hilos
-            if not capture_thread.is_alive():
+            # Al terminar la réplica, el InferenceThread sale solo tras procesar
+            # END_OF_STREAM (último comando incluido)
+            if not capture_thread.is_alive() and not capture_thread.completed:
                 logger.error("Hilo de captura murió. Deteniendo sistema...")
                 system_state.set_state(STATE_ERROR)
                 break
 
             if not inference_thread.is_alive():
+                if capture_thread.completed:
+                    logger.info("Réplica de audio completada")
+                    break
                 logger.error("Hilo de inferencia murió. Deteniendo sistema...")
                 system_state.set_state(STATE_ERROR)
                 break
@@ -1294,10 +2065,13 @@ def kws_monitor(device_index, interactive=ENABLE_INTERACTIVE_MODE):
     finally:
         print("\n🛑 Deteniendo sistema...")
         stop_event.set()
+        if exporter:
+            exporter.stop()
 
         print("   Esperando hilos...")
         capture_thread.join(timeout=3.0)
-        inference_thread.join(timeout=3.0)
+        # En réplica se espera al pipeline STT/NLU de los últimos comandos
+        inference_thread.join(timeout=None if replay_paths else 3.0)
 
         if system_state.get_state() == STATE_ERROR:
             print("❌ Sistema detenido con errores")
@@ -1310,11 +2084,38 @@ def kws_monitor(device_index, interactive=ENABLE_INTERACTIVE_MODE):
 
 
 if __name__ == "__main__":
-    # Usamos la importación de tf.lite.Interpreter. Si estás en RPi y tienes problemas,
-    # reemplaza 'tensorflow as tf' por 'import tflite_runtime.interpreter as tflite'
-    # y ajusta el código según la documentación de tflite-runtime.
-
-    # Seleccionar dispositivo de audio
-    mic_index = get_input_device_index()
+    # El backend TFLite se selecciona automáticamente (ver tflite_backend.py);
+    # usar TFLITE_BACKEND para forzar uno concreto.
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Monitor KWS de Jeepy")
+    parser.add_argument(
+        "--replay",
+        nargs="+",
+        metavar="WAV",
+        help="Reproducir WAVs o directorios en lugar del micrófono",
+    )
+    parser.add_argument(
+        "--speed",
+        type=float,
+        default=REPLAY_SPEED,
+        help="Velocidad de la réplica (1.0 = tiempo real, 0 = máxima)",
+    )
+    parser.add_argument("--loops", type=int, default=1, help="Repeticiones")
+    args = parser.parse_args()
+
+    if args.replay:
+        kws_monitor(
+            interactive=False,
+            replay_paths=args.replay,
+            replay_speed=args.speed,
+            replay_loops=args.loops,
+        )
+    elif pyaudio is None:
+        print("❌ PyAudio no instalado. Ejecuta: uv add pyaudio (o usa --replay)")
+        sys.exit(1)
+    else:
+        # Seleccionar dispositivo de audio
+        mic_index = get_input_device_index()
 
-    kws_monitor(mic_index)
+        kws_monitor(mic_index)
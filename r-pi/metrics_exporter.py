@@ -0,0 +1,149 @@
+"""
+Jeepy AI - Exportador de métricas Prometheus/OpenMetrics
+Servidor HTTP ligero (stdlib) en su propio hilo que publica /metrics en el
+formato de texto de Prometheus: contadores y gauges de un callback del
+monitor más los histogramas de latencia por etapa de instrumentation.
+
+El scrape sólo lee: el callback usa la foto inmutable de SystemState y
+contadores sueltos sin tomar locks, así que no compite con la inferencia.
+"""
+
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from instrumentation import metrics
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+# Límites de los buckets exportados (segundos); los buckets finos de
+# instrumentation se agregan en estos
+EXPORT_BUCKETS_S = (
+    0.0001,
+    0.00025,
+    0.0005,
+    0.001,
+    0.0025,
+    0.005,
+    0.01,
+    0.025,
+    0.05,
+    0.1,
+    0.25,
+    0.5,
+    1.0,
+    2.5,
+    5.0,
+    10.0,
+)
+_EXPORT_BUCKETS_US = [int(b * 1e6) for b in EXPORT_BUCKETS_S]
+
+
+class Metric:
+    """Una familia de métricas: nombre, tipo (counter|gauge), ayuda y muestras"""
+
+    def __init__(self, name, kind, help_text, value=None, labels=None):
+        self.name = name
+        self.kind = kind
+        self.help = help_text
+        # Lista de (labels dict, valor)
+        self.samples = [] if value is None else [(labels or {}, value)]
+
+    def add(self, value, **labels):
+        self.samples.append((labels, value))
+        return self
+
+
+def _escape(value):
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _format_labels(labels):
+    if not labels:
+        return ""
+    return "{" + ",".join(f'{k}="{_escape(v)}"' for k, v in labels.items()) + "}"
+
+
+def render_metrics(families, histograms=True):
+    """
+    Texto de exposición Prometheus
+
+    Args:
+        families: Lista de Metric del monitor
+        histograms: Incluir jeepy_stage_latency_seconds de instrumentation
+    """
+    lines = []
+    for family in families:
+        if not family.samples:
+            continue
+        name = family.name + ("_total" if family.kind == "counter" else "")
+        lines.append(f"# HELP {name} {family.help}")
+        lines.append(f"# TYPE {name} {family.kind}")
+        for labels, value in family.samples:
+            lines.append(f"{name}{_format_labels(labels)} {float(value)!r}")
+
+    stages = metrics.items() if histograms else []
+    if stages:
+        name = "jeepy_stage_latency_seconds"
+        lines.append(f"# HELP {name} Latencia por etapa (KWS, STT, Gemini, E/S)")
+        lines.append(f"# TYPE {name} histogram")
+        for stage, hist in stages:
+            count = hist.count  # Leer antes de los buckets: +Inf >= buckets
+            cumulative = hist.cumulative_counts(_EXPORT_BUCKETS_US)
+            for bound, n in zip(EXPORT_BUCKETS_S, cumulative):
+                lines.append(
+                    f'{name}_bucket{{stage="{stage}",le="{bound!r}"}} {min(n, count)}'
+                )
+            lines.append(f'{name}_bucket{{stage="{stage}",le="+Inf"}} {count}')
+            lines.append(f'{name}_sum{{stage="{stage}"}} {hist.total_ns / 1e9!r}')
+            lines.append(f'{name}_count{{stage="{stage}"}} {count}')
+
+    return "\n".join(lines) + "\n"
+
+
+class _MetricsHandler(BaseHTTPRequestHandler):
+    def do_GET(self):
+        if self.path.split("?")[0] not in ("/metrics", "/"):
+            self.send_error(404)
+            return
+        try:
+            body = render_metrics(self.server.collect()).encode("utf-8")
+        except Exception as e:
+            self.send_error(500, str(e))
+            return
+        self.send_response(200)
+        self.send_header("Content-Type", CONTENT_TYPE)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass  # Sin una línea de log por scrape
+
+
+class MetricsExporter(threading.Thread):
+    """
+    Hilo con el servidor HTTP de /metrics
+
+    Args:
+        collect: Callable sin argumentos que retorna la lista de Metric
+        port: Puerto TCP
+        host: Interfaz ("0.0.0.0" para scraping remoto desde la flota)
+    """
+
+    def __init__(self, collect, port=9108, host="127.0.0.1"):
+        super().__init__(name="metrics-exporter", daemon=True)
+        self.server = ThreadingHTTPServer((host, port), _MetricsHandler)
+        self.server.daemon_threads = True
+        self.server.collect = collect
+
+    @property
+    def address(self):
+        host, port = self.server.server_address[:2]
+        return f"http://{host}:{port}/metrics"
+
+    def run(self):
+        self.server.serve_forever(poll_interval=0.5)
+
+    def stop(self):
+        self.server.shutdown()
+        self.server.server_close()
@@ -0,0 +1,243 @@
+"""
+Jeepy AI - Frontend MFCC en NumPy puro
+Implementación vectorizada y sin librosa de los MFCC usados en el
+entrenamiento (scripts/01_train-kws-model.py), con los mismos valores por
+defecto de librosa.feature.mfcc: n_fft=2048, hop_length=512, ventana Hann,
+center=True con padding de ceros, 128 filtros mel Slaney, power_to_db con
+top_db=80 y DCT-II ortonormal.
+
+Incluye un extractor incremental (StreamingMFCC) que sólo calcula los frames
+STFT que entran con cada stride de la ventana deslizante.
+"""
+
+from functools import lru_cache
+
+import numpy as np
+
+# Valores por defecto de librosa.feature.mfcc / melspectrogram
+N_FFT = 2048
+HOP_LENGTH = 512
+N_MELS = 128
+TOP_DB = 80.0
+AMIN = 1e-10
+
+# Constantes de la escala mel de Slaney (htk=False en librosa)
+_F_SP = 200.0 / 3
+_MIN_LOG_HZ = 1000.0
+_MIN_LOG_MEL = _MIN_LOG_HZ / _F_SP
+_LOGSTEP = np.log(6.4) / 27.0
+
+
+def hz_to_mel(frequencies):
+    """Convierte Hz a mel (escala Slaney)"""
+    frequencies = np.asanyarray(frequencies, dtype=np.float64)
+    mels = frequencies / _F_SP
+    log_region = frequencies >= _MIN_LOG_HZ
+    mels = np.where(
+        log_region,
+        _MIN_LOG_MEL
+        + np.log(np.maximum(frequencies, _MIN_LOG_HZ) / _MIN_LOG_HZ) / _LOGSTEP,
+        mels,
+    )
+    return mels
+
+
+def mel_to_hz(mels):
+    """Convierte mel a Hz (escala Slaney)"""
+    mels = np.asanyarray(mels, dtype=np.float64)
+    freqs = _F_SP * mels
+    log_region = mels >= _MIN_LOG_MEL
+    return np.where(
+        log_region, _MIN_LOG_HZ * np.exp(_LOGSTEP * (mels - _MIN_LOG_MEL)), freqs
+    )
+
+
+@lru_cache(maxsize=8)
+def mel_filterbank(sr, n_fft=N_FFT, n_mels=N_MELS, fmin=0.0, fmax=None):
+    """Banco de filtros mel triangular con normalización Slaney (cacheado)"""
+    if fmax is None:
+        fmax = sr / 2.0
+
+    fft_freqs = np.fft.rfftfreq(n_fft, d=1.0 / sr)
+    mel_f = mel_to_hz(np.linspace(hz_to_mel(fmin), hz_to_mel(fmax), n_mels + 2))
+
+    fdiff = np.diff(mel_f)
+    ramps = mel_f[:, np.newaxis] - fft_freqs
+    lower = -ramps[:-2] / fdiff[:-1, np.newaxis]
+    upper = ramps[2:] / fdiff[1:, np.newaxis]
+    weights = np.maximum(0.0, np.minimum(lower, upper))
+
+    enorm = 2.0 / (mel_f[2:] - mel_f[:-2])
+    weights *= enorm[:, np.newaxis]
+    weights = weights.astype(np.float32)
+    weights.flags.writeable = False
+    return weights
+
+
+@lru_cache(maxsize=8)
+def hann_window(n_fft=N_FFT):
+    """Ventana Hann periódica (scipy get_window('hann', fftbins=True))"""
+    n = np.arange(n_fft)
+    window = (0.5 - 0.5 * np.cos(2 * np.pi * n / n_fft)).astype(np.float32)
+    window.flags.writeable = False
+    return window
+
+
+@lru_cache(maxsize=8)
+def dct_matrix(n_mfcc, n_mels=N_MELS):
+    """Matriz DCT-II ortonormal (equivalente a scipy.fft.dct(norm='ortho'))"""
+    n = np.arange(n_mels)
+    k = np.arange(n_mfcc)[:, np.newaxis]
+    basis = np.cos(np.pi * k * (2 * n + 1) / (2 * n_mels)) * np.sqrt(2.0 / n_mels)
+    basis[0] *= np.sqrt(0.5)
+    basis = basis.astype(np.float32)
+    basis.flags.writeable = False
+    return basis
+
+
+def power_to_db(mel, top_db=TOP_DB, amin=AMIN):
+    """Equivalente a librosa.power_to_db(S, ref=1.0)"""
+    log_spec = 10.0 * np.log10(np.maximum(amin, mel))
+    if top_db is not None:
+        log_spec = np.maximum(log_spec, log_spec.max() - top_db)
+    return log_spec
+
+
+def mfcc(y, sr, n_mfcc=40, n_fft=N_FFT, hop_length=HOP_LENGTH, n_mels=N_MELS):
+    """
+    Calcula MFCCs de una señal completa (equivalente a librosa.feature.mfcc)
+
+    Args:
+        y: Señal float32 mono
+        sr: Frecuencia de muestreo
+        n_mfcc: Número de coeficientes
+
+    Returns:
+        Array (n_mfcc, n_frames) float32
+    """
+    y = np.asarray(y, dtype=np.float32)
+    pad = n_fft // 2
+    padded = np.zeros(len(y) + 2 * pad, dtype=np.float32)
+    padded[pad : pad + len(y)] = y
+
+    frames = np.lib.stride_tricks.sliding_window_view(padded, n_fft)[::hop_length]
+    power = np.abs(np.fft.rfft(frames * hann_window(n_fft), axis=1)) ** 2
+    mel = mel_filterbank(sr, n_fft, n_mels) @ power.T.astype(np.float32)
+    return dct_matrix(n_mfcc, n_mels) @ power_to_db(mel)
+
+
+class StreamingMFCC:
+    """
+    Extractor MFCC con estado para ventanas deslizantes.
+
+    Los frames interiores de la ventana (los que no tocan el padding de
+    center=True) dependen sólo del audio y se reutilizan entre strides; los
+    frames de los bordes y los nuevos se recalculan. Sólo hay reutilización
+    cuando el desplazamiento es múltiplo de hop_length; en otro caso se
+    recalcula la ventana completa.
+    """
+
+    def __init__(
+        self,
+        sample_rate,
+        window_size,
+        n_mfcc=40,
+        max_frames=40,
+        n_fft=N_FFT,
+        hop_length=HOP_LENGTH,
+        n_mels=N_MELS,
+        top_db=TOP_DB,
+        amin=AMIN,
+    ):
+        self.sample_rate = sample_rate
+        self.window_size = window_size
+        self.n_mfcc = n_mfcc
+        self.max_frames = max_frames
+        self.n_fft = n_fft
+        self.hop_length = hop_length
+        self.top_db = top_db
+        self.amin = amin
+
+        self.pad = n_fft // 2
+        self.n_frames = 1 + window_size // hop_length
+
+        # Rango de frames interiores (no dependen del padding con ceros)
+        self.first_interior = -(-self.pad // hop_length)
+        self.last_interior = (window_size + self.pad - n_fft) // hop_length
+
+        # Matrices precalculadas
+        self.window = hann_window(n_fft)
+        self.mel_basis = mel_filterbank(sample_rate, n_fft, n_mels)
+        self.dct_basis = dct_matrix(n_mfcc, n_mels)
+
+        # Buffers preasignados
+        self._padded = np.zeros(window_size + 2 * self.pad, dtype=np.float32)
+        self._log_mel = np.zeros((n_mels, self.n_frames), dtype=np.float32)
+        self._output = np.zeros((1, n_mfcc, max_frames, 1), dtype=np.float32)
+
+        self._last_position = None
+        self.frames_computed = 0
+
+    def reset(self):
+        """Descarta los frames en caché (p.ej. tras pausar el monitor)"""
+        self._last_position = None
+
+    def _frames_to_compute(self, position):
+        """Determina qué frames recalcular según el desplazamiento"""
+        all_frames = np.arange(self.n_frames)
+        if self._last_position is None:
+            return all_frames
+
+        shift = position - self._last_position
+        if shift == 0:
+            return all_frames[:0]
+        if shift < 0 or shift % self.hop_length:
+            return all_frames
+
+        shift_frames = shift // self.hop_length
+        reuse_end = self.last_interior - shift_frames
+        if reuse_end < self.first_interior:
+            return all_frames
+
+        # Desplazar log-mel cacheado: frame t+shift anterior -> frame t actual
+        self._log_mel[:, : self.n_frames - shift_frames] = self._log_mel[
+            :, shift_frames:
+        ]
+        return np.concatenate(
+            (
+                all_frames[: self.first_interior],
+                all_frames[reuse_end + 1 :],
+            )
+        )
+
+    def compute(self, window, position):
+        """
+        Calcula los MFCC de la ventana actual.
+
+        Args:
+            window: Audio float32 de window_size muestras (orden cronológico)
+            position: Total de muestras escritas en el buffer hasta esta ventana
+
+        Returns:
+            Array (1, n_mfcc, max_frames, 1) float32 (reutilizado entre llamadas)
+        """
+        frames = self._frames_to_compute(position)
+        self._last_position = position
+
+        if len(frames):
+            self._padded[self.pad : self.pad + self.window_size] = window
+            starts = frames * self.hop_length
+            idx = starts[:, np.newaxis] + np.arange(self.n_fft)
+            segments = self._padded[idx] * self.window
+            power = np.abs(np.fft.rfft(segments, axis=1)) ** 2
+            mel = self.mel_basis @ power.T.astype(np.float32)
+            self._log_mel[:, frames] = power_to_db(mel, top_db=None, amin=self.amin)
+            self.frames_computed += len(frames)
+
+        # power_to_db(top_db) usa el máximo de toda la ventana
+        log_mel = np.maximum(self._log_mel, self._log_mel.max() - self.top_db)
+        mfccs = self.dct_basis @ log_mel
+
+        n = min(self.n_frames, self.max_frames)
+        self._output[0, :, :n, 0] = mfccs[:, :n]
+        return self._output
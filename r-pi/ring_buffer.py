@@ -0,0 +1,79 @@
+"""
+Jeepy AI - Buffer circular de audio sin copias
+Almacenamiento espejado (2x capacidad) con cursor de escritura: cualquier
+ventana de los últimos N samples es una vista contigua, sin np.roll ni
+asignaciones por stride.
+"""
+
+import numpy as np
+
+
+class RingBuffer:
+    """
+    Buffer circular preasignado con almacenamiento espejado.
+
+    Cada muestra se escribe dos veces (posición i e i + capacity), de modo que
+    la región [pos, pos + capacity) siempre contiene el audio en orden
+    cronológico y puede devolverse como vista sin copiar.
+
+    Nota: las vistas devueltas se sobrescriben con las siguientes escrituras.
+    Usar .copy() si se necesita conservar el contenido.
+    """
+
+    def __init__(self, capacity, sample_rate=None, dtype=np.float32):
+        self.capacity = int(capacity)
+        self.sample_rate = sample_rate
+        self._data = np.zeros(2 * self.capacity, dtype=dtype)
+        self._pos = 0  # Índice de la muestra más antigua
+        self.total_written = 0
+
+    def write(self, samples):
+        """Escribe nuevas muestras (sobrescribe las más antiguas)"""
+        n = len(samples)
+        if n == 0:
+            return
+        cap = self.capacity
+        if n >= cap:
+            samples = samples[-cap:]
+            n = cap
+
+        pos = self._pos
+        end = pos + n
+        if end <= cap:
+            self._data[pos:end] = samples
+            self._data[pos + cap : end + cap] = samples
+        else:
+            first = cap - pos
+            self._data[pos:cap] = samples[:first]
+            self._data[pos + cap :] = samples[:first]
+            self._data[: n - first] = samples[first:]
+            self._data[cap : cap + n - first] = samples[first:]
+
+        self._pos = end % cap
+        self.total_written += n
+
+    def get_window(self):
+        """Vista contigua de todo el buffer en orden cronológico"""
+        return self._data[self._pos : self._pos + self.capacity]
+
+    def get_last(self, num_samples):
+        """Vista contigua de las últimas num_samples muestras"""
+        num_samples = min(int(num_samples), self.capacity)
+        end = self._pos + self.capacity
+        return self._data[end - num_samples : end]
+
+    def get_last_seconds(self, seconds):
+        """Vista de los últimos N segundos de audio"""
+        if not self.sample_rate:
+            raise ValueError("sample_rate no definido para el buffer")
+        return self.get_last(int(seconds * self.sample_rate))
+
+    def is_full(self):
+        """Indica si ya se escribió al menos una ventana completa"""
+        return self.total_written >= self.capacity
+
+    def clear(self):
+        """Reinicia el buffer a ceros"""
+        self._data.fill(0)
+        self._pos = 0
+        self.total_written = 0
@@ -0,0 +1,248 @@
+"""
+Jeepy AI - Backends del intérprete TFLite
+Selecciona el intérprete más ligero disponible (LiteRT, tflite_runtime o
+TensorFlow completo) y expone num_threads y las opciones del delegado XNNPACK.
+"""
+
+import importlib
+import os
+import time
+
+import numpy as np
+import psutil
+
+# Orden de preferencia: (nombre, módulo que expone Interpreter y load_delegate)
+BACKENDS = [
+    ("litert", "ai_edge_litert.interpreter"),
+    ("tflite_runtime", "tflite_runtime.interpreter"),
+    ("tensorflow", "tensorflow.lite"),
+]
+
+
+class BackendInfo:
+    """Resumen del backend cargado (para reportar en el arranque)"""
+
+    def __init__(
+        self, name, load_time, rss_mb, rss_delta_mb, num_threads, xnnpack, delegate
+    ):
+        self.name = name
+        self.load_time = load_time
+        self.rss_mb = rss_mb  # RSS total del proceso tras cargar
+        self.rss_delta_mb = rss_delta_mb  # RSS añadido por backend + modelo
+        self.num_threads = num_threads
+        self.xnnpack = xnnpack
+        self.delegate = delegate
+
+    def to_dict(self):
+        return {
+            "backend": self.name,
+            "load_time_ms": self.load_time * 1000,
+            "rss_mb": self.rss_mb,
+            "rss_delta_mb": self.rss_delta_mb,
+            "num_threads": self.num_threads,
+            "xnnpack": self.xnnpack,
+            "delegate": self.delegate,
+        }
+
+    def __str__(self):
+        return (
+            f"backend={self.name} | carga={self.load_time * 1000:.0f} ms | "
+            f"RSS={self.rss_mb:.1f} MB (+{self.rss_delta_mb:.1f}) | hilos={self.num_threads} | "
+            f"XNNPACK={'sí' if self.xnnpack else 'no'}"
+            + (f" | delegado={self.delegate}" if self.delegate else "")
+        )
+
+
+def _import_backend(module_name):
+    """Importa el módulo del backend y retorna (Interpreter, load_delegate, módulo)"""
+    module = importlib.import_module(module_name)
+    if module_name == "tensorflow.lite":
+        return module.Interpreter, module.experimental.load_delegate, module
+    return module.Interpreter, module.load_delegate, module
+
+
+def load_backend(preferred=None):
+    """
+    Importa el primer backend disponible
+
+    Args:
+        preferred: Nombre del backend a forzar ("litert", "tflite_runtime",
+            "tensorflow") o None para selección automática
+
+    Returns:
+        Tupla (nombre, Interpreter, load_delegate, módulo)
+    """
+    candidates = BACKENDS
+    if preferred:
+        candidates = [b for b in BACKENDS if b[0] == preferred]
+        if not candidates:
+            raise ValueError(f"Backend TFLite desconocido: {preferred}")
+
+    errors = []
+    for name, module_name in candidates:
+        try:
+            interpreter_cls, load_delegate, module = _import_backend(module_name)
+            return name, interpreter_cls, load_delegate, module
+        except (ImportError, AttributeError) as e:
+            errors.append(f"{name}: {e}")
+
+    raise ImportError(
+        "Ningún intérprete TFLite disponible. Ejecuta: uv add ai-edge-litert "
+        f"(o tflite-runtime). Detalles: {'; '.join(errors)}"
+    )
+
+
+def create_interpreter(
+    model_path, num_threads=None, use_xnnpack=True, delegate_path=None, backend=None
+):
+    """
+    Crea el intérprete TFLite con el backend más ligero disponible
+
+    Args:
+        model_path: Ruta al modelo .tflite
+        num_threads: Hilos para los kernels CPU/XNNPACK (None = por defecto)
+        use_xnnpack: Aplicar el delegado XNNPACK por defecto del runtime
+        delegate_path: Delegado externo opcional (.so) a cargar con num_threads
+        backend: Backend a forzar (ver BACKENDS) o None para automático
+
+    Returns:
+        Tupla (interpreter, BackendInfo)
+    """
+    process = psutil.Process(os.getpid())
+    rss_before = process.memory_info().rss
+    start = time.perf_counter()
+
+    name, interpreter_cls, load_delegate, module = load_backend(backend)
+
+    kwargs = {"model_path": model_path}
+    if num_threads:
+        kwargs["num_threads"] = num_threads
+
+    if delegate_path:
+        options = {"num_threads": num_threads} if num_threads else {}
+        kwargs["experimental_delegates"] = [load_delegate(delegate_path, options)]
+
+    if not use_xnnpack:
+        # Desactiva los delegados por defecto (XNNPACK) del op resolver
+        resolver = getattr(module, "OpResolverType", None) or getattr(
+            getattr(module, "experimental", None), "OpResolverType", None
+        )
+        if resolver is not None:
+            kwargs["experimental_op_resolver_type"] = (
+                resolver.BUILTIN_WITHOUT_DEFAULT_DELEGATES
+            )
+
+    interpreter = interpreter_cls(**kwargs)
+    interpreter.allocate_tensors()
+
+    load_time = time.perf_counter() - start
+    rss_after = process.memory_info().rss
+
+    info = BackendInfo(
+        name,
+        load_time,
+        rss_after / (1024 * 1024),
+        (rss_after - rss_before) / (1024 * 1024),
+        num_threads,
+        use_xnnpack,
+        os.path.basename(delegate_path) if delegate_path else None,
+    )
+    return interpreter, info
+
+
+class InferenceSession:
+    """
+    Sesión de inferencia sobre un intérprete ya inicializado.
+
+    Escribe las features directamente en el buffer del tensor de entrada y lee
+    la salida en su sitio mediante interpreter.tensor(), sin set_tensor /
+    get_tensor ni arrays intermedios. Para modelos int8 cuantiza sobre un
+    buffer de staging preasignado.
+
+    Sólo se guardan las funciones devueltas por tensor(): el intérprete no
+    permite invoke() ni allocate_tensors() mientras existan vistas vivas a sus
+    buffers internos.
+    """
+
+    def __init__(self, interpreter, input_index=0, output_index=0):
+        self.interpreter = interpreter
+        input_detail = interpreter.get_input_details()[input_index]
+        output_detail = interpreter.get_output_details()[output_index]
+
+        self._input_index = input_detail["index"]
+        self._input = interpreter.tensor(input_detail["index"])
+        self._output = interpreter.tensor(output_detail["index"])
+
+        self.input_shape = tuple(input_detail["shape"])
+        self.batch_size = self.input_shape[0]
+        self.input_quantized = input_detail["dtype"] == np.int8
+        self.output_quantized = output_detail["dtype"] == np.int8
+        self.input_scale, self.input_zero_point = input_detail["quantization"]
+        self.output_scale, self.output_zero_point = output_detail["quantization"]
+
+        self._staging = None
+        self._allocate_staging()
+
+    def _allocate_staging(self):
+        """Buffer float32 de cuantización (sólo modelos int8)"""
+        if self.input_quantized:
+            self._staging = np.zeros(
+                (self.batch_size,) + self.input_shape[1:], dtype=np.float32
+            )
+
+    def _resize(self, batch_size):
+        """Redimensiona el tensor de entrada a batch_size ventanas"""
+        if batch_size == self.batch_size:
+            return
+        self.interpreter.resize_tensor_input(
+            self._input_index, [batch_size, *self.input_shape[1:]]
+        )
+        self.interpreter.allocate_tensors()
+        self.batch_size = batch_size
+        self._allocate_staging()
+
+    def set_input(self, features):
+        """Copia las features float32 al tensor de entrada (cuantiza si es int8)"""
+        if self.input_quantized:
+            staging = self._staging
+            np.divide(features, self.input_scale, out=staging)
+            staging += self.input_zero_point
+            np.rint(staging, out=staging)
+            np.clip(staging, -128, 127, out=staging)
+            self._input()[...] = staging
+        else:
+            self._input()[...] = features
+
+    def _dequantize(self, value):
+        if self.output_quantized:
+            return (value - self.output_zero_point) * self.output_scale
+        return value
+
+    def invoke(self):
+        """Ejecuta el modelo y retorna la probabilidad de la primera ventana"""
+        self.interpreter.invoke()
+        return self._dequantize(float(self._output()[0, 0]))
+
+    def run(self, features):
+        """Inferencia de una sola ventana: set_input() + invoke()"""
+        self._resize(1)
+        self.set_input(features)
+        return self.invoke()
+
+    def run_batch(self, features):
+        """
+        Inferencia de N ventanas en una sola llamada a invoke()
+
+        Redimensiona el tensor de entrada sólo cuando cambia N (allocate_tensors
+        es costoso); run() vuelve a batch 1.
+
+        Args:
+            features: Array (N, ...) float32 con la forma de entrada del modelo
+
+        Returns:
+            Lista de N probabilidades (float)
+        """
+        self._resize(len(features))
+        self.set_input(features)
+        self.interpreter.invoke()
+        return [self._dequantize(float(v)) for v in self._output()[:, 0]]
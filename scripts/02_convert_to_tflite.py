@@ -1,10 +1,149 @@
-import tensorflow as tf
+import argparse
+import importlib.util
+import json
 import os
+import time
+
+import numpy as np
+import tensorflow as tf
+from sklearn.model_selection import train_test_split
 
 MODEL_PATH = "jeepy_kws_model.keras"
 OUTPUT_TFLITE_PATH = "jeepy_kws_model_quantized.tflite"
+OUTPUT_FLOAT_PATH = "jeepy_kws_model_float.tflite"
+OUTPUT_INT8_PATH = "jeepy_kws_model_int8.tflite"
+REPORT_PATH = "tflite_conversion_report.json"
+
+# Número máximo de muestras para calibrar la cuantización int8
+REPRESENTATIVE_SAMPLES = 300
+# Repeticiones por muestra al medir latencia
+LATENCY_RUNS = 3
+
+TRAIN_SCRIPT_PATH = os.path.join(os.path.dirname(__file__), "01_train-kws-model.py")
+
+
+def load_training_module():
+    """Importa el script de entrenamiento para reutilizar su pipeline MFCC"""
+    spec = importlib.util.spec_from_file_location("train_kws_model", TRAIN_SCRIPT_PATH)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+def load_dataset():
+    """
+    Carga data/jeepy_positive y data/jeepy_negative con el mismo extract_mfcc
+    del entrenamiento y reproduce su partición de prueba (random_state=42).
+    """
+    train_module = load_training_module()
+    X, y = train_module.load_data()
+    X = X.astype(np.float32)
+
+    X_train_val, X_test, _, y_test = train_test_split(
+        X, y, test_size=0.1, random_state=42, stratify=y
+    )
+    return X_train_val, X_test, y_test
+
+
+def make_representative_dataset(samples):
+    """Generador de calibración para la cuantización de enteros completa"""
+    rng = np.random.default_rng(42)
+    count = min(REPRESENTATIVE_SAMPLES, len(samples))
+    indices = rng.choice(len(samples), size=count, replace=False)
+
+    def representative_dataset():
+        for i in indices:
+            yield [samples[i : i + 1]]
+
+    return representative_dataset
+
+
+def convert(model, mode, calibration_samples=None):
+    """Convierte el modelo Keras a TFLite en el modo indicado"""
+    converter = tf.lite.TFLiteConverter.from_keras_model(model)
+
+    if mode == "dynamic":
+        # Cuantización de rango dinámico: pesos int8, activaciones float
+        converter.optimizations = [tf.lite.Optimize.DEFAULT]
+
+    elif mode == "int8":
+        # Cuantización entera completa: entrada/salida int8, kernels int8
+        converter.optimizations = [tf.lite.Optimize.DEFAULT]
+        converter.representative_dataset = make_representative_dataset(
+            calibration_samples
+        )
+        converter.target_spec.supported_ops = [tf.lite.OpsSet.TFLITE_BUILTINS_INT8]
+        converter.inference_input_type = tf.int8
+        converter.inference_output_type = tf.int8
+
+    return converter.convert()
+
+
+def evaluate(model_path, X_test, y_test):
+    """Evalúa precisión y latencia por inferencia de un modelo TFLite"""
+    interpreter = tf.lite.Interpreter(model_path=model_path)
+    interpreter.allocate_tensors()
+    input_detail = interpreter.get_input_details()[0]
+    output_detail = interpreter.get_output_details()[0]
+
+    in_scale, in_zero = input_detail["quantization"]
+    out_scale, out_zero = output_detail["quantization"]
+    quantized_input = input_detail["dtype"] == np.int8
+
+    predictions = []
+    times = []
+    for sample in X_test:
+        x = sample[np.newaxis, ...]
+        if quantized_input:
+            x = np.clip(np.round(x / in_scale + in_zero), -128, 127).astype(np.int8)
+
+        for _ in range(LATENCY_RUNS):
+            start = time.perf_counter()
+            interpreter.set_tensor(input_detail["index"], x)
+            interpreter.invoke()
+            output = interpreter.get_tensor(output_detail["index"])
+            times.append(time.perf_counter() - start)
+
+        prob = float(output[0][0])
+        if output_detail["dtype"] == np.int8:
+            prob = (prob - out_zero) * out_scale
+        predictions.append(prob)
+
+    predictions = np.array(predictions)
+    accuracy = float(np.mean((predictions >= 0.5).astype(int) == y_test))
+
+    return {
+        "model_path": model_path,
+        "size_kb": os.path.getsize(model_path) / 1024,
+        "accuracy": accuracy,
+        "latency_mean_ms": float(np.mean(times)) * 1000,
+        "latency_p95_ms": float(np.percentile(times, 95)) * 1000,
+        "input_dtype": np.dtype(input_detail["dtype"]).name,
+    }
+
+
+def print_report(report):
+    """Imprime la comparación lado a lado de las variantes"""
+    print("\n--- COMPARACIÓN DE VARIANTES TFLITE ---")
+    print(
+        f"{'Variante':10} {'Tamaño KB':>10} {'Precisión':>10} {'Lat. media ms':>14} {'Lat. p95 ms':>12} {'Entrada':>8}"
+    )
+    for mode, r in report.items():
+        print(
+            f"{mode:10} {r['size_kb']:10.1f} {r['accuracy']:10.4f} {r['latency_mean_ms']:14.3f} {r['latency_p95_ms']:12.3f} {r['input_dtype']:>8}"
+        )
+
 
 if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Conversión del modelo KWS a TFLite")
+    parser.add_argument(
+        "--mode",
+        choices=["dynamic", "int8", "all"],
+        default="dynamic",
+        help="dynamic: rango dinámico (por defecto); int8: entero completo; all: float, dynamic e int8 con reporte",
+    )
+    args = parser.parse_args()
+
     if not os.path.exists(MODEL_PATH):
         print(f"Error: No se encontró el modelo entrenado en {MODEL_PATH}.")
         print("Asegúrate de ejecutar el script de entrenamiento primero.")
@@ -12,25 +151,31 @@ if __name__ == "__main__":
         # Cargar el modelo entrenado
         model = tf.keras.models.load_model(MODEL_PATH)
 
-        # 1. Configurar el TFLite Converter
-        converter = tf.lite.TFLiteConverter.from_keras_model(model)
-
-        # 2. Habilitar Optimizaciones (¡Cuantización!)
-        # Esta es la clave para TinyML: reduce el tamaño y acelera la inferencia.
-        converter.optimizations = [tf.lite.Optimize.DEFAULT]
+        outputs = {
+            "float": OUTPUT_FLOAT_PATH,
+            "dynamic": OUTPUT_TFLITE_PATH,
+            "int8": OUTPUT_INT8_PATH,
+        }
+        modes = ["float", "dynamic", "int8"] if args.mode == "all" else [args.mode]
 
-        # 3. Aplicar Cuantización de Enteros (Cuantización Completa)
-        # Esto reduce el modelo de 32 bits a 8 bits.
-        # Requiere un 'Representative Dataset' para calibración.
-        # Para simplificar, aquí usamos una cuantización post-entrenamiento básica.
+        # El dataset (mismo pipeline MFCC del entrenamiento) se usa para
+        # calibrar int8 y para el reporte comparativo
+        X_calibration = X_test = y_test = None
+        if "int8" in modes:
+            X_calibration, X_test, y_test = load_dataset()
 
-        # Generar el modelo TFLite
-        tflite_model = converter.convert()
+        for mode in modes:
+            tflite_model = convert(model, mode, X_calibration)
+            with open(outputs[mode], "wb") as f:
+                f.write(tflite_model)
+            print(f"\n--- CONVERSIÓN TFLITE ({mode}) EXITOSA ---")
+            print(f"Modelo guardado como: {outputs[mode]}")
 
-        # Guardar el modelo TFLite cuantizado
-        with open(OUTPUT_TFLITE_PATH, "wb") as f:
-            f.write(tflite_model)
+        if args.mode == "all":
+            report = {mode: evaluate(outputs[mode], X_test, y_test) for mode in modes}
+            print_report(report)
+            with open(REPORT_PATH, "w", encoding="utf-8") as f:
+                json.dump(report, f, indent=2)
+            print(f"\nReporte guardado en: {REPORT_PATH}")
 
-        print("\n--- CONVERSIÓN TFLITE EXITOSA ---")
-        print(f"Modelo cuantizado guardado como: {OUTPUT_TFLITE_PATH}")
-        print("¡Este archivo es el que usarás en la Raspberry Pi!")
+        print("\n¡Copia el modelo elegido a la Raspberry Pi (TFLITE_MODEL_PATH)!")
@@ -129,13 +129,15 @@ def main():
     print("  2. openai (API, mejor calidad)")
     print("  3. google_cloud (API, mejor español)")
     print("  4. vosk (offline, más ligero)")
+    print("  5. faster_whisper (offline, int8, más rápido en CPU)")
 
-    stt_choice = input("\nSelecciona motor STT (1-4) [1]: ").strip() or "1"
+    stt_choice = input("\nSelecciona motor STT (1-5) [1]: ").strip() or "1"
     stt_engines = {
         "1": "whisper_local",
         "2": "openai",
         "3": "google_cloud",
         "4": "vosk",
+        "5": "faster_whisper",
     }
     updates["STT_ENGINE"] = stt_engines.get(stt_choice, "whisper_local")
 
@@ -0,0 +1,165 @@
+"""
+Jeepy AI - Módulo de NLU especulativa
+Interpreta la transcripción parcial del STT en cuanto deja de cambiar (el
+usuario hizo una pausa o terminó de hablar y el STT aún no cierra), para que
+STT y Gemini no sumen su latencia en serie. Con la transcripción final la
+especulación se confirma (misma frase normalizada) o se descarta y se
+interpreta el texto final.
+
+La especulación usa process_command(speculative=True) (parser local ->
+caché -> Gemini) en un único hilo de baja prioridad: nunca ejecuta acciones,
+nunca hay más de una petición especulativa en vuelo (no se encolan), y las
+estadísticas del parser y la caché sólo se actualizan al confirmarse.
+"""
+
+import threading
+import time
+from collections import deque
+from concurrent.futures import CancelledError, Future, ThreadPoolExecutor
+from typing import Any, Dict, Optional
+
+from config import Config
+from instrumentation import record_latency
+from intent_parser import normalize_utterance
+
+
+class Speculation:
+    """Interpretación especulativa de un prefijo en curso"""
+
+    def __init__(self, text: str, key: str, future: Future):
+        self.text = text
+        self.key = key  # Frase normalizada que debe coincidir con la final
+        self.future = future  # -> (interpretación, inicio, fin)
+
+    def cancel(self):
+        self.future.cancel()  # Si ya está en vuelo, su resultado se ignora
+
+
+class SpeculativeNLU:
+    """
+    Especulación de NLU sobre transcripciones parciales
+
+    Args:
+        engine: GeminiEngine (o AsyncGeminiEngine) que interpreta los prefijos
+        stable_partials: Parciales consecutivos que deben coincidir (frase
+            normalizada) para considerar estable la hipótesis
+        min_words: Palabras mínimas del prefijo para especular
+    """
+
+    def __init__(
+        self,
+        engine,
+        stable_partials: Optional[int] = None,
+        min_words: Optional[int] = None,
+    ):
+        self.engine = engine
+        self.min_words = min_words or Config.SPECULATIVE_MIN_WORDS
+        self._partials = deque(
+            maxlen=stable_partials or Config.SPECULATIVE_STABLE_PARTIALS
+        )
+        self._speculation: Optional[Speculation] = None
+        self._inflight: Optional[Future] = None  # Última enviada al executor
+        self._executor = ThreadPoolExecutor(
+            max_workers=1, thread_name_prefix="nlu-spec"
+        )
+        self._lock = threading.Lock()
+        self.speculations = 0
+        self.hits = 0
+        self.misses = 0
+        self.saved_ms = 0.0
+
+    def reset(self):
+        """Nuevo comando: descarta parciales y especulación anteriores"""
+        with self._lock:
+            self._partials.clear()
+            if self._speculation:
+                self._speculation.cancel()
+            self._speculation = None
+
+    def observe(self, partial_text: str):
+        """
+        Registra una hipótesis parcial (se puede llamar en cada sondeo, con
+        repeticiones); lanza una especulación cuando la hipótesis es estable,
+        nueva y suficientemente larga, y no hay otra en vuelo (no se puede
+        interrumpir y la nueva esperaría detrás)
+        """
+        key = normalize_utterance(partial_text)
+        with self._lock:
+            self._partials.append(key)
+            if len(self._partials) < self._partials.maxlen:
+                return
+            if any(other != key for other in self._partials):
+                return  # La hipótesis sigue creciendo o cambiando
+            if len(key.split()) < self.min_words:
+                return
+            if self._speculation and self._speculation.key == key:
+                return
+            if self._inflight and not self._inflight.done():
+                return  # También si es de un comando ya resuelto o descartado
+            text = partial_text.strip()
+            self._inflight = self._executor.submit(self._interpret, text)
+            self._speculation = Speculation(text, key, self._inflight)
+            self.speculations += 1
+
+    def _interpret(self, text: str):
+        start = time.perf_counter()
+        result = self.engine.process_command(text, speculative=True)
+        return result, start, time.perf_counter()
+
+    def resolve(self, final_text: str) -> Optional[Dict[str, Any]]:
+        """
+        Confirma o descarta la especulación con la transcripción final
+
+        Returns:
+            Interpretación especulativa (esperando a que termine si sigue en
+            vuelo) o None si no hubo, no coincide o falló
+        """
+        final_at = time.perf_counter()
+        with self._lock:
+            speculation, self._speculation = self._speculation, None
+            self._partials.clear()
+        if speculation is None:
+            return None
+
+        # Sólo se espera a una especulación que ya está en vuelo o terminó;
+        # si aún estaba en cola se cancela y el texto final va por la vía normal
+        if (
+            speculation.key != normalize_utterance(final_text)
+            or speculation.future.cancel()
+        ):
+            speculation.cancel()
+            self.misses += 1
+            return None
+        try:
+            result, started_at, done_at = speculation.future.result()
+        except CancelledError:
+            result = None
+        except Exception as e:
+            print(f"⚠️  Especulación fallida: {e}")
+            result = None
+        if not result:
+            self.misses += 1
+            return None
+
+        # Sin especular la NLU habría empezado en final_at y tardado lo mismo
+        saved = final_at + (done_at - started_at) - max(final_at, done_at)
+        saved = max(saved, 0.0)
+        self.engine.commit_speculation(final_text, result)
+        self.hits += 1
+        self.saved_ms += saved * 1000
+        record_latency("nlu.speculation_saved", int(saved * 1e9))
+        return dict(result, speculative=True)
+
+    def stats(self) -> Dict[str, Any]:
+        resolved = self.hits + self.misses
+        return {
+            "speculations": self.speculations,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / resolved if resolved else 0.0,
+            "saved_ms": self.saved_ms,
+            "saved_mean_ms": self.saved_ms / self.hits if self.hits else 0.0,
+        }
+
+    def shutdown(self):
+        self._executor.shutdown(wait=False, cancel_futures=True)
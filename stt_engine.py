@@ -1,24 +1,149 @@
 """
 Jeepy AI - Módulo de Speech-to-Text
-Soporta múltiples motores: Whisper local, OpenAI Whisper API, Google Cloud, Vosk
+Soporta múltiples motores: Whisper local, faster-whisper, OpenAI Whisper API,
+Google Cloud, Vosk
 """
 
+import hashlib
+import io
+import json
 import os
+import queue
+import socket
+import sqlite3
+import threading
+import time
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
 from pathlib import Path
-from typing import Optional
+from typing import Dict, List, Optional, Tuple, Union
 import wave
 import numpy as np
 
 from config import Config
+from instrumentation import now_ns, record_latency
+
+# Frecuencia de muestreo que esperan todos los motores
+STT_SAMPLE_RATE = 16000
+
+# Entrada de audio: ruta a un WAV o buffer NumPy (float32 en [-1, 1] o int16)
+AudioInput = Union[str, np.ndarray]
+
+
+def to_float32(audio: np.ndarray, sample_rate: int = STT_SAMPLE_RATE) -> np.ndarray:
+    """
+    Normaliza un buffer en memoria a float32 mono a 16 kHz
+
+    Args:
+        audio: Array float32 en [-1, 1] o int16
+        sample_rate: Frecuencia de muestreo del buffer
+
+    Returns:
+        Array float32 contiguo a STT_SAMPLE_RATE
+    """
+    if audio.dtype == np.int16:
+        audio = audio.astype(np.float32) / 32768.0
+    else:
+        audio = np.asarray(audio, dtype=np.float32)
+    if audio.ndim > 1:
+        audio = audio.mean(axis=1)
+
+    if sample_rate != STT_SAMPLE_RATE:
+        # Remuestreo lineal (el micrófono ya captura a 16 kHz normalmente)
+        n_out = int(round(len(audio) * STT_SAMPLE_RATE / sample_rate))
+        positions = np.arange(n_out) * (sample_rate / STT_SAMPLE_RATE)
+        audio = np.interp(positions, np.arange(len(audio)), audio).astype(np.float32)
+
+    return np.ascontiguousarray(audio)
+
+
+def to_pcm16(audio: np.ndarray, sample_rate: int = STT_SAMPLE_RATE) -> bytes:
+    """Convierte un buffer en memoria a bytes PCM 16-bit mono a 16 kHz"""
+    if audio.dtype == np.int16 and sample_rate == STT_SAMPLE_RATE:
+        return audio.tobytes()
+    audio = to_float32(audio, sample_rate)
+    return (np.clip(audio, -1.0, 1.0) * 32767).astype(np.int16).tobytes()
+
+
+def to_wav_bytes(audio: np.ndarray, sample_rate: int = STT_SAMPLE_RATE) -> io.BytesIO:
+    """Empaqueta un buffer en memoria como WAV en un BytesIO (sin tocar disco)"""
+    buffer = io.BytesIO()
+    with wave.open(buffer, "wb") as wf:
+        wf.setnchannels(1)
+        wf.setsampwidth(2)
+        wf.setframerate(STT_SAMPLE_RATE)
+        wf.writeframes(to_pcm16(audio, sample_rate))
+    buffer.seek(0)
+    buffer.name = "command.wav"  # Las APIs deducen el formato por la extensión
+    return buffer
+
+
+# Whisper en streaming: transcribe segmentos de este tamaño mientras se habla
+WHISPER_STREAM_SEGMENT_SEC = 3.0
+# Margen final del segmento donde se busca la pausa para cortar
+WHISPER_STREAM_CUT_SEARCH_SEC = 0.5
+
+
+class StreamingSession:
+    """
+    Sesión de transcripción incremental.
+
+    accept() recibe los chunks de la grabación a medida que llegan, partial()
+    retorna la hipótesis parcial actual y finish() la transcripción final.
+    Esta implementación base sólo acumula el audio y transcribe todo en
+    finish() (para motores sin soporte de streaming).
+    """
+
+    streaming = False
+
+    def __init__(self, engine: "STTEngine", sample_rate: int = STT_SAMPLE_RATE):
+        self.engine = engine
+        self.sample_rate = sample_rate
+        self.chunks = []
+        self._partial = ""
+
+    def accept(self, chunk: np.ndarray):
+        """Añade un chunk de audio (float32 o int16)"""
+        self.chunks.append(chunk)
+
+    def partial(self) -> str:
+        """Hipótesis parcial (vacía si el motor no la soporta)"""
+        return self._partial
+
+    def finish(self) -> Optional[str]:
+        """Cierra el stream y retorna la transcripción final"""
+        if not self.chunks:
+            return None
+        audio = np.concatenate(self.chunks)
+        self.chunks = []
+        return self.engine.transcribe(audio, self.sample_rate)
 
 
 class STTEngine:
     """Clase base para motores STT"""
 
-    def transcribe(self, audio_file: str) -> Optional[str]:
-        """Transcribe un archivo de audio a texto"""
+    def transcribe(
+        self, audio: AudioInput, sample_rate: int = STT_SAMPLE_RATE
+    ) -> Optional[str]:
+        """
+        Transcribe audio a texto
+
+        Args:
+            audio: Ruta a un WAV o buffer NumPy en memoria
+            sample_rate: Frecuencia de muestreo del buffer (ignorada con rutas)
+        """
         raise NotImplementedError
 
+    def transcribe_with_confidence(
+        self, audio: AudioInput, sample_rate: int = STT_SAMPLE_RATE
+    ) -> Tuple[Optional[str], Optional[float]]:
+        """Retorna (texto, confianza 0-1 o None si el motor no la reporta)"""
+        return self.transcribe(audio, sample_rate), None
+
+    def start_stream(self, sample_rate: int = STT_SAMPLE_RATE) -> StreamingSession:
+        """Inicia una sesión incremental (por defecto: acumular y transcribir)"""
+        return StreamingSession(self, sample_rate)
+
 
 class WhisperLocalSTT(STTEngine):
     """Motor STT usando Whisper local (OpenAI)"""
@@ -32,19 +157,131 @@ class WhisperLocalSTT(STTEngine):
         except ImportError:
             raise ImportError("Whisper no instalado. Ejecuta: uv add openai-whisper")
 
-    def transcribe(self, audio_file: str) -> Optional[str]:
+    def transcribe(
+        self,
+        audio: AudioInput,
+        sample_rate: int = STT_SAMPLE_RATE,
+        initial_prompt: Optional[str] = None,
+    ) -> Optional[str]:
         """Transcribe usando Whisper local"""
         try:
+            # Con un array, Whisper no invoca ffmpeg para decodificar
+            if not isinstance(audio, str):
+                audio = to_float32(audio, sample_rate)
+
             result = self.model.transcribe(
-                audio_file,
+                audio,
                 language=Config.STT_LANGUAGE.split("-")[0],  # 'es' de 'es-MX'
                 fp16=False,  # Compatibilidad CPU
+                initial_prompt=initial_prompt,  # Contexto entre segmentos
             )
             return result["text"].strip()
         except Exception as e:
             print(f"❌ Error en transcripción Whisper local: {e}")
             return None
 
+    def start_stream(self, sample_rate: int = STT_SAMPLE_RATE) -> StreamingSession:
+        return WhisperChunkedStream(self, sample_rate)
+
+
+class WhisperChunkedStream(StreamingSession):
+    """
+    Streaming por segmentos para Whisper local: cada WHISPER_STREAM_SEGMENT_SEC
+    de audio se transcribe mientras el usuario sigue hablando (cortando en la
+    pausa más cercana), de modo que finish() sólo procesa la cola final.
+    """
+
+    streaming = True
+
+    def __init__(self, engine: STTEngine, sample_rate: int = STT_SAMPLE_RATE):
+        super().__init__(engine, sample_rate)
+        self.pending = np.zeros(0, dtype=np.float32)
+        self.texts = []
+        self.segment_size = int(WHISPER_STREAM_SEGMENT_SEC * STT_SAMPLE_RATE)
+        self.search_size = int(WHISPER_STREAM_CUT_SEARCH_SEC * STT_SAMPLE_RATE)
+
+    def _find_cut(self) -> int:
+        """Índice de corte en el frame de 20 ms de menor energía del margen final"""
+        frame = STT_SAMPLE_RATE // 50
+        region = self.pending[self.segment_size - self.search_size : self.segment_size]
+        n_frames = len(region) // frame
+        energy = np.square(region[: n_frames * frame]).reshape(n_frames, frame).sum(1)
+        return self.segment_size - self.search_size + int(np.argmin(energy)) * frame
+
+    def _transcribe_segment(self, audio: np.ndarray):
+        text = self.engine.transcribe(
+            audio, STT_SAMPLE_RATE, initial_prompt=" ".join(self.texts) or None
+        )
+        if text:
+            self.texts.append(text)
+            self._partial = " ".join(self.texts)
+
+    def accept(self, chunk: np.ndarray):
+        self.pending = np.concatenate(
+            [self.pending, to_float32(chunk, self.sample_rate)]
+        )
+        if len(self.pending) >= self.segment_size:
+            cut = self._find_cut()
+            segment, self.pending = self.pending[:cut], self.pending[cut:]
+            self._transcribe_segment(segment)
+
+    def finish(self) -> Optional[str]:
+        # Ignorar colas de menos de 0.1 s (sólo el silencio final)
+        if len(self.pending) >= STT_SAMPLE_RATE // 10:
+            self._transcribe_segment(self.pending)
+        self.pending = np.zeros(0, dtype=np.float32)
+        return " ".join(self.texts).strip() or None
+
+
+class FasterWhisperSTT(STTEngine):
+    """Motor STT usando faster-whisper (Whisper en CTranslate2, int8 en CPU)"""
+
+    def __init__(self):
+        try:
+            from faster_whisper import WhisperModel
+        except ImportError:
+            raise ImportError(
+                "faster-whisper no instalado. Ejecuta: uv add faster-whisper"
+            )
+
+        self.model = WhisperModel(
+            Config.FASTER_WHISPER_MODEL,
+            device="cpu",
+            compute_type=Config.FASTER_WHISPER_COMPUTE_TYPE,
+            cpu_threads=Config.FASTER_WHISPER_CPU_THREADS,
+        )
+        print(
+            f"✅ faster-whisper cargado (modelo: {Config.FASTER_WHISPER_MODEL}, "
+            f"{Config.FASTER_WHISPER_COMPUTE_TYPE}, {Config.FASTER_WHISPER_CPU_THREADS} hilos)"
+        )
+
+    def transcribe(
+        self,
+        audio: AudioInput,
+        sample_rate: int = STT_SAMPLE_RATE,
+        initial_prompt: Optional[str] = None,
+    ) -> Optional[str]:
+        """Transcribe usando faster-whisper"""
+        try:
+            if not isinstance(audio, str):
+                audio = to_float32(audio, sample_rate)
+
+            segments, _ = self.model.transcribe(
+                audio,
+                language=Config.STT_LANGUAGE.split("-")[0],
+                beam_size=Config.FASTER_WHISPER_BEAM_SIZE,
+                vad_filter=Config.FASTER_WHISPER_VAD_FILTER,  # Descarta silencios
+                initial_prompt=initial_prompt,
+            )
+            # segments es un generador: la decodificación ocurre al iterar
+            return " ".join(segment.text.strip() for segment in segments).strip()
+        except Exception as e:
+            print(f"❌ Error en transcripción faster-whisper: {e}")
+            return None
+
+    def start_stream(self, sample_rate: int = STT_SAMPLE_RATE) -> StreamingSession:
+        return WhisperChunkedStream(self, sample_rate)
+
 
 class OpenAIWhisperSTT(STTEngine):
     """Motor STT usando OpenAI Whisper API"""
@@ -61,13 +298,20 @@ class OpenAIWhisperSTT(STTEngine):
         except ImportError:
             raise ImportError("OpenAI SDK no instalado. Ejecuta: uv add openai")
 
-    def transcribe(self, audio_file: str) -> Optional[str]:
+    def transcribe(
+        self, audio: AudioInput, sample_rate: int = STT_SAMPLE_RATE
+    ) -> Optional[str]:
         """Transcribe usando OpenAI Whisper API"""
         try:
-            with open(audio_file, "rb") as audio:
+            if isinstance(audio, str):
+                audio_file = open(audio, "rb")
+            else:
+                audio_file = to_wav_bytes(audio, sample_rate)
+
+            with audio_file:
                 transcript = self.client.audio.transcriptions.create(
                     model=Config.WHISPER_MODEL,
-                    file=audio,
+                    file=audio_file,
                     language=Config.STT_LANGUAGE.split("-")[0],
                 )
             return transcript.text.strip()
@@ -96,23 +340,37 @@ class GoogleCloudSTT(STTEngine):
                 "Google Cloud Speech no instalado. Ejecuta: uv add google-cloud-speech"
             )
 
-    def transcribe(self, audio_file: str) -> Optional[str]:
+    def recognition_config(self):
+        """Configuración LINEAR16 16 kHz compartida por recognize y streaming"""
+        from google.cloud import speech
+
+        return speech.RecognitionConfig(
+            encoding=speech.RecognitionConfig.AudioEncoding.LINEAR16,
+            sample_rate_hertz=STT_SAMPLE_RATE,
+            language_code=Config.STT_LANGUAGE,
+        )
+
+    def start_stream(self, sample_rate: int = STT_SAMPLE_RATE) -> StreamingSession:
+        return GoogleStreamingSession(self, sample_rate)
+
+    def transcribe(
+        self, audio: AudioInput, sample_rate: int = STT_SAMPLE_RATE
+    ) -> Optional[str]:
         """Transcribe usando Google Cloud"""
         try:
             from google.cloud import speech
 
-            with open(audio_file, "rb") as audio:
-                content = audio.read()
+            if isinstance(audio, str):
+                with open(audio, "rb") as f:
+                    content = f.read()
+            else:
+                content = to_pcm16(audio, sample_rate)
 
             audio = speech.RecognitionAudio(content=content)
-            config = speech.RecognitionConfig(
-                encoding=speech.RecognitionConfig.AudioEncoding.LINEAR16,
-                sample_rate_hertz=16000,
-                language_code=Config.STT_LANGUAGE,
+            response = self.client.recognize(
+                config=self.recognition_config(), audio=audio
             )
 
-            response = self.client.recognize(config=config, audio=audio)
-
             if response.results:
                 return response.results[0].alternatives[0].transcript.strip()
             return None
@@ -122,6 +380,65 @@ class GoogleCloudSTT(STTEngine):
             return None
 
 
+class GoogleStreamingSession(StreamingSession):
+    """
+    Streaming con streaming_recognize de Google Cloud: los chunks se envían
+    desde un hilo de fondo y los resultados interinos alimentan partial().
+    """
+
+    streaming = True
+
+    def __init__(self, engine: "GoogleCloudSTT", sample_rate: int = STT_SAMPLE_RATE):
+        super().__init__(engine, sample_rate)
+        self.requests = queue.Queue()
+        self.finals = []
+        self.error = None
+        self.thread = threading.Thread(target=self._run, daemon=True)
+        self.thread.start()
+
+    def _request_stream(self):
+        from google.cloud import speech
+
+        while True:
+            content = self.requests.get()
+            if content is None:
+                return
+            yield speech.StreamingRecognizeRequest(audio_content=content)
+
+    def _run(self):
+        from google.cloud import speech
+
+        streaming_config = speech.StreamingRecognitionConfig(
+            config=self.engine.recognition_config(),
+            interim_results=True,
+        )
+        try:
+            responses = self.engine.client.streaming_recognize(
+                streaming_config, self._request_stream()
+            )
+            for response in responses:
+                for result in response.results:
+                    transcript = result.alternatives[0].transcript.strip()
+                    if result.is_final:
+                        self.finals.append(transcript)
+                        self._partial = " ".join(self.finals)
+                    else:
+                        self._partial = " ".join(self.finals + [transcript])
+        except Exception as e:
+            self.error = e
+
+    def accept(self, chunk: np.ndarray):
+        self.requests.put(to_pcm16(chunk, self.sample_rate))
+
+    def finish(self) -> Optional[str]:
+        self.requests.put(None)
+        self.thread.join()
+        if self.error:
+            print(f"❌ Error en streaming Google Cloud: {self.error}")
+            return None
+        return " ".join(self.finals).strip() or None
+
+
 class VoskSTT(STTEngine):
     """Motor STT usando Vosk (offline)"""
 
@@ -141,62 +458,595 @@ class VoskSTT(STTEngine):
         except ImportError:
             raise ImportError("Vosk no instalado. Ejecuta: uv add vosk")
 
-    def transcribe(self, audio_file: str) -> Optional[str]:
-        """Transcribe usando Vosk"""
-        try:
-            # Leer WAV
-            wf = wave.open(audio_file, "rb")
+    def _read_wav(self, audio_file: str) -> Optional[bytes]:
+        """Lee los frames PCM de un WAV mono, 16-bit, 16kHz"""
+        with wave.open(audio_file, "rb") as wf:
             if (
                 wf.getnchannels() != 1
                 or wf.getsampwidth() != 2
-                or wf.getframerate() != 16000
+                or wf.getframerate() != STT_SAMPLE_RATE
             ):
                 print("❌ Audio debe ser mono, 16-bit, 16kHz")
                 return None
+            return wf.readframes(wf.getnframes())
 
-            rec = self.KaldiRecognizer(self.model, wf.getframerate())
+    def transcribe(
+        self, audio: AudioInput, sample_rate: int = STT_SAMPLE_RATE
+    ) -> Optional[str]:
+        """Transcribe usando Vosk"""
+        return self.transcribe_with_confidence(audio, sample_rate)[0]
+
+    def transcribe_with_confidence(
+        self, audio: AudioInput, sample_rate: int = STT_SAMPLE_RATE
+    ) -> Tuple[Optional[str], Optional[float]]:
+        """Transcribe usando Vosk; la confianza es la media de conf por palabra"""
+        try:
+            if isinstance(audio, str):
+                pcm = self._read_wav(audio)
+                if pcm is None:
+                    return None, None
+            else:
+                pcm = to_pcm16(audio, sample_rate)
+
+            rec = self.KaldiRecognizer(self.model, STT_SAMPLE_RATE)
             rec.SetWords(True)
 
             text = ""
-            while True:
-                data = wf.readframes(4000)
-                if len(data) == 0:
-                    break
+            confidences = []
+            # Bloques de 4000 frames (2 bytes por muestra)
+            for offset in range(0, len(pcm), 8000):
+                data = pcm[offset : offset + 8000]
                 if rec.AcceptWaveform(data):
                     result = self.json.loads(rec.Result())
                     text += result.get("text", "") + " "
+                    confidences += [w["conf"] for w in result.get("result", [])]
 
             final_result = self.json.loads(rec.FinalResult())
             text += final_result.get("text", "")
+            confidences += [w["conf"] for w in final_result.get("result", [])]
 
-            return text.strip()
+            confidence = float(np.mean(confidences)) if confidences else None
+            return text.strip(), confidence
 
         except Exception as e:
             print(f"❌ Error en transcripción Vosk: {e}")
+            return None, None
+
+    def start_stream(self, sample_rate: int = STT_SAMPLE_RATE) -> StreamingSession:
+        return VoskStreamingSession(self, sample_rate)
+
+
+class VoskStreamingSession(StreamingSession):
+    """
+    Streaming nativo de Vosk: AcceptWaveform decodifica cada chunk al
+    recibirlo, así que finish() sólo vacía el último fragmento.
+    """
+
+    streaming = True
+
+    def __init__(self, engine: "VoskSTT", sample_rate: int = STT_SAMPLE_RATE):
+        super().__init__(engine, sample_rate)
+        self.rec = engine.KaldiRecognizer(engine.model, STT_SAMPLE_RATE)
+        self.texts = []
+
+    def accept(self, chunk: np.ndarray):
+        if self.rec.AcceptWaveform(to_pcm16(chunk, self.sample_rate)):
+            text = self.engine.json.loads(self.rec.Result()).get("text", "")
+            if text:
+                self.texts.append(text)
+            self._partial = " ".join(self.texts)
+        else:
+            partial = self.engine.json.loads(self.rec.PartialResult())
+            self._partial = " ".join(self.texts + [partial.get("partial", "")]).strip()
+
+    def finish(self) -> Optional[str]:
+        text = self.engine.json.loads(self.rec.FinalResult()).get("text", "")
+        if text:
+            self.texts.append(text)
+        return " ".join(self.texts).strip() or None
+
+
+class StubSTT(STTEngine):
+    """
+    Motor STT simulado (sin red ni modelo) para pruebas y benchmarks:
+    responde Config.STT_STUB_TEXT tras Config.STT_STUB_LATENCY_MS.
+    """
+
+    def __init__(self, latency_ms: Optional[float] = None, text: Optional[str] = None):
+        if latency_ms is None:
+            latency_ms = Config.STT_STUB_LATENCY_MS
+        self.latency = latency_ms / 1000
+        self.text = text if text is not None else Config.STT_STUB_TEXT
+
+    def transcribe(
+        self, audio: AudioInput, sample_rate: int = STT_SAMPLE_RATE
+    ) -> Optional[str]:
+        time.sleep(self.latency)
+        return self.text
+
+
+class EngineStats:
+    """Latencias recientes, lanzamientos y victorias de un motor en la carrera"""
+
+    def __init__(self, history: int = 200):
+        self.latencies = deque(maxlen=history)  # Sólo resultados válidos
+        self.launches = 0
+        self.wins = 0
+        self.failures = 0
+        self.lock = threading.Lock()
+
+    def launched(self):
+        with self.lock:
+            self.launches += 1
+
+    def won(self):
+        with self.lock:
+            self.wins += 1
+
+    def record(self, latency: float, ok: bool):
+        with self.lock:
+            if ok:
+                self.latencies.append(latency)
+            else:
+                self.failures += 1
+
+    def percentile(self, q: float) -> Optional[float]:
+        with self.lock:
+            latencies = list(self.latencies)
+        return float(np.percentile(latencies, q)) if latencies else None
+
+    def snapshot(self) -> Dict[str, Optional[float]]:
+        # Copia coherente bajo el lock; los percentiles se calculan fuera
+        with self.lock:
+            launches, wins, failures = self.launches, self.wins, self.failures
+            latencies = list(self.latencies)
+        p50, p95 = np.percentile(latencies, [50, 95]) if latencies else (None, None)
+        return {
+            "launches": launches,
+            "wins": wins,
+            "failures": failures,
+            "win_rate": wins / launches if launches else 0.0,
+            "latency_p50_ms": float(p50) * 1000 if p50 is not None else None,
+            "latency_p95_ms": float(p95) * 1000 if p95 is not None else None,
+        }
+
+
+class HedgedSTTEngine(STTEngine):
+    """
+    Transcripción con peticiones de cobertura (hedged requests).
+
+    Lanza el motor principal (offline) de inmediato y, si no entrega un
+    resultado válido antes de hedge_delay, lanza el siguiente respaldo (nube);
+    gana el primer resultado que pasa accept_result(). Los perdedores que aún
+    no empezaron se cancelan; los que ya corren terminan en segundo plano
+    (no se pueden interrumpir) y sólo alimentan las estadísticas.
+
+    Con auto_tune, el retraso sigue al p95 del principal: sólo se cubre la
+    cola lenta (~5% de las peticiones) en lugar de duplicar todo el tráfico.
+    """
+
+    AUTOTUNE_MIN_SAMPLES = 20
+
+    def __init__(
+        self,
+        engines: List[Tuple[str, STTEngine]],
+        hedge_delay: float = 0.8,
+        auto_tune: bool = True,
+        min_confidence: float = 0.0,
+        min_delay: float = 0.1,
+        max_delay: float = 5.0,
+    ):
+        """
+        Args:
+            engines: Lista (nombre, motor) en orden de lanzamiento (principal primero)
+            hedge_delay: Segundos antes de lanzar cada respaldo
+            auto_tune: Ajustar hedge_delay al p95 del motor principal
+            min_confidence: Confianza mínima (si el motor la reporta)
+            min_delay, max_delay: Límites del retraso auto-ajustado
+        """
+        self.engines = engines
+        self.hedge_delay = hedge_delay
+        self.auto_tune = auto_tune
+        self.min_confidence = min_confidence
+        self.min_delay = min_delay
+        self.max_delay = max_delay
+        self.stats = {name: EngineStats() for name, _ in engines}
+        self.executor = ThreadPoolExecutor(
+            max_workers=2 * len(engines), thread_name_prefix="stt-hedge"
+        )
+
+    def accept_result(self, text: Optional[str], confidence: Optional[float]) -> bool:
+        """Válido si tiene al menos una palabra y confianza suficiente (si la hay)"""
+        if not text or not any(c.isalnum() for c in text):
+            return False
+        return confidence is None or confidence >= self.min_confidence
+
+    def _run_engine(self, name: str, engine: STTEngine, audio, sample_rate: int):
+        start = time.perf_counter()
+        try:
+            text, confidence = engine.transcribe_with_confidence(audio, sample_rate)
+        except Exception as e:
+            print(f"❌ Error en {name}: {e}")
+            text, confidence = None, None
+        ok = self.accept_result(text, confidence)
+        self.stats[name].record(time.perf_counter() - start, ok)
+        return name, text, ok
+
+    def _tune_delay(self):
+        primary = self.stats[self.engines[0][0]]
+        if len(primary.latencies) >= self.AUTOTUNE_MIN_SAMPLES:
+            p95 = primary.percentile(95)
+            self.hedge_delay = min(max(p95, self.min_delay), self.max_delay)
+
+    def transcribe(
+        self, audio: AudioInput, sample_rate: int = STT_SAMPLE_RATE
+    ) -> Optional[str]:
+        """Transcribe con carrera entre motores (primer resultado válido gana)"""
+        pending = set()
+        next_engine = 0
+        next_launch = time.perf_counter()
+        winner = None
+
+        while winner is None:
+            # Lanzar el siguiente motor si venció su retraso o nada está en curso
+            now = time.perf_counter()
+            if next_engine < len(self.engines) and (now >= next_launch or not pending):
+                name, engine = self.engines[next_engine]
+                self.stats[name].launched()
+                pending.add(
+                    self.executor.submit(
+                        self._run_engine, name, engine, audio, sample_rate
+                    )
+                )
+                next_engine += 1
+                next_launch = now + self.hedge_delay
+                continue
+
+            if not pending:
+                break
+
+            timeout = None
+            if next_engine < len(self.engines):
+                timeout = max(next_launch - now, 0)
+            done, pending = wait(pending, timeout=timeout, return_when=FIRST_COMPLETED)
+            for future in done:
+                name, text, ok = future.result()
+                if ok and winner is None:
+                    winner = (name, text)
+
+        for future in pending:
+            future.cancel()
+
+        if self.auto_tune:
+            self._tune_delay()
+
+        if winner is None:
             return None
+        self.stats[winner[0]].won()
+        return winner[1]
+
+    def get_stats(self) -> Dict[str, object]:
+        """Latencias p50/p95 y tasa de victorias por motor, y el retraso actual"""
+        return {
+            "hedge_delay_ms": self.hedge_delay * 1000,
+            "engines": {name: stats.snapshot() for name, stats in self.stats.items()},
+        }
+
+
+class STTServerClient(STTEngine):
+    """
+    Cliente del servidor STT persistente (stt_server.py): envía PCM 16-bit
+    por el socket Unix en lugar de cargar un modelo en este proceso.
+    """
+
+    def __init__(self, socket_path: Optional[str] = None):
+        import stt_server
+
+        self.protocol = stt_server
+        self.socket_path = socket_path or Config.STT_SERVER_SOCKET
+        self.sock = None
+        self.lock = threading.Lock()
+        self.last_service_time = 0.0  # Tiempo de cómputo en el servidor
+
+        info = self.info()
+        self.remote_model_id = info.get("model_id", info["engine"])
+        print(
+            f"✅ Servidor STT conectado ({info['engine']}, {self.socket_path}, "
+            f"{info['requests_served']} peticiones previas)"
+        )
+
+    def _connect(self):
+        self.sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        self.sock.connect(self.socket_path)
+
+    def _request(self, op: int, pcm: bytes = b"", sample_rate: int = STT_SAMPLE_RATE):
+        """Envía una petición (reconecta una vez si la conexión se cerró)"""
+        with self.lock:
+            for attempt in range(2):
+                try:
+                    if self.sock is None:
+                        self._connect()
+                    self.sock.sendall(
+                        self.protocol.encode_request(op, pcm, sample_rate)
+                    )
+                    header = self.protocol.recv_exact(
+                        self.sock, self.protocol.RESPONSE_HEADER.size
+                    )
+                    if not header:
+                        raise ConnectionError("Servidor STT cerró la conexión")
+                    status, service_us, size = self.protocol.RESPONSE_HEADER.unpack(
+                        header
+                    )
+                    payload = self.protocol.recv_exact(self.sock, size) if size else b""
+                    return status, service_us / 1e6, payload.decode("utf-8")
+                except (ConnectionError, OSError):
+                    if self.sock is not None:
+                        self.sock.close()
+                    self.sock = None
+                    if attempt:
+                        raise
+
+    def info(self) -> dict:
+        """Estado del servidor (motor, tiempo de carga, peticiones atendidas)"""
+        _, _, payload = self._request(self.protocol.OP_INFO)
+        return json.loads(payload)
+
+    def transcribe(
+        self, audio: AudioInput, sample_rate: int = STT_SAMPLE_RATE
+    ) -> Optional[str]:
+        """Transcribe en el servidor STT"""
+        try:
+            if isinstance(audio, str):
+                with wave.open(audio, "rb") as wf:
+                    if wf.getnchannels() != 1 or wf.getsampwidth() != 2:
+                        print("❌ Audio debe ser mono, 16-bit")
+                        return None
+                    sample_rate = wf.getframerate()
+                    pcm = wf.readframes(wf.getnframes())
+            else:
+                pcm = to_pcm16(audio, sample_rate)
+                sample_rate = STT_SAMPLE_RATE
+
+            status, service_time, text = self._request(
+                self.protocol.OP_TRANSCRIBE, pcm, sample_rate
+            )
+            self.last_service_time = service_time
+            if status == self.protocol.STATUS_ERROR:
+                print(f"❌ Error en servidor STT: {text}")
+                return None
+            return text or None
+        except Exception as e:
+            print(f"❌ Error comunicando con servidor STT: {e}")
+            return None
+
+
+def stt_server_available(socket_path: Optional[str] = None) -> bool:
+    """True si hay un servidor STT escuchando en el socket"""
+    path = socket_path or Config.STT_SERVER_SOCKET
+    if not os.path.exists(path):
+        return False
+    try:
+        with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as sock:
+            sock.connect(path)
+        return True
+    except OSError:
+        return False
+
+
+def engine_model_id(engine: STTEngine) -> str:
+    """Identificador de motor + modelo para la clave de caché"""
+    name = type(engine).__name__
+    if isinstance(engine, WhisperLocalSTT):
+        return f"{name}:{Config.LOCAL_WHISPER_MODEL}"
+    if isinstance(engine, FasterWhisperSTT):
+        return (
+            f"{name}:{Config.FASTER_WHISPER_MODEL}:{Config.FASTER_WHISPER_COMPUTE_TYPE}"
+            f":beam{Config.FASTER_WHISPER_BEAM_SIZE}:vad{int(Config.FASTER_WHISPER_VAD_FILTER)}"
+        )
+    if isinstance(engine, OpenAIWhisperSTT):
+        return f"{name}:{Config.WHISPER_MODEL}"
+    if isinstance(engine, VoskSTT):
+        return f"{name}:{Path(Config.VOSK_MODEL_PATH).name}"
+    if isinstance(engine, HedgedSTTEngine):
+        return "+".join(engine_model_id(e) for _, e in engine.engines)
+    if isinstance(engine, STTServerClient):
+        return f"{name}:{engine.remote_model_id}"
+    return name
+
+
+def audio_fingerprint(audio: AudioInput, sample_rate: int = STT_SAMPLE_RATE) -> str:
+    """
+    Hash del PCM 16-bit a 16 kHz (no del archivo): el mismo audio da la misma
+    huella venga de un WAV o de un buffer en memoria. Archivos que no son WAV
+    PCM 16-bit (mp3, WAV de 8 bits...) se identifican por sus bytes.
+    """
+    if isinstance(audio, str):
+        try:
+            with wave.open(audio, "rb") as wf:
+                if wf.getsampwidth() != 2:
+                    raise wave.Error("no es PCM 16-bit")
+                frames = wf.readframes(wf.getnframes())
+                channels, rate = wf.getnchannels(), wf.getframerate()
+        except (wave.Error, EOFError):
+            with open(audio, "rb") as f:
+                digest = hashlib.blake2b(f.read(), digest_size=16).hexdigest()
+            return f"file-{digest}"
+        pcm = np.frombuffer(frames[: len(frames) - len(frames) % 2], dtype=np.int16)
+        if channels > 1:
+            pcm = pcm[: len(pcm) - len(pcm) % channels].reshape(-1, channels)
+        audio, sample_rate = pcm, rate
+    return hashlib.blake2b(to_pcm16(audio, sample_rate), digest_size=16).hexdigest()
+
+
+class TranscriptionCache:
+    """
+    Caché de transcripciones direccionada por contenido (SQLite).
+
+    La clave combina la huella del audio con motor, modelo e idioma. La
+    expulsión es LRU por número de entradas y por bytes de texto almacenado.
+    """
+
+    def __init__(
+        self,
+        path: Optional[str] = None,
+        max_entries: Optional[int] = None,
+        max_bytes: Optional[int] = None,
+    ):
+        self.path = str(path or Config.STT_CACHE_PATH)
+        self.max_entries = max_entries or Config.STT_CACHE_MAX_ENTRIES
+        self.max_bytes = max_bytes or Config.STT_CACHE_MAX_BYTES
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.lock = threading.Lock()
+
+        Path(self.path).parent.mkdir(parents=True, exist_ok=True)
+        # Varios procesos (pool STT, test_stt) pueden compartir el archivo
+        self.db = sqlite3.connect(self.path, timeout=10, check_same_thread=False)
+        self.db.execute("PRAGMA journal_mode=WAL")
+        self.db.execute("""CREATE TABLE IF NOT EXISTS transcriptions (
+                key TEXT PRIMARY KEY,
+                text TEXT NOT NULL,
+                engine TEXT NOT NULL,
+                size INTEGER NOT NULL,
+                created REAL NOT NULL,
+                last_access REAL NOT NULL
+            )""")
+        self.db.execute(
+            "CREATE INDEX IF NOT EXISTS idx_last_access ON transcriptions(last_access)"
+        )
+        self.db.commit()
+
+    @staticmethod
+    def make_key(fingerprint: str, model_id: str) -> str:
+        return f"{fingerprint}:{model_id}:{Config.STT_LANGUAGE}"
+
+    def get(self, key: str) -> Optional[str]:
+        with self.lock:
+            row = self.db.execute(
+                "SELECT text FROM transcriptions WHERE key = ?", (key,)
+            ).fetchone()
+            if row is None:
+                self.misses += 1
+                return None
+            self.db.execute(
+                "UPDATE transcriptions SET last_access = ? WHERE key = ?",
+                (time.time(), key),
+            )
+            self.db.commit()
+            self.hits += 1
+            return row[0]
+
+    def put(self, key: str, text: str, model_id: str):
+        now = time.time()
+        with self.lock:
+            self.db.execute(
+                "INSERT OR REPLACE INTO transcriptions VALUES (?, ?, ?, ?, ?, ?)",
+                (key, text, model_id, len(text.encode("utf-8")), now, now),
+            )
+            self._evict()
+            self.db.commit()
+
+    def _evict(self):
+        """Elimina las entradas menos usadas hasta cumplir ambos límites"""
+        count, total = self.db.execute(
+            "SELECT COUNT(*), COALESCE(SUM(size), 0) FROM transcriptions"
+        ).fetchone()
+        while count > self.max_entries or total > self.max_bytes:
+            row = self.db.execute(
+                "SELECT key, size FROM transcriptions ORDER BY last_access LIMIT 1"
+            ).fetchone()
+            self.db.execute("DELETE FROM transcriptions WHERE key = ?", (row[0],))
+            count -= 1
+            total -= row[1]
+            self.evictions += 1
+
+    def clear(self):
+        with self.lock:
+            self.db.execute("DELETE FROM transcriptions")
+            self.db.commit()
+
+    def stats(self) -> Dict[str, object]:
+        """Contadores de aciertos/fallos de este proceso y tamaño del almacén"""
+        with self.lock:
+            count, total = self.db.execute(
+                "SELECT COUNT(*), COALESCE(SUM(size), 0) FROM transcriptions"
+            ).fetchone()
+        lookups = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / lookups if lookups else 0.0,
+            "evictions": self.evictions,
+            "entries": count,
+            "bytes": total,
+            "path": self.path,
+        }
+
+
+def create_engine(engine_name: str) -> STTEngine:
+    """Crea un motor STT por nombre (ver Config.STT_ENGINE)"""
+    if engine_name == "whisper_local":
+        return WhisperLocalSTT()
+    elif engine_name == "faster_whisper":
+        return FasterWhisperSTT()
+    elif engine_name == "openai":
+        return OpenAIWhisperSTT()
+    elif engine_name == "google_cloud":
+        return GoogleCloudSTT()
+    elif engine_name == "vosk":
+        return VoskSTT()
+    elif engine_name == "stub":
+        return StubSTT()
+    else:
+        raise ValueError(f"Motor STT desconocido: {engine_name}")
 
 
 class STTManager:
     """Gestor de Speech-to-Text con fallback automático"""
 
-    def __init__(self):
-        self.engine = self._initialize_engine()
+    def __init__(
+        self, use_server: Optional[bool] = None, use_cache: Optional[bool] = None
+    ):
+        """
+        Args:
+            use_server: Usar el servidor STT persistente si está activo
+                (None = según Config.STT_USE_SERVER)
+            use_cache: Usar la caché de transcripciones
+                (None = según Config.STT_CACHE_ENABLED)
+        """
+        if use_server is None:
+            use_server = Config.STT_USE_SERVER
+        if use_cache is None:
+            use_cache = Config.STT_CACHE_ENABLED
+        self.engine = self._initialize_engine(use_server)
+        self.model_id = engine_model_id(self.engine)
+
+        self.cache = None
+        if use_cache:
+            try:
+                self.cache = TranscriptionCache()
+            except Exception as e:
+                print(f"⚠️  Caché STT no disponible: {e}")
 
-    def _initialize_engine(self) -> STTEngine:
+    def _initialize_engine(self, use_server: bool = False) -> STTEngine:
         """Inicializa el motor STT según configuración"""
         engine_name = Config.STT_ENGINE
 
+        # Un servidor caliente evita cargar el modelo en este proceso
+        if use_server and stt_server_available():
+            try:
+                return STTServerClient()
+            except Exception as e:
+                print(f"⚠️  Servidor STT no disponible: {e}")
+
+        if Config.STT_HEDGE_ENABLED:
+            hedged = self._initialize_hedged()
+            if hedged:
+                return hedged
+
         try:
-            if engine_name == "whisper_local":
-                return WhisperLocalSTT()
-            elif engine_name == "openai":
-                return OpenAIWhisperSTT()
-            elif engine_name == "google_cloud":
-                return GoogleCloudSTT()
-            elif engine_name == "vosk":
-                return VoskSTT()
-            else:
-                raise ValueError(f"Motor STT desconocido: {engine_name}")
+            return create_engine(engine_name)
         except Exception as e:
             print(f"⚠️  Error inicializando {engine_name}: {e}")
             print("🔄 Intentando fallback a Whisper local...")
@@ -205,29 +1055,118 @@ class STTManager:
             except:
                 raise RuntimeError("No se pudo inicializar ningún motor STT")
 
-    def transcribe(self, audio_file: str) -> Optional[str]:
+    def _initialize_hedged(self) -> Optional[STTEngine]:
+        """Motor principal + respaldos disponibles (omite los que fallan al crear)"""
+        names = [Config.STT_HEDGE_PRIMARY] + [
+            n.strip() for n in Config.STT_HEDGE_BACKUPS.split(",") if n.strip()
+        ]
+        engines = []
+        for name in names:
+            try:
+                engines.append((name, create_engine(name)))
+            except Exception as e:
+                print(f"⚠️  {name} no disponible para carrera: {e}")
+
+        if len(engines) < 2:
+            print("⚠️  Carrera STT requiere al menos 2 motores; usando motor único")
+            return engines[0][1] if engines else None
+
+        print(
+            f"🏁 Carrera STT: {' -> '.join(n for n, _ in engines)} "
+            f"(retraso {Config.STT_HEDGE_DELAY_MS:.0f} ms)"
+        )
+        return HedgedSTTEngine(
+            engines,
+            hedge_delay=Config.STT_HEDGE_DELAY_MS / 1000,
+            auto_tune=Config.STT_HEDGE_AUTOTUNE,
+            min_confidence=Config.STT_HEDGE_MIN_CONFIDENCE,
+        )
+
+    def get_stats(self) -> Optional[Dict[str, object]]:
+        """Estadísticas de la carrera de motores (None si no está activa)"""
+        if isinstance(self.engine, HedgedSTTEngine):
+            return self.engine.get_stats()
+        return None
+
+    def get_cache_stats(self) -> Optional[Dict[str, object]]:
+        """Aciertos/fallos de la caché de transcripciones (None si está deshabilitada)"""
+        return self.cache.stats() if self.cache else None
+
+    def transcribe(
+        self, audio: AudioInput, sample_rate: int = STT_SAMPLE_RATE
+    ) -> Optional[str]:
         """
-        Transcribe un archivo de audio a texto
+        Transcribe audio a texto
 
         Args:
-            audio_file: Ruta al archivo WAV (16kHz mono)
+            audio: Ruta al archivo WAV (16kHz mono) o buffer NumPy en memoria
+                (float32 en [-1, 1] o int16)
+            sample_rate: Frecuencia de muestreo del buffer (ignorada con rutas)
 
         Returns:
             Texto transcrito o None si falla
         """
-        if not Path(audio_file).exists():
-            print(f"❌ Archivo no encontrado: {audio_file}")
-            return None
+        return self.transcribe_with_source(audio, sample_rate)[0]
 
-        print(f"🎤 Transcribiendo: {audio_file}")
-        text = self.engine.transcribe(audio_file)
+    def transcribe_with_source(
+        self, audio: AudioInput, sample_rate: int = STT_SAMPLE_RATE
+    ) -> Tuple[Optional[str], bool]:
+        """
+        Como transcribe, indicando si el texto salió de la caché (por llamada,
+        seguro con varios hilos a diferencia de comparar cache.hits)
+
+        Returns:
+            (texto o None, si vino de la caché)
+        """
+        if isinstance(audio, str):
+            if not Path(audio).exists():
+                print(f"❌ Archivo no encontrado: {audio}")
+                return None, False
+
+        cache_key = None
+        if self.cache:
+            start = now_ns()
+            try:
+                cache_key = TranscriptionCache.make_key(
+                    audio_fingerprint(audio, sample_rate), self.model_id
+                )
+            except (OSError, wave.Error, EOFError, ValueError) as e:
+                print(f"⚠️  Sin caché STT para este audio: {e}")
+            text = self.cache.get(cache_key) if cache_key else None
+            record_latency("stt.cache_lookup", now_ns() - start)
+            if text is not None:
+                print(f"⚡ Transcripción en caché: '{text}'")
+                return text, True
+
+        if isinstance(audio, str):
+            print(f"🎤 Transcribiendo: {audio}")
+        else:
+            print(f"🎤 Transcribiendo {len(audio) / sample_rate:.2f}s en memoria")
+
+        start = now_ns()
+        text = self.engine.transcribe(audio, sample_rate)
+        record_latency("stt.engine", now_ns() - start)
+        if text and cache_key:
+            self.cache.put(cache_key, text, self.model_id)
 
         if text:
             print(f"✅ Transcripción: '{text}'")
         else:
             print("❌ Transcripción falló")
 
-        return text
+        return text, False
+
+    def start_stream(self, sample_rate: int = STT_SAMPLE_RATE) -> StreamingSession:
+        """
+        Inicia una transcripción incremental con el motor activo
+
+        Returns:
+            StreamingSession (streaming=False si el motor sólo transcribe en lote)
+        """
+        session = self.engine.start_stream(sample_rate)
+        mode = "streaming" if session.streaming else "acumulado"
+        print(f"🎤 Transcripción incremental iniciada ({mode})")
+        return session
 
 
 if __name__ == "__main__":
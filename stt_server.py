@@ -0,0 +1,177 @@
+#!/usr/bin/env python3
+"""
+Jeepy AI - Servidor STT persistente
+Carga el motor STT configurado una sola vez y atiende transcripciones por un
+socket Unix con un protocolo binario compacto (PCM 16-bit crudo), para que
+kws_monitor.py, test_stt.py y verify_stt.py compartan un modelo ya caliente.
+
+Protocolo (little-endian, varias peticiones por conexión):
+    Petición:  magic "JSTT" | op u8 | reservado u8 | sample_rate u32 | n u32 | n bytes PCM int16
+    Respuesta: status u8 | tiempo de servicio u32 (us) | n u32 | n bytes UTF-8
+"""
+
+import argparse
+import json
+import os
+import signal
+import socket
+import socketserver
+import struct
+import sys
+import threading
+import time
+
+import numpy as np
+
+from config import Config
+
+MAGIC = b"JSTT"
+REQUEST_HEADER = struct.Struct("<4sBBII")
+RESPONSE_HEADER = struct.Struct("<BII")
+
+OP_TRANSCRIBE = 1
+OP_INFO = 2
+
+STATUS_OK = 0
+STATUS_EMPTY = 1  # Transcripción vacía o fallida
+STATUS_ERROR = 2
+
+# Límite de audio por petición (60 s a 16 kHz, 16-bit)
+MAX_PAYLOAD_BYTES = 60 * 16000 * 2
+
+
+def recv_exact(sock: socket.socket, size: int) -> bytes:
+    """Lee exactamente size bytes (b"" si el otro extremo cerró)"""
+    buffer = bytearray(size)
+    view = memoryview(buffer)
+    received = 0
+    while received < size:
+        n = sock.recv_into(view[received:], size - received)
+        if n == 0:
+            return b""
+        received += n
+    return bytes(buffer)
+
+
+def encode_request(op: int, pcm: bytes = b"", sample_rate: int = 16000) -> bytes:
+    return REQUEST_HEADER.pack(MAGIC, op, 0, sample_rate, len(pcm)) + pcm
+
+
+def encode_response(status: int, text: str, service_time: float) -> bytes:
+    payload = text.encode("utf-8")
+    return RESPONSE_HEADER.pack(status, int(service_time * 1e6), len(payload)) + payload
+
+
+class STTRequestHandler(socketserver.BaseRequestHandler):
+    """Atiende las peticiones de una conexión hasta que el cliente cierra"""
+
+    def handle(self):
+        server = self.server
+        while True:
+            header = recv_exact(self.request, REQUEST_HEADER.size)
+            if not header:
+                return
+            magic, op, _, sample_rate, size = REQUEST_HEADER.unpack(header)
+            if magic != MAGIC or size > MAX_PAYLOAD_BYTES:
+                self.request.sendall(
+                    encode_response(STATUS_ERROR, "Petición inválida", 0.0)
+                )
+                return
+
+            pcm = recv_exact(self.request, size) if size else b""
+            if size and not pcm:
+                return
+
+            if op == OP_INFO:
+                response = encode_response(STATUS_OK, json.dumps(server.info()), 0.0)
+            elif op == OP_TRANSCRIBE:
+                response = server.transcribe(pcm, sample_rate)
+            else:
+                response = encode_response(STATUS_ERROR, f"Operación {op}", 0.0)
+            self.request.sendall(response)
+
+
+class STTServer(socketserver.ThreadingMixIn, socketserver.UnixStreamServer):
+    """
+    Servidor STT sobre socket Unix.
+
+    Las conexiones se atienden en hilos, pero las transcripciones se
+    serializan: los motores locales no son seguros entre hilos y ya usan
+    todos los núcleos.
+    """
+
+    daemon_threads = True
+
+    def __init__(self, socket_path: str):
+        from stt_engine import STTManager, stt_server_available
+
+        if stt_server_available(socket_path):
+            raise RuntimeError(f"Ya hay un servidor STT en {socket_path}")
+        if os.path.exists(socket_path):
+            os.remove(socket_path)  # Socket huérfano de una ejecución anterior
+
+        start = time.perf_counter()
+        # La caché vive en los clientes (STTManager): el servidor sólo transcribe
+        self.manager = STTManager(use_server=False, use_cache=False)
+        self.load_time = time.perf_counter() - start
+        self.lock = threading.Lock()
+        self.requests_served = 0
+        self.started_at = time.time()
+
+        super().__init__(socket_path, STTRequestHandler)
+        os.chmod(socket_path, 0o660)
+
+    def transcribe(self, pcm: bytes, sample_rate: int) -> bytes:
+        audio = np.frombuffer(pcm, dtype=np.int16)
+        with self.lock:
+            start = time.perf_counter()
+            try:
+                text = self.manager.engine.transcribe(audio, sample_rate)
+            except Exception as e:
+                return encode_response(STATUS_ERROR, str(e), 0.0)
+            service_time = time.perf_counter() - start
+            self.requests_served += 1
+
+        status = STATUS_OK if text else STATUS_EMPTY
+        return encode_response(status, text or "", service_time)
+
+    def info(self) -> dict:
+        return {
+            "engine": type(self.manager.engine).__name__,
+            "model_id": self.manager.model_id,
+            "stt_engine": Config.STT_ENGINE,
+            "load_time_s": self.load_time,
+            "requests_served": self.requests_served,
+            "uptime_s": time.time() - self.started_at,
+            "pid": os.getpid(),
+        }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Servidor STT persistente")
+    parser.add_argument("--socket", default=Config.STT_SERVER_SOCKET)
+    args = parser.parse_args()
+
+    print(f"🎤 Cargando motor STT ({Config.STT_ENGINE})...")
+    server = STTServer(args.socket)
+    print(f"✅ Motor cargado en {server.load_time:.2f}s")
+    print(f"🔌 Escuchando en {args.socket} (Ctrl+C para salir)")
+
+    def stop(signum, frame):
+        threading.Thread(target=server.shutdown, daemon=True).start()
+
+    signal.signal(signal.SIGTERM, stop)
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+        if os.path.exists(args.socket):
+            os.remove(args.socket)
+        print(f"\n👋 Servidor detenido ({server.requests_served} peticiones)")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
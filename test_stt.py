@@ -114,7 +114,7 @@ def test_stt_engine():
         traceback.print_exc()
 
 
-def test_all_audio_files():
+def test_all_audio_files(use_cache=True):
     """Transcribe todos los archivos de audio disponibles"""
     print("\n" + "=" * 70)
     print("🎤 TEST MASIVO DE STT - Todos los archivos")
@@ -134,7 +134,7 @@ def test_all_audio_files():
     print(f"\n🔧 Inicializando STT Manager...")
 
     try:
-        stt_manager = STTManager()
+        stt_manager = STTManager(use_cache=use_cache)
         print(f"   ✅ Inicializado: {Config.STT_ENGINE}\n")
     except Exception as e:
         print(f"   ❌ Error: {e}")
@@ -182,6 +182,12 @@ def test_all_audio_files():
     print(f"   ✅ Exitosas: {successful}")
     print(f"   ❌ Fallidas: {failed}")
     print(f"   📁 Transcripciones en: {trans_dir}")
+    cache_stats = stt_manager.get_cache_stats()
+    if cache_stats:
+        print(
+            f"   ⚡ Caché: {cache_stats['hits']} aciertos, {cache_stats['misses']} fallos "
+            f"({cache_stats['entries']} entradas en {cache_stats['path']})"
+        )
     print(f"=" * 70 + "\n")
 
 
@@ -194,6 +200,11 @@ def main():
         "--all", action="store_true", help="Transcribir todos los archivos de audio"
     )
     parser.add_argument("--file", type=str, help="Transcribir un archivo específico")
+    parser.add_argument(
+        "--no-cache",
+        action="store_true",
+        help="Ignorar la caché de transcripciones (forzar re-transcripción)",
+    )
 
     args = parser.parse_args()
 
@@ -201,7 +212,7 @@ def main():
         # Transcribir archivo específico
         print(f"\n🎯 Transcribiendo: {args.file}")
         try:
-            stt_manager = STTManager()
+            stt_manager = STTManager(use_cache=not args.no_cache)
             transcription = stt_manager.transcribe(args.file)
             if transcription:
                 print(f'\n✅ "{transcription}"\n')
@@ -212,7 +223,7 @@ def main():
 
     elif args.all:
         # Transcribir todos
-        test_all_audio_files()
+        test_all_audio_files(use_cache=not args.no_cache)
 
     else:
         # Test simple (último archivo)
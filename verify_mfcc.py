@@ -0,0 +1,148 @@
+#!/usr/bin/env python3
+"""
+Verificación de paridad MFCC: NumPy puro vs librosa
+Compara el frontend de r-pi/mfcc_frontend.py (batch e incremental) contra la
+extracción con librosa usada en el entrenamiento, sobre los WAV grabados.
+"""
+
+import sys
+from pathlib import Path
+
+import numpy as np
+
+sys.path.insert(0, str(Path(__file__).parent / "r-pi"))
+
+import mfcc_frontend
+from mfcc_frontend import StreamingMFCC
+from ring_buffer import RingBuffer
+
+SAMPLE_RATE = 16000
+MFCC_COUNT = 40
+MAX_PADDING_LENGTH = 40
+WINDOW_SIZE = 16000
+STRIDE_SIZE = 4096
+MAX_RELATIVE_ERROR = 1e-4
+
+AUDIO_DIRS = ["data/jeepy_positive", "data/jeepy_negative", "captured_commands"]
+
+
+def check_emoji(passed: bool) -> str:
+    """Retorna emoji según resultado"""
+    return "✅" if passed else "❌"
+
+
+def print_section(title: str):
+    """Imprime sección con formato"""
+    print(f"\n{'=' * 70}")
+    print(f"  {title}")
+    print(f"{'=' * 70}\n")
+
+
+def pad_mfcc(mfccs):
+    """Padding/recorte idéntico a extract_mfcc del entrenamiento"""
+    if mfccs.shape[1] < MAX_PADDING_LENGTH:
+        padding_width = MAX_PADDING_LENGTH - mfccs.shape[1]
+        return np.pad(mfccs, pad_width=((0, 0), (0, padding_width)), mode="constant")
+    return mfccs[:, :MAX_PADDING_LENGTH]
+
+
+def relative_error(reference, candidate):
+    """Error absoluto máximo relativo a la escala de la referencia"""
+    scale = max(float(np.abs(reference).max()), 1e-6)
+    return float(np.abs(reference - candidate).max()) / scale
+
+
+def check_file_batch(librosa, audio):
+    """Compara MFCC de archivo completo (pipeline de entrenamiento)"""
+    reference = pad_mfcc(
+        librosa.feature.mfcc(y=audio, sr=SAMPLE_RATE, n_mfcc=MFCC_COUNT)
+    )
+    candidate = pad_mfcc(mfcc_frontend.mfcc(audio, SAMPLE_RATE, n_mfcc=MFCC_COUNT))
+    return relative_error(reference, candidate)
+
+
+def check_file_streaming(librosa, audio):
+    """Reproduce el archivo por strides y compara cada ventana deslizante"""
+    ring = RingBuffer(WINDOW_SIZE, SAMPLE_RATE)
+    extractor = StreamingMFCC(
+        SAMPLE_RATE, WINDOW_SIZE, n_mfcc=MFCC_COUNT, max_frames=MAX_PADDING_LENGTH
+    )
+
+    worst = 0.0
+    for start in range(0, len(audio) - STRIDE_SIZE + 1, STRIDE_SIZE):
+        ring.write(audio[start : start + STRIDE_SIZE])
+        window = ring.get_window()
+        candidate = extractor.compute(window, ring.total_written)[0, :, :, 0]
+        reference = pad_mfcc(
+            librosa.feature.mfcc(y=window.copy(), sr=SAMPLE_RATE, n_mfcc=MFCC_COUNT)
+        )
+        worst = max(worst, relative_error(reference, candidate))
+    return worst
+
+
+def find_audio_files():
+    """Busca WAVs grabados en los directorios de datos"""
+    files = []
+    for directory in AUDIO_DIRS:
+        path = Path(directory)
+        if path.exists():
+            files.extend(sorted(path.glob("*.wav")))
+    return files
+
+
+def synthetic_signals():
+    """Señales sintéticas para cuando no hay grabaciones disponibles"""
+    rng = np.random.default_rng(0)
+    t = np.arange(3 * SAMPLE_RATE) / SAMPLE_RATE
+    return {
+        "tono_300hz": (0.1 * np.sin(2 * np.pi * 300 * t)).astype(np.float32),
+        "ruido_blanco": (0.05 * rng.standard_normal(len(t))).astype(np.float32),
+        "silencio": np.zeros(len(t), dtype=np.float32),
+    }
+
+
+def main():
+    """Función principal"""
+    print_section("🔍 PARIDAD MFCC - NumPy vs librosa")
+
+    try:
+        import librosa
+    except ImportError:
+        print("❌ librosa no instalado (necesario como referencia)")
+        print("   Ejecuta: uv add librosa")
+        return 1
+
+    files = find_audio_files()
+    if files:
+        signals = {str(f): librosa.load(str(f), sr=SAMPLE_RATE)[0] for f in files}
+        print(f"📁 {len(files)} archivos WAV encontrados")
+    else:
+        signals = synthetic_signals()
+        print("⚠️  No hay WAVs grabados, usando señales sintéticas")
+
+    all_passed = True
+    worst_batch = 0.0
+    worst_stream = 0.0
+
+    for name, audio in signals.items():
+        err_batch = check_file_batch(librosa, audio)
+        err_stream = check_file_streaming(librosa, audio)
+        passed = err_batch <= MAX_RELATIVE_ERROR and err_stream <= MAX_RELATIVE_ERROR
+        all_passed = all_passed and passed
+        worst_batch = max(worst_batch, err_batch)
+        worst_stream = max(worst_stream, err_stream)
+        print(
+            f"{check_emoji(passed)} {Path(name).name:40} batch={err_batch:.2e} streaming={err_stream:.2e}"
+        )
+
+    print_section("📊 RESUMEN")
+    print(f"Error relativo máximo (batch):     {worst_batch:.2e}")
+    print(f"Error relativo máximo (streaming): {worst_stream:.2e}")
+    print(f"Tolerancia:                        {MAX_RELATIVE_ERROR:.0e}")
+    print(f"\n{check_emoji(all_passed)} Paridad {'OK' if all_passed else 'FALLIDA'}\n")
+
+    return 0 if all_passed else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -82,7 +82,13 @@ def check_configuration():
         config_ok = True
 
         # Motor STT
-        valid_engines = ["openai", "whisper_local", "google_cloud", "vosk"]
+        valid_engines = [
+            "openai",
+            "whisper_local",
+            "faster_whisper",
+            "google_cloud",
+            "vosk",
+        ]
         engine_ok = Config.STT_ENGINE in valid_engines
         print(f"{check_emoji(engine_ok)} Motor STT: {Config.STT_ENGINE}")
         if not engine_ok:
@@ -116,6 +122,13 @@ def check_configuration():
             )
             config_ok = config_ok and model_ok
 
+        elif Config.STT_ENGINE == "faster_whisper":
+            model_ok = bool(Config.FASTER_WHISPER_MODEL)
+            print(
+                f"{check_emoji(model_ok)} Modelo faster-whisper: {Config.FASTER_WHISPER_MODEL} ({Config.FASTER_WHISPER_COMPUTE_TYPE})"
+            )
+            config_ok = config_ok and model_ok
+
         return config_ok
 
     except Exception as e: